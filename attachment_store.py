@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Attachment Store
+================
+
+Streams attachment downloads to disk and deduplicates them by content.
+
+Decoded chunks are written straight to a temporary file in the download
+directory and hashed (SHA-256) as they arrive, so the store never builds the
+whole decoded attachment in memory (the mailbox backend may still hold the
+encoded payload). Once the download completes, the hash is looked up in
+the store's index: identical content that is already on disk is not stored a
+second time.
+"""
+
+import base64
+import binascii
+import hashlib
+import json
+import logging
+import os
+import re
+from pathlib import Path
+
+logger = logging.getLogger("attachment_store")
+
+HASH_INDEX_NAME = ".hashes.json"
+DECODE_CHUNK_CHARS = 64 * 1024
+
+
+def iter_base64_decode(encoded_chunks, urlsafe=False):
+    """
+    Decode base64 text incrementally.
+
+    Args:
+        encoded_chunks: Iterable of base64 str/bytes chunks (any sizes, may contain whitespace)
+        urlsafe: Whether the text uses the URL-safe alphabet (as the Gmail API does)
+
+    Yields:
+        Decoded byte chunks
+    """
+    decode = base64.urlsafe_b64decode if urlsafe else base64.b64decode
+    pending = b""
+    for chunk in encoded_chunks:
+        if isinstance(chunk, str):
+            chunk = chunk.encode("ascii")
+        pending += b"".join(chunk.split())
+        usable = len(pending) - len(pending) % 4
+        if usable:
+            yield decode(pending[:usable])
+            pending = pending[usable:]
+    if pending:
+        # Unpadded tail (common in base64url)
+        try:
+            yield decode(pending + b"=" * (-len(pending) % 4))
+        except binascii.Error as e:
+            raise ValueError(f"Truncated base64 attachment data: {e}")
+
+
+def iter_text_slices(text, size=DECODE_CHUNK_CHARS):
+    """Yield a long string in slices of `size` characters."""
+    for start in range(0, len(text), size):
+        yield text[start:start + size]
+
+
+def safe_filename(filename):
+    """Strip path components and unsafe characters from an attachment filename."""
+    name = re.sub(r'[^\w.\- ]+', '_', Path(filename).name).strip() or "attachment.pdf"
+    return name
+
+
+class AttachmentStore:
+    """Download directory with a content-hash index for deduplication."""
+
+    def __init__(self, directory):
+        """
+        Initialize the store.
+
+        Args:
+            directory: Download directory (created if missing)
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(exist_ok=True)
+        self.index_path = self.directory / HASH_INDEX_NAME
+        self.by_hash = {}
+        if self.index_path.exists():
+            try:
+                with open(self.index_path, 'r') as f:
+                    self.by_hash = json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                logger.warning(f"Ignoring unreadable attachment index {self.index_path}: {e}")
+        self.by_name = {name: digest for digest, name in self.by_hash.items()}
+
+    def save_index(self):
+        """Save the hash index."""
+        tmp_path = self.index_path.with_name(self.index_path.name + ".tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump(self.by_hash, f, indent=2)
+        os.replace(tmp_path, self.index_path)
+
+    def digest(self, path):
+        """Get the stored SHA-256 of a file in the store, or None if unknown."""
+        return self.by_name.get(Path(path).name)
+
+    def save_stream(self, chunks, filename):
+        """
+        Write decoded chunks to the store, hashing them as they arrive.
+
+        Args:
+            chunks: Iterable of decoded byte chunks
+            filename: Original attachment filename
+
+        Returns:
+            Tuple of (path, sha256 hex digest, whether identical content was already stored),
+            or None if the stream produced no data
+        """
+        name = safe_filename(filename)
+        tmp_path = self.directory / f".{name}.part"
+        sha256 = hashlib.sha256()
+        size = 0
+        try:
+            with open(tmp_path, 'wb') as f:
+                for chunk in chunks:
+                    sha256.update(chunk)
+                    f.write(chunk)
+                    size += len(chunk)
+        except Exception:
+            tmp_path.unlink(missing_ok=True)
+            raise
+
+        if size == 0:
+            tmp_path.unlink(missing_ok=True)
+            return None
+
+        digest = sha256.hexdigest()
+        existing = self.by_hash.get(digest)
+        if existing and (self.directory / existing).exists():
+            tmp_path.unlink()
+            logger.info(f"{filename} is identical to stored {existing}, not storing a second copy")
+            return self.directory / existing, digest, True
+
+        # Keep the original name unless a different file already has it
+        path = self.directory / name
+        if path.exists() and self.by_name.get(name) != digest:
+            path = self.directory / f"{Path(name).stem}-{digest[:12]}{Path(name).suffix}"
+        os.replace(tmp_path, path)
+
+        self.by_hash[digest] = path.name
+        self.by_name[path.name] = digest
+        self.save_index()
+        logger.info(f"Stored {filename} as {path.name} ({size} bytes, sha256 {digest[:12]})")
+        return path, digest, False
@@ -0,0 +1,474 @@
+#!/usr/bin/env python3
+"""
+Calendar Benchmarks
+===================
+
+Times the calendar pipeline on synthetic school data, so performance can be
+tracked from run to run without a real mailbox or the OpenAI API.
+
+The generator produces N schools x M children x Y academic years of events
+and weekly activities (plus, optionally, fake "Dates for your diary" PDFs).
+The app's data format has two child slots (Leo and Novah), so synthetic
+children are assigned to them in turn; the event volume still scales with M.
+
+Benchmarks:
+- create_calendar_days
+- create_json_structure (with the synthetic events and activities)
+- validate_json_structure
+- merge_events_with_existing (a quarter of the new events are duplicates)
+- save_json_to_file
+- load_events_json and event_archive_month: loading every event from JSON
+  against opening the binary archive and reading one month
+- extract_events_with_rules (on the generated diary text)
+- extract_text_from_pdf (on the fake PDFs, when a PDF text backend is installed)
+- import_<module>: a fresh interpreter importing each entry point, with the
+  cumulative `python -X importtime` cost and the heaviest imports (a cron
+  tick with nothing to do should not pay for the OpenAI SDK)
+
+Usage:
+    python3 benchmark_calendar.py --schools 5 --children 3 --years 4 --output bench.json
+    python3 benchmark_calendar.py --schools 5 --children 3 --years 4 --baseline bench.json
+
+Results are JSON (stdout or --output). With --baseline, medians are compared
+with a previous results file and the exit status is 1 if any benchmark got
+slower by more than --tolerance.
+"""
+
+import argparse
+import copy
+import json
+import logging
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from functools import partial
+from pathlib import Path
+from types import SimpleNamespace
+
+import notices
+import update_calendar_data
+from event_archive import EventArchive, write_archive
+from event_model import CHILDREN, build_events
+from pdf_text import get_backend, iter_pdf_pages
+from rule_extractor import extract_events_with_rules
+from search_index import SearchIndex
+from weather import FixtureProvider, WeatherService
+
+logger = logging.getLogger("benchmark_calendar")
+
+SCRIPT_DIR = Path(__file__).parent
+
+FIRST_ACADEMIC_YEAR = 2025
+EVENTS_PER_CHILD_YEAR = 40
+ACTIVITIES_PER_CHILD = 6
+DEFAULT_REPEAT = 5
+DEFAULT_TOLERANCE = 0.2
+# Lines per page of a fake PDF
+PDF_LINES_PER_PAGE = 60
+
+# Entry points whose start-up cost is benchmarked
+IMPORT_MODULES = ["update_calendar_data", "gmail_pdf_event_scanner"]
+HEAVIEST_IMPORTS = 5
+
+WEEKDAY_NAMES = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday"]
+MONTH_NAMES = ["January", "February", "March", "April", "May", "June", "July",
+               "August", "September", "October", "November", "December"]
+EVENT_TEMPLATES = [
+    ("{cls} Class Assembly", "Assembly", "9:00 AM - 9:30 AM"),
+    ("Harvest Festival", "Celebration", "All Day"),
+    ("{cls} Class Trip to the Museum", "School Trip", "9:30 AM - 2:30 PM"),
+    ("Odd Sock Day", "Special Day", "All Day"),
+    ("Phonics Workshop for Parents", "Academic", "8:45 AM - 9:30 AM"),
+    ("Science Week", "Special Week", "All Day"),
+    ("Art Exhibition", "Exhibition", "3:30 PM - 5:00 PM"),
+    ("Sports Day", "Activity", "9:00 AM - 12:00 PM"),
+    ("PD Day - School Closed", "Closure", "All Day"),
+]
+CLASS_NAMES = ["Poplar", "Maple", "Butterflies", "Ladybirds", "Oak", "Willow"]
+ACTIVITY_NAMES = ["Swimming", "Chess Club", "Zumba", "Gymnastics", "Football", "Art Club", "Coding Club", "Drama"]
+
+
+def school_days(academic_year):
+    """Get the weekdays of an academic year (September to July)."""
+    day = date(academic_year, 9, 1)
+    end = date(academic_year + 1, 7, 20)
+    while day <= end:
+        if day.weekday() < 5:
+            yield day
+        day += timedelta(days=1)
+
+
+def generate_events(schools, children, years, seed=0):
+    """
+    Generate synthetic events.
+
+    Returns:
+        List of event dicts, sorted by date
+    """
+    rng = random.Random(seed)
+    events = []
+    for school in range(1, schools + 1):
+        for academic_year in range(FIRST_ACADEMIC_YEAR, FIRST_ACADEMIC_YEAR + years):
+            days = list(school_days(academic_year))
+            # Term dates are shared by every child at the school
+            for title, day in [("Autumn Term Start", days[0]), ("Autumn Term End", date(academic_year, 12, 12)),
+                               ("Spring Term Start", date(academic_year + 1, 1, 6)),
+                               ("Summer Term End", days[-1])]:
+                events.append(make_event(day, f"{title} (School {school})", "Term End", "All Day", CHILDREN))
+            for child in range(children):
+                child_name = CHILDREN[child % len(CHILDREN)]
+                cls = CLASS_NAMES[child % len(CLASS_NAMES)]
+                for n in range(EVENTS_PER_CHILD_YEAR):
+                    template, event_type, time_text = rng.choice(EVENT_TEMPLATES)
+                    title = f"{template.format(cls=cls)} {n + 1} (School {school})"
+                    events.append(make_event(rng.choice(days), title, event_type, time_text, [child_name]))
+    events.sort(key=lambda e: (e["year"], e["month"], e["date"]))
+    return events
+
+
+def make_event(day, title, event_type, time_text, children):
+    """Build an event dict."""
+    return {
+        "date": day.day,
+        "month": day.month,
+        "year": day.year,
+        "title": title,
+        "time": time_text,
+        "description": f"{title}.",
+        "location": "School",
+        "type": event_type,
+        "children": list(children)
+    }
+
+
+def generate_activities(children, seed=0):
+    """
+    Generate synthetic weekly activities in the get_child_activities format.
+
+    Returns:
+        Dict of app child name -> list of {"day", "activities"}
+    """
+    rng = random.Random(seed)
+    by_child = {name: {day: [] for day in WEEKDAY_NAMES} for name in CHILDREN}
+    for child in range(children):
+        child_name = CHILDREN[child % len(CHILDREN)]
+        for _ in range(ACTIVITIES_PER_CHILD):
+            start = rng.choice([9, 10, 11, 13, 14, 15])
+            by_child[child_name][rng.choice(WEEKDAY_NAMES)].append({
+                "title": rng.choice(ACTIVITY_NAMES),
+                "time": f"{start}:30-{start + 1}:30",
+                "teacher": "Staff"
+            })
+    return {
+        name: [{"day": day, "activities": acts} for day, acts in days.items() if acts]
+        for name, days in by_child.items()
+    }
+
+
+def diary_text(events):
+    """Render events as a "Dates for your diary" letter, as pdftotext would see it."""
+    lines = ["Dates for your diary"]
+    heading = None
+    for event in events:
+        day = date(event["year"], event["month"], event["date"])
+        if (day.year, day.month) != heading:
+            heading = (day.year, day.month)
+            lines.append(f"{MONTH_NAMES[day.month - 1]} {day.year}")
+        suffix = "th" if 11 <= day.day <= 13 else {1: "st", 2: "nd", 3: "rd"}.get(day.day % 10, "th")
+        time_text = "" if event["time"] == "All Day" else event["time"].replace(" AM", "am").replace(" PM", "pm")
+        lines.append(f"{day.strftime('%A')} {day.day}{suffix}    {event['title']}    {time_text}".rstrip())
+    return "\n".join(lines) + "\n"
+
+
+def pdf_escape(text):
+    """Escape text for a PDF string literal."""
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def write_fake_pdf(path, text):
+    """Write a minimal single-font PDF with the text, PDF_LINES_PER_PAGE lines per page."""
+    lines = text.splitlines()
+    pages = [lines[i:i + PDF_LINES_PER_PAGE] for i in range(0, len(lines), PDF_LINES_PER_PAGE)] or [[]]
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None, "<< /Type /Font /Subtype /Type1 /BaseFont /Courier >>"]
+    page_ids = []
+    for page_lines in pages:
+        content = "BT /F1 9 Tf 11 TL 30 810 Td " + " ".join(f"({pdf_escape(line)}) Tj T*" for line in page_lines) + " ET"
+        objects.append(f"<< /Length {len(content)} >>\nstream\n{content}\nendstream")
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+                       f"/Resources << /Font << /F1 3 0 R >> >> /Contents {len(objects)} 0 R >>")
+        page_ids.append(len(objects))
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(f'{i} 0 R' for i in page_ids)}] /Count {len(page_ids)} >>"
+
+    output = "%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(output.encode("latin-1")))
+        output += f"{number} 0 obj\n{body}\nendobj\n"
+    xref = len(output.encode("latin-1"))
+    output += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n"
+    output += "".join(f"{offset:010d} 00000 n \n" for offset in offsets)
+    output += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n"
+    Path(path).write_bytes(output.encode("latin-1"))
+
+
+def generate_pdfs(events, directory, schools):
+    """Write one fake diary PDF per school. Returns the list of paths."""
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for school in range(1, schools + 1):
+        school_events = [e for e in events if e["title"].endswith(f"(School {school})")]
+        path = directory / f"school-{school}-dates-for-your-diary.pdf"
+        write_fake_pdf(path, diary_text(school_events))
+        paths.append(path)
+    return paths
+
+
+@contextmanager
+def patched(module, **attributes):
+    """Temporarily replace module attributes."""
+    originals = {name: getattr(module, name) for name in attributes}
+    for name, value in attributes.items():
+        setattr(module, name, value)
+    try:
+        yield
+    finally:
+        for name, value in originals.items():
+            setattr(module, name, value)
+
+
+def measure(function, repeat, setup=None):
+    """
+    Time a function.
+
+    Args:
+        function: Function to time
+        repeat: Number of runs
+        setup: Optional untimed function run before each run, whose result is
+            passed to `function` (e.g. fresh copies of inputs it mutates)
+
+    Returns:
+        Dict of min, median, mean and max seconds over `repeat` runs
+    """
+    timings = []
+    for _ in range(repeat):
+        args = (setup(),) if setup is not None else ()
+        start = time.perf_counter()
+        function(*args)
+        timings.append(time.perf_counter() - start)
+    return {
+        "runs": repeat,
+        "min": min(timings),
+        "median": statistics.median(timings),
+        "mean": statistics.fmean(timings),
+        "max": max(timings)
+    }
+
+
+def merge_function():
+    """Get GmailPDFScanner.merge_events_with_existing, or None if the scanner cannot be imported."""
+    try:
+        from gmail_pdf_event_scanner import GmailPDFScanner
+    except ImportError as e:
+        logger.warning(f"Skipping merge benchmark: {e}")
+        return None
+    return GmailPDFScanner.merge_events_with_existing
+
+
+def parse_importtime(stderr):
+    """
+    Parse `python -X importtime` output.
+
+    Returns:
+        Dict of module -> cumulative microseconds
+    """
+    cumulative = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, total, module = line[len("import time:"):].split("|")
+        cumulative[module.strip()] = int(total)
+    return cumulative
+
+
+def measure_import(module, repeat):
+    """
+    Time importing a module in a fresh interpreter.
+
+    Returns:
+        measure()-style dict, plus the module's cumulative import time and
+        its heaviest imports from -X importtime
+    """
+    result = measure(lambda: subprocess.run([sys.executable, "-c", f"import {module}"],
+                                            cwd=SCRIPT_DIR, check=True), repeat)
+    profile = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                             cwd=SCRIPT_DIR, capture_output=True, text=True, check=True)
+    cumulative = parse_importtime(profile.stderr)
+    result["cumulative_us"] = cumulative.get(module)
+    result["heaviest"] = sorted(((name, us) for name, us in cumulative.items() if name != module),
+                                key=lambda item: item[1], reverse=True)[:HEAVIEST_IMPORTS]
+    return result
+
+
+def run_benchmarks(schools, children, years, repeat=DEFAULT_REPEAT, seed=0, pdf_dir=None):
+    """
+    Generate the synthetic data and run every benchmark.
+
+    Returns:
+        Results dict (see module docstring)
+    """
+    events = generate_events(schools, children, years, seed)
+    activities = generate_activities(children, seed)
+    records = build_events(events)
+    today = update_calendar_data.get_current_date()
+    results = {}
+
+    results["create_calendar_days"] = measure(
+        lambda: update_calendar_data.create_calendar_days(records, today.month, today.year), repeat)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Offline forecasts, so network latency stays out of the timings
+        weather = WeatherService(FixtureProvider(None), cache_path=Path(tmp) / "weather_cache.json")
+        # An empty notice store of its own, so the real notices.json is never pruned or saved
+        notice_store = partial(notices.NoticeStore, Path(tmp) / "notices.json")
+        with patched(update_calendar_data, get_events=lambda: [dict(e) for e in events],
+                     get_child_activities=lambda name: activities[name], _weather_service=weather), \
+                patched(notices, NoticeStore=notice_store):
+            results["create_json_structure"] = measure(update_calendar_data.create_json_structure, repeat)
+            data = update_calendar_data.create_json_structure()
+
+    results["validate_json_structure"] = measure(lambda: update_calendar_data.validate_json_structure(data), repeat)
+
+    merge = merge_function()
+    if merge is None:
+        results["merge_events_with_existing"] = {"skipped": "gmail_pdf_event_scanner could not be imported"}
+    else:
+        existing = events[::2]
+        new_events = events[1::2] + existing[::4]
+        # Merging normalises the event dicts in place, so every run gets fresh copies
+        results["merge_events_with_existing"] = measure(
+            lambda inputs: merge(SimpleNamespace(extracted_events=inputs[0], search_index=SearchIndex()), inputs[1]),
+            repeat, setup=lambda: copy.deepcopy((existing, new_events)))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path = Path(tmp) / "school_calendar_data.json"
+        results["save_json_to_file"] = measure(lambda: update_calendar_data.save_json_to_file(data, json_path), repeat)
+
+        # Read path: json.load of the events against the mmapped archive
+        events_path = Path(tmp) / "events.json"
+        with open(events_path, 'w') as f:
+            json.dump(events, f)
+        archive_path = Path(tmp) / "events.bin"
+        write_archive(records, archive_path)
+        month_start = date(today.year, today.month, 1).toordinal()
+
+        def load_events_json():
+            with open(events_path, 'r') as f:
+                return build_events(json.load(f))
+
+        def archive_month():
+            with EventArchive(archive_path) as archive:
+                return archive.events_in_range(month_start, month_start + 30)
+
+        results["load_events_json"] = measure(load_events_json, repeat)
+        results["event_archive_month"] = measure(archive_month, repeat)
+
+    text = diary_text(events)
+    results["extract_events_with_rules"] = measure(lambda: extract_events_with_rules(text), repeat)
+
+    if pdf_dir:
+        pdf_paths = generate_pdfs(events, pdf_dir, schools)
+        backend = get_backend()
+        if backend is None:
+            results["extract_text_from_pdf"] = {"skipped": "no PDF text backend installed"}
+        else:
+            results["extract_text_from_pdf"] = measure(
+                lambda: [list(iter_pdf_pages(path, backend)) for path in pdf_paths], repeat)
+            results["extract_text_from_pdf"]["backend"] = backend.name
+
+    results["python_startup"] = measure(lambda: subprocess.run([sys.executable, "-c", "pass"], check=True), repeat)
+    for module in IMPORT_MODULES:
+        results[f"import_{module}"] = measure_import(module, repeat)
+
+    return {
+        "meta": {
+            "generated": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "scale": {"schools": schools, "children": children, "years": years},
+            "events": len(events),
+            "seed": seed
+        },
+        "results": results
+    }
+
+
+def compare_results(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """
+    Compare median timings with a baseline results dict.
+
+    Returns:
+        List of (benchmark, baseline median, median, ratio) for benchmarks
+        slower than the baseline by more than the tolerance
+    """
+    regressions = []
+    for name, result in results["results"].items():
+        previous = baseline.get("results", {}).get(name, {})
+        if "median" not in result or not previous.get("median"):
+            continue
+        ratio = result["median"] / previous["median"]
+        logger.info(f"{name}: {previous['median']:.6f}s -> {result['median']:.6f}s ({ratio:.2f}x)")
+        if ratio > 1 + tolerance:
+            regressions.append((name, previous["median"], result["median"], ratio))
+    if results["meta"]["scale"] != baseline.get("meta", {}).get("scale"):
+        logger.warning("Baseline was recorded at a different scale; comparison is not like for like")
+    return regressions
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Benchmark the calendar pipeline on synthetic school data")
+    parser.add_argument("--schools", type=int, default=1, help="Number of synthetic schools")
+    parser.add_argument("--children", type=int, default=2, help="Children per school")
+    parser.add_argument("--years", type=int, default=1, help="Academic years of events")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="Runs per benchmark")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for the generator")
+    parser.add_argument("--pdf-dir", help="Write fake diary PDFs here and benchmark text extraction")
+    parser.add_argument("--output", help="Write the JSON results to this file instead of stdout")
+    parser.add_argument("--baseline", help="Previous results file to compare against")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="Allowed slowdown against the baseline (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    # Keep per-event log lines out of the timings
+    logging.getLogger().setLevel(logging.WARNING)
+    logger.setLevel(logging.INFO)
+
+    results = run_benchmarks(args.schools, args.children, args.years, args.repeat, args.seed, args.pdf_dir)
+    output = json.dumps(results, indent=2)
+    if args.output:
+        Path(args.output).write_text(output + "\n")
+        logger.info(f"Wrote benchmark results to {args.output}")
+    else:
+        print(output)
+
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f)
+        regressions = compare_results(results, baseline, args.tolerance)
+        for name, before, after, ratio in regressions:
+            logger.error(f"Regression in {name}: {before:.6f}s -> {after:.6f}s ({ratio:.2f}x)")
+        return not regressions
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
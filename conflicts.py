@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Schedule Conflicts
+==================
+
+Detects clashes in each child's day: weekly activities, timed events and
+pickups, plus sibling pickups at different gates that overlap. Sibling
+pickups that repeat at the same times and gates (the regular schedule) are
+reported once, with every date they fall on.
+
+Every timed item becomes an interval of absolute minutes (date ordinal * 1440
++ minutes after midnight). Each child gets an interval tree over those
+intervals, so the conflicts in any date range, from one day to a whole
+school year, are found in O(log n + k) per lookup.
+"""
+
+import logging
+from datetime import date
+
+from time_parsing import event_minutes, format_minutes, parse_clock
+
+logger = logging.getLogger("conflicts")
+
+MINUTES_PER_DAY = 24 * 60
+# How long a pickup takes at the gate
+PICKUP_WINDOW_MINUTES = 10
+
+
+class Interval:
+    """A timed item in a child's schedule."""
+
+    __slots__ = ("start", "end", "child", "kind", "title", "gate")
+
+    def __init__(self, start, end, child, kind, title, gate=None):
+        self.start = start
+        self.end = end
+        self.child = child
+        self.kind = kind
+        self.title = title
+        self.gate = gate
+
+    @property
+    def day(self):
+        """The date of the interval."""
+        return date.fromordinal(self.start // MINUTES_PER_DAY)
+
+    def to_dict(self):
+        """Convert to the document's conflict item format."""
+        item = {
+            "kind": self.kind,
+            "title": self.title,
+            "child": self.child,
+            "time": f"{format_minutes(self.start)} - {format_minutes(self.end)}"
+        }
+        if self.gate:
+            item["gate"] = self.gate
+        return item
+
+
+class IntervalTree:
+    """
+    Static augmented interval tree.
+
+    Intervals are kept sorted by start in an array that is read as an implicit
+    balanced binary search tree (the middle of each range is its root); each
+    node stores the largest end in its subtree, so whole subtrees that end
+    before a query starts are skipped.
+    """
+
+    def __init__(self, intervals):
+        self.intervals = sorted(intervals, key=lambda iv: (iv.start, iv.end))
+        self.max_end = [0] * len(self.intervals)
+        self._build(0, len(self.intervals))
+
+    def __len__(self):
+        return len(self.intervals)
+
+    def _build(self, lo, hi):
+        if lo >= hi:
+            return 0
+        mid = (lo + hi) // 2
+        self.max_end[mid] = max(self.intervals[mid].end, self._build(lo, mid), self._build(mid + 1, hi))
+        return self.max_end[mid]
+
+    def overlapping(self, start, end):
+        """Get the intervals overlapping [start, end), in start order."""
+        found = []
+        self._query(0, len(self.intervals), start, end, found)
+        return found
+
+    def _query(self, lo, hi, start, end, found):
+        if lo >= hi:
+            return
+        mid = (lo + hi) // 2
+        # Nothing in this subtree ends after the query starts
+        if self.max_end[mid] <= start:
+            return
+        self._query(lo, mid, start, end, found)
+        interval = self.intervals[mid]
+        # Everything from here to the right starts after the query ends
+        if interval.start >= end:
+            return
+        if interval.end > start:
+            found.append(interval)
+        self._query(mid + 1, hi, start, end, found)
+
+
+class ConflictIndex:
+    """Per-child interval trees of activities, events and pickups."""
+
+    def __init__(self):
+        self.pending = {}
+        self.trees = {}
+
+    def add(self, child, day, start, end, kind, title, gate=None):
+        """
+        Add a timed item to a child's schedule.
+
+        Args:
+            child: Child name
+            day: date
+            start: Minutes after midnight
+            end: Minutes after midnight
+            kind: "activity", "event" or "pickup"
+            title: Title to report
+            gate: Pickup gate (pickups only)
+        """
+        offset = day.toordinal() * MINUTES_PER_DAY
+        self.pending.setdefault(child, []).append(Interval(offset + start, offset + end, child, kind, title, gate))
+        self.trees.pop(child, None)
+
+    def add_event(self, event):
+        """Add a timed event dict for each of its children. Returns False for untimed events."""
+        start, end = event_minutes(event)
+        if start is None or end is None:
+            return False
+        day = date(event["year"], event["month"], event["date"])
+        for child in event["children"]:
+            self.add(child, day, start, end, "event", event["title"])
+        return True
+
+    def add_activity(self, child, day, activity):
+        """Add one occurrence of a weekly activity ({"title", "time", ...})."""
+        start, end = event_minutes(activity)
+        if start is None or end is None:
+            return False
+        self.add(child, day, start, end, "activity", activity["title"])
+        return True
+
+    def add_pickup(self, child, day, time_text, gate):
+        """Add a pickup at a gate, e.g. ("Leo", date, "3:40 PM", "West Gate")."""
+        minutes = parse_clock(time_text)
+        if minutes is None:
+            return False
+        self.add(child, day, minutes, minutes + PICKUP_WINDOW_MINUTES, "pickup", f"Pickup at {gate}", gate)
+        return True
+
+    def tree(self, child):
+        """Get a child's interval tree, building it on first use."""
+        if child not in self.trees:
+            self.trees[child] = IntervalTree(self.pending.get(child, []))
+        return self.trees[child]
+
+    def conflicts(self, start, end):
+        """
+        Find conflicts between two dates (inclusive).
+
+        Returns:
+            List of {"date", "type", "children", "items"} dicts in date order, where
+            type is "overlap" (two items in one child's day) or "sibling-pickup"
+            (pickups at different gates at the same time). Sibling pickups with
+            the same children, gates and times are merged into one entry on
+            their first date, with all their dates in "dates".
+        """
+        lo = start.toordinal() * MINUTES_PER_DAY
+        hi = (end.toordinal() + 1) * MINUTES_PER_DAY
+        conflicts = []
+        pickups = []
+
+        for child in sorted(self.pending):
+            tree = self.tree(child)
+            for interval in tree.overlapping(lo, hi):
+                if interval.kind == "pickup":
+                    pickups.append(interval)
+                for other in tree.overlapping(interval.start, interval.end):
+                    # Report each pair once, from its earlier interval
+                    if (other.start, other.end, id(other)) <= (interval.start, interval.end, id(interval)):
+                        continue
+                    conflicts.append((interval, other, "overlap"))
+
+        # Sibling pickups: one adult cannot be at two gates at once
+        if pickups:
+            pickup_tree = IntervalTree(pickups)
+            for interval in pickup_tree.intervals:
+                for other in pickup_tree.overlapping(interval.start, interval.end):
+                    if other.child <= interval.child or other.gate == interval.gate:
+                        continue
+                    conflicts.append((interval, other, "sibling-pickup"))
+
+        conflicts.sort(key=lambda c: (c[0].start, c[2], c[0].child))
+        results = []
+        recurring = {}
+        for first, second, conflict_type in conflicts:
+            items = [first.to_dict(), second.to_dict()]
+            if conflict_type == "sibling-pickup":
+                key = tuple(tuple(sorted(item.items())) for item in items)
+                if key in recurring:
+                    recurring[key]["dates"].append(first.day.isoformat())
+                    continue
+            result = {
+                "date": first.day.isoformat(),
+                "type": conflict_type,
+                "children": sorted({first.child, second.child}),
+                "items": items
+            }
+            if conflict_type == "sibling-pickup":
+                result["dates"] = [result["date"]]
+                recurring[key] = result
+            results.append(result)
+        return results
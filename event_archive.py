@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Binary Event Archive
+====================
+
+A fixed-width binary file of events for the read path. Readers mmap it
+instead of running json.load over years of history, so opening it costs a
+header read, range queries are binary searches over the records, and every
+process reading the archive shares the same page-cache memory.
+
+Layout (little-endian):
+- Header: magic, version, counts, and the offsets of the string index and
+  string data
+- Name tables: string IDs of the event type names and child names, in id and
+  bit order, so type ids and child bitmasks stay meaningful across processes
+- Records: one fixed-width record per event, sorted by date ordinal then
+  start time (see event_model.Event.sort_key), holding the ordinal, type id,
+  start/end minutes, children bitmask and string IDs for the title, time,
+  description and location
+- String index: (offset, length) per string
+- String data: UTF-8 strings, each distinct string stored once
+"""
+
+import argparse
+import json
+import logging
+import mmap
+import os
+import struct
+import sys
+from bisect import bisect_left, bisect_right
+from datetime import date
+from functools import lru_cache
+from pathlib import Path
+
+from event_model import CHILDREN, EVENT_TYPES, Event, build_events, children_mask, type_id
+
+logger = logging.getLogger("event_archive")
+
+SCRIPT_DIR = Path(__file__).parent
+EVENT_ARCHIVE_FILE = SCRIPT_DIR / "events.bin"
+
+MAGIC = b"SCEA"
+ARCHIVE_VERSION = 1
+# magic, version, reserved, records, strings, type names, child names, string index offset, string data offset
+HEADER = struct.Struct("<4sHHIIIIQQ")
+NAME_ID = struct.Struct("<I")
+# ordinal, type id, start minute, end minute, children mask, title, time, description, location
+RECORD = struct.Struct("<IHhhIIIII")
+ORDINAL = struct.Struct("<I")
+STRING_ENTRY = struct.Struct("<II")
+# Stored for a missing start or end time
+NO_MINUTE = -1
+STRING_CACHE_SIZE = 4096
+
+
+class ArchiveFormatError(Exception):
+    """Raised when a file is not a readable event archive."""
+
+
+def write_archive(events, path=EVENT_ARCHIVE_FILE):
+    """
+    Write Event records to an archive file atomically.
+
+    Args:
+        events: Iterable of Event records (see event_model.build_events)
+        path: Archive file to write
+
+    Returns:
+        True if successful, False otherwise
+    """
+    path = Path(path)
+    try:
+        events = sorted(events, key=lambda e: e.sort_key)
+        strings = {}
+
+        def string_id(text):
+            if text not in strings:
+                strings[text] = len(strings)
+            return strings[text]
+
+        names = [string_id(name) for name in EVENT_TYPES] + [string_id(name) for name in CHILDREN]
+        records = bytearray()
+        for event in events:
+            records += RECORD.pack(
+                event.ordinal,
+                event.type_id,
+                NO_MINUTE if event.start_minute is None else event.start_minute,
+                NO_MINUTE if event.end_minute is None else event.end_minute,
+                event.children_mask,
+                string_id(event.title),
+                string_id(event.time),
+                string_id(event.description),
+                string_id(event.location)
+            )
+
+        string_index = bytearray()
+        string_data = bytearray()
+        for text in strings:
+            encoded = text.encode("utf-8")
+            string_index += STRING_ENTRY.pack(len(string_data), len(encoded))
+            string_data += encoded
+
+        index_offset = HEADER.size + NAME_ID.size * len(names) + len(records)
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, ARCHIVE_VERSION, 0, len(events), len(strings), len(EVENT_TYPES),
+                                len(CHILDREN), index_offset, index_offset + len(string_index)))
+            for name in names:
+                f.write(NAME_ID.pack(name))
+            f.write(records)
+            f.write(string_index)
+            f.write(string_data)
+        os.replace(tmp_path, path)
+        logger.info(f"Wrote {len(events)} events and {len(strings)} strings to {path}")
+        return True
+    except Exception as e:
+        logger.error(f"Error writing event archive {path}: {e}")
+        return False
+
+
+class EventArchive:
+    """Read-only, memory-mapped view of an event archive."""
+
+    def __init__(self, path=EVENT_ARCHIVE_FILE):
+        """
+        Map an archive file.
+
+        Raises:
+            OSError: If the file cannot be opened
+            ArchiveFormatError: If it is not a supported archive
+        """
+        self.path = Path(path)
+        with open(self.path, 'rb') as f:
+            self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self.mm) < HEADER.size:
+            self.close()
+            raise ArchiveFormatError(f"{self.path} is too short to be an event archive")
+        (magic, version, _, self.record_count, self.string_count, type_count, child_count,
+         self.index_offset, self.data_offset) = HEADER.unpack_from(self.mm, 0)
+        if magic != MAGIC or version != ARCHIVE_VERSION:
+            self.close()
+            raise ArchiveFormatError(f"{self.path} is not a version {ARCHIVE_VERSION} event archive")
+
+        self.string = lru_cache(maxsize=STRING_CACHE_SIZE)(self._string)
+        name_ids = [NAME_ID.unpack_from(self.mm, HEADER.size + NAME_ID.size * i)[0]
+                    for i in range(type_count + child_count)]
+        self.records_offset = HEADER.size + NAME_ID.size * len(name_ids)
+        # Map the writer's type ids and child bits to this process's
+        self.type_ids = [type_id(self.string(i)) for i in name_ids[:type_count]]
+        self.child_names = [self.string(i) for i in name_ids[type_count:]]
+        self._masks = {}
+
+    def __len__(self):
+        return self.record_count
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Unmap the file."""
+        self.mm.close()
+
+    def _string(self, string_id):
+        offset, length = STRING_ENTRY.unpack_from(self.mm, self.index_offset + STRING_ENTRY.size * string_id)
+        start = self.data_offset + offset
+        return self.mm[start:start + length].decode("utf-8")
+
+    def _mask(self, archive_mask):
+        mask = self._masks.get(archive_mask)
+        if mask is None:
+            mask = self._masks[archive_mask] = children_mask(
+                name for bit, name in enumerate(self.child_names) if archive_mask & (1 << bit))
+        return mask
+
+    def ordinal(self, position):
+        """Get the date ordinal of the record at a position, without decoding the rest."""
+        return ORDINAL.unpack_from(self.mm, self.records_offset + RECORD.size * position)[0]
+
+    def event(self, position):
+        """Decode the record at a position into an Event."""
+        (ordinal, archive_type, start, end, archive_mask,
+         title, time_text, description, location) = RECORD.unpack_from(self.mm, self.records_offset + RECORD.size * position)
+        return Event(
+            ordinal,
+            self.type_ids[archive_type],
+            self._mask(archive_mask),
+            self.string(title),
+            self.string(time_text),
+            self.string(description),
+            self.string(location),
+            None if start == NO_MINUTE else start,
+            None if end == NO_MINUTE else end
+        )
+
+    def bounds(self, start_ordinal, end_ordinal):
+        """
+        Binary-search the record positions between two date ordinals (inclusive).
+
+        Returns:
+            Tuple of (first position, position after the last)
+        """
+        lo = bisect_left(range(self.record_count), start_ordinal, key=self.ordinal)
+        hi = bisect_right(range(self.record_count), end_ordinal, lo=lo, key=self.ordinal)
+        return lo, hi
+
+    def events_in_range(self, start_ordinal, end_ordinal):
+        """Get the Events between two date ordinals (inclusive), in date and start time order."""
+        lo, hi = self.bounds(start_ordinal, end_ordinal)
+        return [self.event(position) for position in range(lo, hi)]
+
+    def count_in_range(self, start_ordinal, end_ordinal):
+        """Count the events between two date ordinals (inclusive) without decoding them."""
+        lo, hi = self.bounds(start_ordinal, end_ordinal)
+        return hi - lo
+
+    def __iter__(self):
+        for position in range(self.record_count):
+            yield self.event(position)
+
+
+def main():
+    """Build an archive from a calendar JSON file, or query one by date range."""
+    parser = argparse.ArgumentParser(description="Build or query the binary event archive")
+    parser.add_argument("--archive", default=EVENT_ARCHIVE_FILE, help="Archive file")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build", help="Build the archive from event JSON")
+    build.add_argument("source", help="school_calendar_data.json or an events list such as ai_extracted_events.json")
+    query = commands.add_parser("query", help="Print the events between two dates")
+    query.add_argument("start", type=date.fromisoformat, help="First date (YYYY-MM-DD)")
+    query.add_argument("end", type=date.fromisoformat, help="Last date (YYYY-MM-DD)")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    if args.command == "build":
+        with open(args.source, 'r') as f:
+            data = json.load(f)
+        return write_archive(build_events(data["events"] if isinstance(data, dict) else data), args.archive)
+
+    with EventArchive(args.archive) as archive:
+        for event in archive.events_in_range(args.start.toordinal(), args.end.toordinal()):
+            print(f"{event.date.isoformat()}  {event.time:<20}  {event.title}  ({', '.join(event.children)})")
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
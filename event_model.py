@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Compact Event Model
+===================
+
+In-memory event records for the school calendar.
+
+Events arrive as plain dicts (from get_events() in update_calendar_data.py or
+from ai_extracted_events.json). This module turns them into compact Event
+records that store:
+- the date as an integer ordinal (date.toordinal())
+- the event type as an interned integer id
+- the children as a bitmask
+- the start and end times as minutes after midnight (see time_parsing.py)
+
+Per-child and per-type filters then become integer comparisons instead of
+string and list scans, and events on the same day sort by start time.
+"""
+
+import json
+import sys
+from bisect import bisect_left, bisect_right
+from datetime import date
+from pathlib import Path
+
+from time_parsing import END_FIELD, START_FIELD, event_minutes
+
+SCRIPT_DIR = Path(__file__).parent
+AI_EXTRACTED_EVENTS_FILE = SCRIPT_DIR / "ai_extracted_events.json"
+
+# Known children, in bit order (Leo = bit 0, Novah = bit 1)
+CHILDREN = ["Leo", "Novah"]
+
+# Known event types, in id order (matches the types used in the AI prompt)
+EVENT_TYPES = [
+    "Assembly",
+    "Celebration",
+    "Activity",
+    "Special Day",
+    "Academic",
+    "School Trip",
+    "Closure",
+    "Holiday",
+    "Special Week",
+    "Term End",
+    "Exhibition"
+]
+
+_child_bits = {name: 1 << i for i, name in enumerate(CHILDREN)}
+_type_ids = {name: i for i, name in enumerate(EVENT_TYPES)}
+
+
+def child_bit(child_name):
+    """Get the bitmask bit for a child, registering unknown children."""
+    bit = _child_bits.get(child_name)
+    if bit is None:
+        bit = 1 << len(CHILDREN)
+        CHILDREN.append(child_name)
+        _child_bits[child_name] = bit
+    return bit
+
+
+def children_mask(child_names):
+    """Convert a list of child names to a bitmask."""
+    mask = 0
+    for name in child_names:
+        mask |= child_bit(name)
+    return mask
+
+
+def children_from_mask(mask):
+    """Convert a bitmask back to a list of child names (in CHILDREN order)."""
+    return [name for i, name in enumerate(CHILDREN) if mask & (1 << i)]
+
+
+def type_id(type_name):
+    """Get the interned id for an event type, registering unknown types."""
+    tid = _type_ids.get(type_name)
+    if tid is None:
+        tid = len(EVENT_TYPES)
+        EVENT_TYPES.append(type_name)
+        _type_ids[type_name] = tid
+    return tid
+
+
+def type_name(tid):
+    """Get the event type name for an interned id."""
+    return EVENT_TYPES[tid]
+
+
+def event_signature(event):
+    """Get the duplicate-detection signature of an event dict (as used when merging)."""
+    return f"{event['date']}-{event['month']}-{event['year']}-{event['title']}"
+
+
+class Event:
+    """A single calendar event with integer date, type and children fields."""
+
+    __slots__ = ("ordinal", "type_id", "children_mask", "title", "time", "description", "location",
+                 "start_minute", "end_minute")
+
+    def __init__(self, ordinal, type_id, children_mask, title, time="All Day", description="", location="School",
+                 start_minute=None, end_minute=None):
+        self.ordinal = ordinal
+        self.type_id = type_id
+        self.children_mask = children_mask
+        self.title = title
+        self.time = sys.intern(time)
+        self.description = description
+        self.location = sys.intern(location)
+        self.start_minute = start_minute
+        self.end_minute = end_minute
+
+    @classmethod
+    def from_dict(cls, event):
+        """Build an Event from a calendar event dict."""
+        return cls(
+            date(event["year"], event["month"], event["date"]).toordinal(),
+            type_id(event.get("type", "")),
+            children_mask(event.get("children", [])),
+            event["title"],
+            event.get("time", "All Day"),
+            event.get("description", ""),
+            event.get("location", "School"),
+            *event_minutes(event)
+        )
+
+    @property
+    def date(self):
+        """The event date as a datetime.date."""
+        return date.fromordinal(self.ordinal)
+
+    @property
+    def sort_key(self):
+        """Order by date, then start time, with all-day events first."""
+        return (self.ordinal, -1 if self.start_minute is None else self.start_minute)
+
+    @property
+    def type(self):
+        """The event type name."""
+        return EVENT_TYPES[self.type_id]
+
+    @property
+    def children(self):
+        """The children attending, as a list of names."""
+        return children_from_mask(self.children_mask)
+
+    def has_child(self, child_name):
+        """Check whether a child attends this event."""
+        return bool(self.children_mask & _child_bits.get(child_name, 0))
+
+    def to_dict(self):
+        """Convert back to the calendar event dict format (with start/end minutes when known)."""
+        event_date = self.date
+        event = {
+            "date": event_date.day,
+            "month": event_date.month,
+            "year": event_date.year,
+            "title": self.title,
+            "time": self.time,
+            "description": self.description,
+            "location": self.location,
+            "type": self.type,
+            "children": self.children
+        }
+        if self.start_minute is not None:
+            event[START_FIELD] = self.start_minute
+        if self.end_minute is not None:
+            event[END_FIELD] = self.end_minute
+        return event
+
+    def __repr__(self):
+        return f"Event({self.date.isoformat()}, {self.title!r}, {self.type!r}, {self.children!r})"
+
+
+def build_events(event_dicts):
+    """Build a list of Event records sorted by date ordinal, then start time."""
+    events = [Event.from_dict(event) for event in event_dicts]
+    events.sort(key=lambda e: e.sort_key)
+    return events
+
+
+def load_ai_extracted_events(path=AI_EXTRACTED_EVENTS_FILE):
+    """Load ai_extracted_events.json as Event records."""
+    with open(path, 'r') as f:
+        return build_events(json.load(f))
+
+
+def events_in_range(events, start_ordinal, end_ordinal):
+    """
+    Get the events between two date ordinals (inclusive).
+
+    Args:
+        events: List of Event records sorted by ordinal (see build_events)
+        start_ordinal: First date ordinal to include
+        end_ordinal: Last date ordinal to include
+
+    Returns:
+        Slice of events in the range
+    """
+    lo = bisect_left(events, start_ordinal, key=lambda e: e.ordinal)
+    hi = bisect_right(events, end_ordinal, lo=lo, key=lambda e: e.ordinal)
+    return events[lo:hi]
+
+
+def next_events(events, now, limit=None):
+    """
+    Get the events starting at or after a moment, soonest first.
+
+    Today's all-day events count as already started.
+
+    Args:
+        events: List of Event records sorted by build_events
+        now: datetime.datetime
+        limit: Maximum number of events
+
+    Returns:
+        List of Event records
+    """
+    key = (now.date().toordinal(), now.hour * 60 + now.minute)
+    lo = bisect_left(events, key, key=lambda e: e.sort_key)
+    return events[lo:] if limit is None else events[lo:lo + limit]
+
+
+def filter_events(events, child=None, event_type=None):
+    """
+    Filter events by child and/or event type.
+
+    Args:
+        events: Iterable of Event records
+        child: Optional child name (e.g. "Leo")
+        event_type: Optional event type name (e.g. "Assembly")
+
+    Returns:
+        List of matching events
+    """
+    mask = _child_bits.get(child, 0) if child is not None else 0
+    tid = _type_ids.get(event_type, -1) if event_type is not None else None
+
+    if child is not None and not mask:
+        return []
+    if tid == -1:
+        return []
+
+    return [
+        e for e in events
+        if (not mask or e.children_mask & mask) and (tid is None or e.type_id == tid)
+    ]
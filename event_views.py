@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Filtered Event Views
+====================
+
+Secondary indexes over the event store, by child and by event type.
+
+The app filters events on the device (settings.filterSetting) over the full
+events array. EventIndex answers the same filters server-side:
+- view(child="Leo") returns only Leo's events
+- view(event_type="Assembly") returns only assemblies
+- view(child="Leo", event_type="Assembly") intersects the two
+
+Posting lists are built lazily the first time a child or type is requested,
+and write_view_shards() emits every view as its own JSON file so each client
+can download only its own slice.
+"""
+
+import json
+import logging
+import re
+from pathlib import Path
+
+from event_model import CHILDREN, EVENT_TYPES, child_bit, type_id
+
+logger = logging.getLogger("event_views")
+
+VIEWS_DIR_NAME = "views"
+
+
+def view_slug(name):
+    """Convert a child or type name to a file-name friendly slug."""
+    return re.sub(r'[^a-z0-9]+', '-', name.lower()).strip('-')
+
+
+def shard_filename(kind, name, used):
+    """
+    Get a unique shard file name for a view.
+
+    Names that slug the same ("Open Day" and "Open-Day") get a numeric suffix
+    in the order they are written.
+
+    Args:
+        kind: "child" or "type"
+        name: Child or type name
+        used: Set of file names already taken (updated in place)
+
+    Returns:
+        File name such as "type-open-day.json" or "type-open-day-2.json"
+    """
+    stem = f"{kind}-{view_slug(name) or 'view'}"
+    filename = f"{stem}.json"
+    suffix = 2
+    while filename in used:
+        filename = f"{stem}-{suffix}.json"
+        suffix += 1
+    used.add(filename)
+    return filename
+
+
+class EventIndex:
+    """Lazily built per-child and per-type indexes over a list of Event records."""
+
+    def __init__(self, events):
+        """
+        Initialize the index.
+
+        Args:
+            events: List of Event records sorted by ordinal (see event_model.build_events)
+        """
+        self.events = events
+        self._by_child = {}
+        self._by_type = {}
+        self._views = {}
+
+    def child_positions(self, child_name):
+        """Get the positions of events attended by a child."""
+        positions = self._by_child.get(child_name)
+        if positions is None:
+            bit = child_bit(child_name)
+            positions = [i for i, e in enumerate(self.events) if e.children_mask & bit]
+            self._by_child[child_name] = positions
+        return positions
+
+    def type_positions(self, event_type):
+        """Get the positions of events of a given type."""
+        positions = self._by_type.get(event_type)
+        if positions is None:
+            tid = type_id(event_type)
+            positions = [i for i, e in enumerate(self.events) if e.type_id == tid]
+            self._by_type[event_type] = positions
+        return positions
+
+    def view(self, child=None, event_type=None):
+        """
+        Get the events matching a child and/or event type as calendar dicts.
+
+        Args:
+            child: Optional child name
+            event_type: Optional event type name
+
+        Returns:
+            List of event dicts in date order
+        """
+        key = (child, event_type)
+        if key in self._views:
+            return self._views[key]
+
+        if child is None and event_type is None:
+            positions = range(len(self.events))
+        elif event_type is None:
+            positions = self.child_positions(child)
+        elif child is None:
+            positions = self.type_positions(event_type)
+        else:
+            type_set = set(self.type_positions(event_type))
+            positions = [i for i in self.child_positions(child) if i in type_set]
+
+        events = [self.events[i].to_dict() for i in positions]
+        self._views[key] = events
+        return events
+
+    def children(self):
+        """Get the children that appear in at least one event."""
+        return [name for name in CHILDREN if self.child_positions(name)]
+
+    def event_types(self):
+        """Get the event types that appear in at least one event."""
+        return [name for name in EVENT_TYPES if self.type_positions(name)]
+
+
+def write_view_shards(index, output_dir, generated=None):
+    """
+    Write each per-child and per-type view as a separate JSON shard.
+
+    Writes <output_dir>/child-<name>.json, <output_dir>/type-<name>.json and a
+    manifest at <output_dir>/index.json listing the shards. View shards left
+    over from earlier runs that are not in the new manifest are deleted.
+
+    Args:
+        index: EventIndex to emit
+        output_dir: Directory to write the shards into
+        generated: Optional generation timestamp to stamp into each shard
+
+    Returns:
+        True if all shards were written, False otherwise
+    """
+    output_dir = Path(output_dir)
+    try:
+        output_dir.mkdir(exist_ok=True)
+        manifest = {"generated": generated, "children": {}, "types": {}}
+
+        shards = [("child", name, {"child": name}) for name in index.children()]
+        shards += [("type", name, {"event_type": name}) for name in index.event_types()]
+
+        written = set()
+        for kind, name, view_filter in shards:
+            filename = shard_filename(kind, name, written)
+            events = index.view(**view_filter)
+            with open(output_dir / filename, 'w') as f:
+                json.dump({"generated": generated, "filter": {kind: name}, "events": events}, f, indent=2)
+            manifest["children" if kind == "child" else "types"][name] = {
+                "file": filename,
+                "count": len(events)
+            }
+
+        with open(output_dir / "index.json", 'w') as f:
+            json.dump(manifest, f, indent=2)
+
+        # Remove shards for children and types that no longer have events, once
+        # the manifest no longer lists them
+        stale = [path for path in output_dir.glob("*.json")
+                 if path.name.startswith(("child-", "type-")) and path.name not in written]
+        for path in stale:
+            path.unlink()
+
+        logger.info(f"Wrote {len(shards)} event view shards to {output_dir} ({len(stale)} stale shards removed)")
+        return True
+    except Exception as e:
+        logger.error(f"Error writing event view shards to {output_dir}: {e}")
+        return False
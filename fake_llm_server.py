@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Fake LLM Server
+===============
+
+A local stand-in for the OpenAI chat completions API, for testing ingestion
+without an API key and for injecting failures.
+
+It answers POST /v1/chat/completions (streaming and non-streaming) in the
+batch format used by llm_batch.py, extracting events from each document with
+the rule-based extractor. Failures can be injected by pattern or at random:
+
+    python3 fake_llm_server.py --port 8765 --fail-pattern 429,500,ok
+    python3 fake_llm_server.py --port 8765 --fail-rate 0.3 --fail-status 503
+
+Point the scanner at it with:
+
+    OPENAI_BASE_URL=http://127.0.0.1:8765/v1 OPENAI_API_KEY=test python3 gmail_pdf_event_scanner.py
+"""
+
+import argparse
+import itertools
+import json
+import random
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from rule_extractor import extract_events_with_rules
+
+# Matches the headers written by llm_batch.build_batch_prompt: "=== DOCUMENT {doc_id} ({filename}) ==="
+DOCUMENT_HEADER_PATTERN = re.compile(r'^=== DOCUMENT (.+?) \((.*)\) ===$', re.MULTILINE)
+STREAM_CHUNK_CHARS = 64
+
+
+def build_response_content(prompt):
+    """Build the structured JSON answer for a batch prompt."""
+    headers = list(DOCUMENT_HEADER_PATTERN.finditer(prompt))
+    documents = []
+    for i, header in enumerate(headers):
+        end = headers[i + 1].start() if i + 1 < len(headers) else len(prompt)
+        text = prompt[header.end():end]
+        documents.append({"id": header.group(1), "events": extract_events_with_rules(text).events})
+    return json.dumps({"documents": documents})
+
+
+class FailureInjector:
+    """Decides which requests fail, and with which status code."""
+
+    def __init__(self, pattern=None, fail_rate=0.0, fail_status=500):
+        """
+        Args:
+            pattern: Comma-separated cycle of status codes and "ok" (e.g. "429,500,ok")
+            fail_rate: Probability of failing a request when no pattern is given
+            fail_status: Status code for random failures
+        """
+        self.cycle = itertools.cycle(pattern.split(",")) if pattern else None
+        self.fail_rate = fail_rate
+        self.fail_status = fail_status
+        self.lock = threading.Lock()
+
+    def next_status(self):
+        """Get the status for the next request (200 for success)."""
+        with self.lock:
+            if self.cycle is not None:
+                step = next(self.cycle).strip()
+                return 200 if step == "ok" else int(step)
+            return self.fail_status if random.random() < self.fail_rate else 200
+
+
+class FakeLLMHandler(BaseHTTPRequestHandler):
+    """Request handler for the fake chat completions endpoint."""
+
+    injector = FailureInjector()
+    retry_after = 0
+    request_count = 0
+
+    def do_POST(self):
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self.send_error(404)
+            return
+
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        type(self).request_count += 1
+
+        status = self.injector.next_status()
+        if status != 200:
+            self.send_json(status, {"error": {"message": f"Injected failure {status}", "type": "fake_error"}},
+                           {"Retry-After": str(self.retry_after)} if status == 429 else None)
+            return
+
+        prompt = "\n".join(m.get("content", "") for m in body.get("messages", []) if m.get("role") == "user")
+        content = build_response_content(prompt)
+        completion_id = f"chatcmpl-fake-{self.request_count}"
+        created = int(time.time())
+        model = body.get("model", "fake")
+
+        if not body.get("stream"):
+            self.send_json(200, {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}]
+            })
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        for start in range(0, len(content), STREAM_CHUNK_CHARS):
+            self.send_event({
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "delta": {"content": content[start:start + STREAM_CHUNK_CHARS]}, "finish_reason": None}]
+            })
+        self.send_event({
+            "id": completion_id,
+            "object": "chat.completion.chunk",
+            "created": created,
+            "model": model,
+            "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]
+        })
+        self.wfile.write(b"data: [DONE]\n\n")
+
+    def send_json(self, status, payload, headers=None):
+        """Send a JSON response."""
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def send_event(self, payload):
+        """Send one server-sent event."""
+        self.wfile.write(f"data: {json.dumps(payload)}\n\n".encode("utf-8"))
+        self.wfile.flush()
+
+    def log_message(self, format, *args):
+        sys.stderr.write(f"fake-llm: {self.address_string()} {format % args}\n")
+
+
+def start_fake_server(host="127.0.0.1", port=0, pattern=None, fail_rate=0.0, fail_status=500, retry_after=0):
+    """
+    Start the fake server in a background thread.
+
+    Returns:
+        The running ThreadingHTTPServer (call shutdown() to stop it);
+        server.server_address gives the bound port
+    """
+    handler = type("ConfiguredFakeLLMHandler", (FakeLLMHandler,), {
+        "injector": FailureInjector(pattern, fail_rate, fail_status),
+        "retry_after": retry_after,
+        "request_count": 0
+    })
+    server = ThreadingHTTPServer((host, port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Fake OpenAI chat completions server with failure injection")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--fail-pattern", help='Cycle of status codes and "ok", e.g. "429,500,ok"')
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="Probability of a random failure")
+    parser.add_argument("--fail-status", type=int, default=500, help="Status code for random failures")
+    parser.add_argument("--retry-after", type=int, default=0, help="Retry-After seconds sent with 429s")
+    args = parser.parse_args()
+
+    server = start_fake_server(args.host, args.port, args.fail_pattern, args.fail_rate, args.fail_status, args.retry_after)
+    print(f"Fake LLM server listening on http://{args.host}:{server.server_address[1]}/v1")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Fake Push Receiver
+==================
+
+A local stand-in for a webhook subscriber, for testing push fan-out
+(push.py) without a real client. It records every batch it receives and can
+inject failures or slow responses, to exercise retries and backpressure:
+
+    python3 fake_push_receiver.py --port 8767 --fail-pattern 500,ok
+    python3 fake_push_receiver.py --port 8767 --delay 2
+
+Subscribe it with:
+
+    python3 push.py subscribe http://127.0.0.1:8767/hook --sections today,events
+"""
+
+import argparse
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from fake_llm_server import FailureInjector
+
+
+class FakePushHandler(BaseHTTPRequestHandler):
+    """Request handler that records pushed batches."""
+
+    injector = FailureInjector()
+    delay = 0
+    received = []
+    lock = threading.Lock()
+    output = None
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        if self.delay:
+            time.sleep(self.delay)
+
+        status = self.injector.next_status()
+        if status != 200:
+            self.send_error(status, f"Injected failure {status}")
+            return
+
+        with self.lock:
+            self.received.append(body)
+            if self.output:
+                with open(self.output, 'a') as f:
+                    f.write(json.dumps(body) + "\n")
+        self.send_response(204)
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        sys.stderr.write(f"fake-push: {self.address_string()} {format % args}\n")
+
+
+def start_fake_receiver(host="127.0.0.1", port=0, pattern=None, fail_rate=0.0, fail_status=500, delay=0, output=None):
+    """
+    Start the fake receiver in a background thread.
+
+    Returns:
+        The running ThreadingHTTPServer (call shutdown() to stop it);
+        server.server_address gives the bound port and server.received the
+        batches received so far
+    """
+    handler = type("ConfiguredFakePushHandler", (FakePushHandler,), {
+        "injector": FailureInjector(pattern, fail_rate, fail_status),
+        "delay": delay,
+        "received": [],
+        "lock": threading.Lock(),
+        "output": output
+    })
+    server = ThreadingHTTPServer((host, port), handler)
+    server.received = handler.received
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Fake webhook receiver for push fan-out")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8767)
+    parser.add_argument("--fail-pattern", help='Cycle of status codes and "ok", e.g. "500,ok"')
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="Probability of a random failure")
+    parser.add_argument("--fail-status", type=int, default=500, help="Status code for random failures")
+    parser.add_argument("--delay", type=float, default=0, help="Seconds to wait before answering")
+    parser.add_argument("--output", help="Append received batches to this JSON-lines file")
+    args = parser.parse_args()
+
+    server = start_fake_receiver(args.host, args.port, args.fail_pattern, args.fail_rate, args.fail_status,
+                                 args.delay, args.output)
+    print(f"Fake push receiver listening on http://{args.host}:{server.server_address[1]}/hook")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -20,26 +20,27 @@ Requirements:
 - poppler-utils for PDF text extraction
 """
 
+import argparse
 import json
 import logging
 import os
 import sys
 import re
-import base64
 import subprocess
-from datetime import datetime, timedelta
+from datetime import datetime
 from pathlib import Path
-from openai import OpenAI
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler("/home/ubuntu/school-calendar-data/gmail_scanner.log"),
-        logging.StreamHandler()
-    ]
-)
+from attachment_store import AttachmentStore
+from ingest_queue import IngestQueue
+from llm_batch import BatchDocument, BatchEventParser
+from llm_client import MAX_CONCURRENCY, RetryingLLMClient
+from mail_backends import GmailBackend, LocalMailboxBackend
+from metrics import DUPLICATES, EVENTS_ADDED, finish_run, timed
+from notices import NoticeStore, extract_notices
+from pdf_text import get_backend, iter_pdf_pages, iter_text_chunks
+from rule_extractor import RULE_CONFIDENCE_THRESHOLD, extract_events_with_rules
+from search_index import SEARCH_INDEX_FILE, SearchIndex
+from time_parsing import END_FIELD, START_FIELD, normalise_event_time
 
 logger = logging.getLogger("gmail_pdf_scanner")
 
@@ -49,17 +50,51 @@ PDF_DOWNLOAD_DIR = SCRIPT_DIR / "downloaded_pdfs"
 PROCESSED_EMAILS_FILE = SCRIPT_DIR / "processed_emails.json"
 EXTRACTED_EVENTS_FILE = SCRIPT_DIR / "extracted_events.json"
 
-# Create directories
-PDF_DOWNLOAD_DIR.mkdir(exist_ok=True)
-
 class GmailPDFScanner:
     """Scanner for Gmail emails with PDF attachments containing school events."""
     
-    def __init__(self):
-        """Initialize the Gmail PDF scanner."""
-        self.openai_client = OpenAI()  # API key from environment
+    def __init__(self, mailbox=None, pdf_backend=None):
+        """
+        Initialize the Gmail PDF scanner.
+        
+        Args:
+            mailbox: Optional MailboxBackend (defaults to the Gmail API)
+            pdf_backend: Optional PDF text backend name (defaults to the
+                first available of pypdf, pdfminer and pdftotext)
+        """
+        self.mailbox = mailbox or GmailBackend()
+        self.attachment_store = AttachmentStore(PDF_DOWNLOAD_DIR)
+        self.pdf_backend = get_backend(pdf_backend)
+        self._batch_parser = None
         self.processed_emails = self.load_processed_emails()
         self.extracted_events = self.load_extracted_events()
+        self.queue = IngestQueue()
+        self.notice_store = NoticeStore()
+        self.search_index = SearchIndex(SEARCH_INDEX_FILE)
+    
+    @property
+    def batch_parser(self):
+        """
+        The AI batch parser, created on first use.
+        
+        The OpenAI SDK is only imported (and the client only created) when a
+        document actually needs the AI parser, so runs with nothing to parse
+        start quickly.
+        
+        Returns:
+            BatchEventParser, or None if the OpenAI client could not be created
+            (SDK not installed, or no API key in the environment)
+        """
+        if self._batch_parser is None:
+            try:
+                from openai import OpenAI
+                # API key from environment; RetryingLLMClient does the retrying, not the SDK
+                openai_client = OpenAI(max_retries=0)
+            except Exception as e:
+                logger.error(f"Could not create the OpenAI client: {e}")
+                return None
+            self._batch_parser = BatchEventParser(RetryingLLMClient(openai_client), max_workers=MAX_CONCURRENCY)
+        return self._batch_parser
     
     def load_processed_emails(self):
         """Load the list of already processed email IDs."""
@@ -87,25 +122,22 @@ class GmailPDFScanner:
     
     def search_school_emails(self):
         """
-        Search Gmail for school-related emails.
+        Search the mailbox for school-related emails with PDF attachments.
         
-        This function should use the Gmail API tools when available.
-        For now, it returns a placeholder structure.
+        Returns:
+            List of email dicts with "id", "subject" and "attachments"
         """
-        # TODO: Replace with actual Gmail API call when available
-        # Example search query:
-        # from:@hampsteadhill.school OR subject:(curriculum OR calendar OR term OR dates)
-        # has:attachment filename:pdf
-        
         logger.info("Searching for school-related emails with PDF attachments...")
-        
-        # Placeholder - in production, this would use Gmail API
-        return []
+        return self.mailbox.search_school_emails()
     
     def download_pdf_attachment(self, email_id, attachment_id, filename):
         """
         Download a PDF attachment from an email.
         
+        The attachment is streamed from the mailbox backend straight to
+        PDF_DOWNLOAD_DIR and hashed as it arrives; identical content that is
+        already stored is not stored again.
+        
         Args:
             email_id: Gmail message ID
             attachment_id: Attachment ID
@@ -114,114 +146,96 @@ class GmailPDFScanner:
         Returns:
             Path to downloaded PDF file
         """
-        # TODO: Implement actual Gmail attachment download
-        # For now, return None
-        logger.info(f"Would download attachment: {filename} from email {email_id}")
-        return None
+        try:
+            chunks = self.mailbox.iter_attachment_chunks(email_id, attachment_id)
+            result = self.attachment_store.save_stream(chunks, filename)
+        except Exception as e:
+            logger.error(f"Error downloading attachment {filename} from email {email_id}: {e}")
+            return None
+        
+        if result is None:
+            return None
+        return result[0]
     
-    def extract_text_from_pdf(self, pdf_path):
+    def extract_text_from_pdf(self, pdf_path, job_id):
         """
-        Extract text content from a PDF file.
+        Extract text content from a PDF file into the ingest queue, page by page.
+        
+        Uses an in-process extractor (pypdf or pdfminer) when installed, and
+        falls back to pdftotext from poppler-utils. Pages are fed to the
+        chunker as the backend produces them and each chunk is stored with
+        the job as soon as it fills, so the whole document is never held in
+        memory during extraction.
         
         Args:
             pdf_path: Path to the PDF file
+            job_id: Ingest job to store the text chunks with
         
         Returns:
-            Extracted text content
+            Number of characters extracted, or None on failure
         """
+        if self.pdf_backend is None:
+            logger.error("No PDF text extractor found. Install pypdf, or poppler-utils with: sudo apt-get install poppler-utils")
+            return None
+        size = 0
         try:
-            # Use pdftotext from poppler-utils
-            result = subprocess.run(
-                ['pdftotext', '-layout', str(pdf_path), '-'],
-                capture_output=True,
-                text=True,
-                check=True
-            )
-            text = result.stdout
-            logger.info(f"Extracted {len(text)} characters from {pdf_path.name}")
-            return text
+            for seq, chunk in enumerate(iter_text_chunks(iter_pdf_pages(pdf_path, self.pdf_backend))):
+                self.queue.add_chunk(job_id, seq, chunk)
+                size += len(chunk)
         except subprocess.CalledProcessError as e:
             logger.error(f"Error extracting text from PDF: {e}")
+            size = None
+        except Exception as e:
+            logger.error(f"Error extracting text from {pdf_path.name} with {self.pdf_backend.name}: {e}")
+            size = None
+        if not size:
+            self.queue.discard_chunks(job_id)
             return None
-        except FileNotFoundError:
-            logger.error("pdftotext not found. Install with: sudo apt-get install poppler-utils")
-            return None
+        logger.info(f"Extracted {size} characters from {pdf_path.name} with {self.pdf_backend.name}")
+        return size
     
-    def parse_events_with_ai(self, pdf_text, pdf_filename):
+    def parse_events_with_rules(self, pdf_text, pdf_filename):
         """
-        Use OpenAI API to intelligently parse events from PDF text.
+        Parse events from PDF text with the rule-based extractor.
         
         Args:
             pdf_text: Extracted text from PDF
             pdf_filename: Name of the PDF file for context
         
         Returns:
-            List of parsed events in standard format
+            Tuple of (events parsed by the rules, text still needing the AI
+            parser or None when the rules were confident)
         """
-        logger.info(f"Parsing events from {pdf_filename} using AI...")
+        result = extract_events_with_rules(pdf_text)
         
-        prompt = f"""You are analyzing a school calendar document. Extract ALL calendar events, dates, and important school activities.
-
-Document name: {pdf_filename}
-Document content:
-{pdf_text[:8000]}  # Limit to avoid token limits
-
-Please extract ALL events and return them as a JSON array with this exact structure:
-[
-  {{
-    "date": <day number>,
-    "month": <month number 1-12>,
-    "year": <year>,
-    "title": "<event title>",
-    "time": "<time or 'All Day'>",
-    "description": "<detailed description>",
-    "location": "<location or 'School'>",
-    "type": "<one of: Assembly, Celebration, Activity, Special Day, Academic, School Trip, Closure, Holiday, Special Week, Term End, Exhibition>",
-    "children": ["Leo", "Novah"]  // or just ["Leo"] if Year 2 specific
-  }}
-]
-
-Important instructions:
-1. Extract EVERY date mentioned (September, October, November, December events)
-2. Include special days like "Odd Socks Day", "Anti-Bullying Week", "Red White and Blue Day"
-3. Include school closures, holidays, half terms
-4. Include class assemblies, parent meetings, trips
-5. Include term start/end dates
-6. Include PD days and school closures
-7. For date ranges (e.g., "10th-14th Anti-Bullying Week"), create events for start and end
-8. If year is not mentioned, assume 2025
-9. Return ONLY the JSON array, no other text
-
-Extract all events now:"""
-
+        if result.confidence >= RULE_CONFIDENCE_THRESHOLD:
+            logger.info(f"Parsed {len(result.events)} events from {pdf_filename} with rules "
+                        f"(confidence {result.confidence:.2f})")
+            if result.unparsed_lines:
+                logger.info(f"Ignoring {len(result.unparsed_lines)} unparsed lines in {pdf_filename}")
+            return result.events, None
+        
+        logger.info(f"Rule-based confidence {result.confidence:.2f} for {pdf_filename}, falling back to AI")
+        if result.events:
+            return result.events, result.unparsed_text
+        return [], pdf_text
+    
+    def collect_email_notices(self, email):
+        """
+        Extract notices from an email body into the notice store.
+        
+        Args:
+            email: Email dict from search_school_emails
+        """
         try:
-            response = self.openai_client.chat.completions.create(
-                model="gpt-4.1-mini",
-                messages=[
-                    {"role": "system", "content": "You are a precise calendar event extractor. Return only valid JSON arrays."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.1,
-                max_tokens=4000
-            )
-            
-            content = response.choices[0].message.content.strip()
-            
-            # Extract JSON from response (handle markdown code blocks)
-            if content.startswith("```"):
-                content = re.sub(r'```json\s*|\s*```', '', content)
-            
-            events = json.loads(content)
-            logger.info(f"Successfully parsed {len(events)} events from {pdf_filename}")
-            return events
-            
-        except json.JSONDecodeError as e:
-            logger.error(f"Failed to parse AI response as JSON: {e}")
-            logger.error(f"Response was: {content[:500]}")
-            return []
+            body = self.mailbox.get_email_body(email['id'])
         except Exception as e:
-            logger.error(f"Error calling OpenAI API: {e}")
-            return []
+            logger.error(f"Error reading body of email {email['id']}: {e}")
+            return
+        sent = datetime.fromisoformat(email['date']).date() if email.get('date') else None
+        added = self.notice_store.add_all(extract_notices(body, email['id'], sent))
+        if added:
+            logger.info(f"Found {added} notices in email: {email.get('subject', 'No subject')}")
     
     def merge_events_with_existing(self, new_events):
         """
@@ -237,8 +251,10 @@ Extract all events now:"""
         existing_events = self.extracted_events.copy()
         
         # Create a set of existing event signatures for duplicate detection
+        # (events saved before times were normalised get their start/end minutes here, once)
         existing_signatures = set()
         for event in existing_events:
+            normalise_event_time(event)
             sig = f"{event['date']}-{event['month']}-{event['year']}-{event['title']}"
             existing_signatures.add(sig)
         
@@ -247,15 +263,18 @@ Extract all events now:"""
         for event in new_events:
             sig = f"{event['date']}-{event['month']}-{event['year']}-{event['title']}"
             if sig not in existing_signatures:
-                existing_events.append(event)
+                existing_events.append(normalise_event_time(event))
                 existing_signatures.add(sig)
+                self.search_index.add_event(event)
                 added_count += 1
                 logger.info(f"Added new event: {event['title']} on {event['month']}/{event['date']}/{event['year']}")
         
         logger.info(f"Added {added_count} new events, {len(new_events) - added_count} were duplicates")
+        EVENTS_ADDED.inc(added_count)
+        DUPLICATES.inc(len(new_events) - added_count, kind="event")
         
-        # Sort events by date
-        existing_events.sort(key=lambda e: (e['year'], e['month'], e['date']))
+        # Sort events by date, then start time (all-day events first)
+        existing_events.sort(key=lambda e: (e['year'], e['month'], e['date'], e[START_FIELD] is not None, e[START_FIELD] or 0))
         
         return existing_events
     
@@ -288,6 +307,10 @@ Extract all events now:"""
                 events_code += f'            "description": "{event["description"]}",\n'
                 events_code += f'            "location": "{event["location"]}",\n'
                 events_code += f'            "type": "{event["type"]}",\n'
+                # Times parsed at ingest (see merge_events_with_existing)
+                for field in (START_FIELD, END_FIELD):
+                    if field in event:
+                        events_code += f'            "{field}": {event[field]!r},\n'
                 events_code += f'            "children": {json.dumps(event["children"])}\n'
                 events_code += "        },\n"
             
@@ -311,21 +334,45 @@ Extract all events now:"""
         except Exception as e:
             logger.error(f"Error updating calendar script: {e}")
     
+    def skip_duplicate(self, job):
+        """
+        Check a downloaded job against earlier jobs with the same content.
+        
+        The job is finished once its original has parsed events; until then it
+        waits in the "downloaded" state, so it takes over if the original fails.
+        
+        Returns:
+            True if the job is a duplicate and should not be processed
+        """
+        original = self.queue.duplicate_of(job['content_hash'], job['id'])
+        if original is None:
+            return False
+        if original['state'] in ("parsed", "merged"):
+            logger.info(f"{job['filename']} has the same content as job {original['id']}, skipping")
+            DUPLICATES.inc(kind="attachment")
+            self.queue.advance(job['id'], "merged")
+        else:
+            logger.info(f"{job['filename']} has the same content as job {original['id']}, waiting for it")
+        return True
+    
     def scan_and_process(self):
         """
         Main function to scan emails, process PDFs, and update calendar.
+        
+        Each PDF attachment is a job in the durable ingest queue, checkpointed
+        after every step (download, extract, parse, merge), so a run that stops
+        midway resumes from the last completed step.
         """
         logger.info("Starting Gmail PDF event scanner...")
         
         # Search for school emails
         emails = self.search_school_emails()
         
-        if not emails:
+        if not emails and not self.queue.has_unfinished_jobs():
             logger.info("No new emails found with PDF attachments")
             return
         
-        new_events_found = False
-        
+        # Queue each new PDF attachment
         for email in emails:
             email_id = email.get('id')
             
@@ -334,45 +381,106 @@ Extract all events now:"""
                 continue
             
             logger.info(f"Processing email: {email.get('subject', 'No subject')}")
+            self.collect_email_notices(email)
             
-            # Process each PDF attachment
-            for attachment in email.get('attachments', []):
-                if not attachment['filename'].lower().endswith('.pdf'):
-                    continue
-                
-                # Download PDF
-                pdf_path = self.download_pdf_attachment(
-                    email_id,
-                    attachment['id'],
-                    attachment['filename']
-                )
-                
-                if not pdf_path or not pdf_path.exists():
-                    continue
-                
-                # Extract text
-                pdf_text = self.extract_text_from_pdf(pdf_path)
-                
-                if not pdf_text:
-                    continue
-                
-                # Parse events with AI
-                events = self.parse_events_with_ai(pdf_text, attachment['filename'])
-                
-                if events:
-                    # Merge with existing events
-                    self.extracted_events = self.merge_events_with_existing(events)
-                    new_events_found = True
+            pdf_attachments = [a for a in email.get('attachments', []) if a['filename'].lower().endswith('.pdf')]
+            if not pdf_attachments:
+                self.processed_emails.append(email_id)
+                continue
             
-            # Mark email as processed
-            self.processed_emails.append(email_id)
+            for attachment in pdf_attachments:
+                self.queue.enqueue(email_id, attachment['id'], attachment['filename'], email.get('subject', ''))
+        
+        logger.info(f"Ingest queue: {self.queue.counts()}")
+        
+        # Download PDFs
+        for job in self.queue.jobs("pending"):
+            with timed("download"):
+                pdf_path = self.download_pdf_attachment(job['email_id'], job['attachment_id'], job['filename'])
+            if not pdf_path or not pdf_path.exists():
+                self.queue.record_failure(job['id'], "download failed")
+                continue
+            content_hash = self.attachment_store.digest(pdf_path)
+            self.queue.advance(job['id'], "downloaded", pdf_path=str(pdf_path), content_hash=content_hash)
+        
+        # Extract text, skipping content that another job is already processing
+        for job in self.queue.jobs("downloaded"):
+            if self.skip_duplicate(job):
+                continue
+            with timed("extract"):
+                extracted = self.extract_text_from_pdf(Path(job['pdf_path']), job['id'])
+            if not extracted:
+                self.queue.record_failure(job['id'], "text extraction failed")
+                continue
+            self.queue.advance(job['id'], "extracted")
+        
+        # Parse events with rules; low-confidence text is batched for the AI parser
+        ai_documents = []
+        rule_events = {}
+        for job in self.queue.jobs("extracted"):
+            pdf_text = self.queue.job_text(job)
+            self.notice_store.add_all(extract_notices(pdf_text, job['filename'],
+                                                      datetime.fromtimestamp(job['created_at']).date(), lines=True))
+            events, ai_text = self.parse_events_with_rules(pdf_text, job['filename'])
+            if ai_text:
+                ai_documents.append(BatchDocument(str(job['id']), job['filename'], ai_text))
+                rule_events[str(job['id'])] = events
+            else:
+                self.queue.advance(job['id'], "parsed", events=events)
+        
+        # Parse all low-confidence documents in as few AI requests as possible
+        if ai_documents:
+            logger.info(f"Parsing {len(ai_documents)} documents using AI...")
+            batch_parser = self.batch_parser
+            if batch_parser is None:
+                # Keep the jobs for the next run; rule-parsed jobs are still merged below
+                logger.error(f"AI parser unavailable, {len(ai_documents)} documents will be retried on the next run")
+                for document in ai_documents:
+                    self.queue.record_failure(int(document.doc_id), "AI parser unavailable")
+                results, missing = {}, []
+            else:
+                results, missing = batch_parser.parse_documents(ai_documents)
+            for doc_id, events in results.items():
+                self.queue.advance(int(doc_id), "parsed", events=rule_events[doc_id] + events)
+            for doc_id in missing:
+                logger.error(f"No AI response for job {doc_id}, will retry on the next run")
+                self.queue.record_failure(int(doc_id), "no AI response")
+        
+        # Merge parsed events with existing events
+        new_events_found = False
+        parsed_jobs = self.queue.jobs("parsed")
+        for job in parsed_jobs:
+            if job['events']:
+                with timed("merge"):
+                    self.extracted_events = self.merge_events_with_existing(job['events'])
+                new_events_found = True
+        
+        # Save merged events before checkpointing the jobs (merging again is harmless)
+        if new_events_found:
+            with timed("write"):
+                self.save_extracted_events()
+                self.search_index.save()
+        for job in parsed_jobs:
+            self.queue.advance(job['id'], "merged")
+        
+        # Finish duplicates whose originals were merged above
+        for job in self.queue.jobs("downloaded"):
+            self.skip_duplicate(job)
+        
+        # Mark emails as processed once all their attachments are finished
+        for email_id in self.queue.finished_emails():
+            if email_id not in self.processed_emails:
+                self.processed_emails.append(email_id)
+        
+        # Drop expired notices and save the notice store
+        self.notice_store.prune()
+        self.notice_store.save()
         
         # Save state
         self.save_processed_emails()
+        logger.info(f"Ingest queue: {self.queue.counts()}")
         
         if new_events_found:
-            self.save_extracted_events()
-            
             # Update the calendar script
             self.update_calendar_script(self.extracted_events)
             
@@ -380,15 +488,41 @@ Extract all events now:"""
         else:
             logger.info("No new events discovered")
 
+def configure_logging(log_file=None, verbose=False):
+    """Log to stderr, and to a file if one is given."""
+    handlers = [logging.StreamHandler()]
+    if log_file:
+        handlers.append(logging.FileHandler(log_file))
+    logging.basicConfig(
+        level=logging.DEBUG if verbose else logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        handlers=handlers
+    )
+
 def main():
     """Main entry point."""
+    parser = argparse.ArgumentParser(description="Scan school emails for PDF attachments with calendar events")
+    parser.add_argument("--mailbox", help="Read a local Maildir directory or mbox file instead of Gmail")
+    parser.add_argument("--pdf-backend", choices=["pypdf", "pdfminer", "pdftotext"],
+                        help="PDF text extractor (defaults to the first one installed)")
+    parser.add_argument("--profile", action="store_true", help="Print a per-stage timing summary")
+    parser.add_argument("--metrics-file", help="Prometheus text file to write (default: metrics/gmail_pdf_scanner.prom)")
+    parser.add_argument("--log-file", help="Also write the log to this file")
+    parser.add_argument("--verbose", action="store_true", help="Log debug messages")
+    args = parser.parse_args()
+    configure_logging(args.log_file, args.verbose)
+    
+    success = False
     try:
-        scanner = GmailPDFScanner()
+        mailbox = LocalMailboxBackend(args.mailbox) if args.mailbox else None
+        scanner = GmailPDFScanner(mailbox, args.pdf_backend)
         scanner.scan_and_process()
-        return True
+        success = True
     except Exception as e:
         logger.error(f"Fatal error in Gmail PDF scanner: {e}", exc_info=True)
-        return False
+    finally:
+        finish_run("gmail_pdf_scanner", success, args.metrics_file, args.profile)
+    return success
 
 if __name__ == "__main__":
     success = main()
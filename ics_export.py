@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+iCalendar Export
+================
+
+Exports the school calendar as an iCalendar (ICS) feed that parents can
+subscribe to from Google Calendar or Apple Calendar.
+
+Features:
+- Stable UIDs derived from event signatures, so calendar apps update events
+  in place instead of duplicating them
+- Weekly activities exported once as RRULEs (see recurrence.py) with EXDATEs
+  for half term and closures
+- Incremental regeneration: rendered VEVENTs are cached by content hash and
+  only changed events are re-rendered
+- Streaming output: the feed is written VEVENT by VEVENT, never held in memory
+  as a whole document
+"""
+
+import hashlib
+import json
+import logging
+import os
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from event_model import event_signature
+from metrics import CACHE_HITS
+from time_parsing import event_minutes
+
+logger = logging.getLogger("ics_export")
+
+SCRIPT_DIR = Path(__file__).parent
+ICS_FEED_FILE = SCRIPT_DIR / "calendar.ics"
+ICS_CACHE_FILE = SCRIPT_DIR / ".ics_cache.json"
+
+UID_DOMAIN = "schoolcalendar.hampsteadhill"
+CALENDAR_NAME = "Hampstead Hill School"
+CALENDAR_TIMEZONE = "Europe/London"
+
+
+def event_uid(signature):
+    """Derive a stable iCalendar UID from an event signature."""
+    digest = hashlib.sha1(signature.encode("utf-8")).hexdigest()[:20]
+    return f"{digest}@{UID_DOMAIN}"
+
+
+def content_hash(item):
+    """Hash the exported content of an event or rule."""
+    return hashlib.sha1(json.dumps(item, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def escape_text(text):
+    """Escape a TEXT property value."""
+    return (text or "").replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,").replace("\n", "\\n")
+
+
+def fold_line(line):
+    """Fold a content line to 75 octets as required by RFC 5545."""
+    encoded = line.encode("utf-8")
+    if len(encoded) <= 75:
+        return line + "\r\n"
+    parts = []
+    limit = 75
+    while encoded:
+        cut = min(limit, len(encoded))
+        # Do not split a multi-byte UTF-8 character
+        while cut < len(encoded) and (encoded[cut] & 0xC0) == 0x80:
+            cut -= 1
+        parts.append(encoded[:cut].decode("utf-8"))
+        encoded = encoded[cut:]
+        limit = 74
+    return "\r\n ".join(parts) + "\r\n"
+
+
+def _date_properties(day, fields):
+    """
+    Get the DTSTART/DTEND lines for a date and an event's times.
+
+    Uses the stored start/end minutes when the event has them. An event with
+    only a start time (e.g. "9:30am") gets no DTEND.
+    """
+    start, end = event_minutes(fields)
+    if start is None:
+        return [
+            f"DTSTART;VALUE=DATE:{day.strftime('%Y%m%d')}",
+            f"DTEND;VALUE=DATE:{(day + timedelta(days=1)).strftime('%Y%m%d')}"
+        ]
+    lines = [f"DTSTART:{day.strftime('%Y%m%d')}T{start // 60:02d}{start % 60:02d}00"]
+    if end is not None:
+        lines.append(f"DTEND:{day.strftime('%Y%m%d')}T{end // 60:02d}{end % 60:02d}00")
+    return lines
+
+
+def _exdate_value(day, fields):
+    """Format an EXDATE value matching the DTSTART form for an event's times."""
+    start, _ = event_minutes(fields)
+    if start is None:
+        return f"EXDATE;VALUE=DATE:{day.strftime('%Y%m%d')}"
+    return f"EXDATE:{day.strftime('%Y%m%d')}T{start // 60:02d}{start % 60:02d}00"
+
+
+def render_vevent(uid, fields, dtstamp, day, rule=None):
+    """
+    Render one VEVENT block.
+
+    Args:
+        uid: Stable UID
+        fields: Event dict (title, time, description, location, type, children)
+        dtstamp: DTSTAMP value (kept stable for unchanged events)
+        day: Date of the (first) occurrence
+        rule: Optional RecurrenceRule for weekly events
+
+    Returns:
+        VEVENT text with CRLF line endings
+    """
+    lines = ["BEGIN:VEVENT", f"UID:{uid}", f"DTSTAMP:{dtstamp}"]
+    lines += _date_properties(day, fields)
+    if rule is not None:
+        lines.append(f"RRULE:{rule.to_rrule()}")
+        for exdate in sorted(rule.exdates):
+            if exdate.weekday() in rule.weekdays and rule.dtstart <= exdate <= (rule.until or exdate):
+                lines.append(_exdate_value(exdate, fields))
+    lines.append(f"SUMMARY:{escape_text(fields['title'])}")
+    if fields.get("description"):
+        lines.append(f"DESCRIPTION:{escape_text(fields['description'])}")
+    if fields.get("location"):
+        lines.append(f"LOCATION:{escape_text(fields['location'])}")
+    categories = [fields.get("type")] + list(fields.get("children", []))
+    lines.append("CATEGORIES:" + ",".join(escape_text(c) for c in categories if c))
+    lines.append("END:VEVENT")
+    return "".join(fold_line(line) for line in lines)
+
+
+def iter_feed_items(events, rules=()):
+    """
+    Yield (uid, content hash, render args) for every event and rule.
+
+    Args:
+        events: Iterable of event dicts
+        rules: Iterable of RecurrenceRule (e.g. from get_activity_rules)
+    """
+    for event in events:
+        day = datetime(event["year"], event["month"], event["date"]).date()
+        yield event_uid(event_signature(event)), content_hash(event), (event, day, None)
+
+    for rule in rules:
+        first = next(rule.occurrences(rule.dtstart, rule.until or rule.dtstart), None)
+        if first is None:
+            continue
+        signature = f"rule-{rule.dtstart.isoformat()}-{rule.to_rrule()}-{rule.template['title']}-{rule.template.get('children')}"
+        state = {"template": rule.template, "rrule": rule.to_rrule(), "exdates": sorted(rule.exdates)}
+        yield event_uid(signature), content_hash(state), (rule.template, first, rule)
+
+
+class IcsFeedCache:
+    """Rendered VEVENTs keyed by UID, reused while their content hash is unchanged."""
+
+    def __init__(self, path=ICS_CACHE_FILE):
+        self.path = Path(path)
+        self.entries = {}
+        if self.path.exists():
+            try:
+                with open(self.path, 'r') as f:
+                    self.entries = json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                logger.warning(f"Ignoring unreadable ICS cache {self.path}: {e}")
+
+    def save(self):
+        """Save the cache to disk."""
+        with open(self.path, 'w') as f:
+            json.dump(self.entries, f)
+
+
+def iter_ics(items, cache, dtstamp=None):
+    """
+    Stream the feed as text chunks, re-rendering only changed VEVENTs.
+
+    Entries for events that no longer exist are dropped from the cache.
+
+    Args:
+        items: Iterable from iter_feed_items()
+        cache: IcsFeedCache
+        dtstamp: DTSTAMP for newly rendered events (defaults to now, UTC)
+
+    Yields:
+        Text chunks of the ICS document
+    """
+    dtstamp = dtstamp or datetime.utcnow().strftime("%Y%m%dT%H%M%SZ")
+    seen = {}
+    rendered = 0
+
+    yield "".join(fold_line(line) for line in [
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        "PRODID:-//Hampstead Hill School//School Calendar//EN",
+        "CALSCALE:GREGORIAN",
+        "METHOD:PUBLISH",
+        f"X-WR-CALNAME:{CALENDAR_NAME}",
+        f"X-WR-TIMEZONE:{CALENDAR_TIMEZONE}"
+    ])
+
+    for uid, item_hash, (fields, day, rule) in items:
+        if uid in seen:
+            continue
+        entry = cache.entries.get(uid)
+        if entry is None or entry["hash"] != item_hash:
+            entry = {"hash": item_hash, "vevent": render_vevent(uid, fields, dtstamp, day, rule)}
+            rendered += 1
+        seen[uid] = entry
+        yield entry["vevent"]
+
+    yield "END:VCALENDAR\r\n"
+
+    cache.entries = seen
+    CACHE_HITS.inc(len(seen) - rendered, cache="ics")
+    logger.info(f"ICS feed: {len(seen)} events, {rendered} re-rendered")
+
+
+def write_ics_feed(events, rules=(), path=ICS_FEED_FILE, cache_path=ICS_CACHE_FILE):
+    """
+    Write the ICS feed to a file, streaming it through a temporary file.
+
+    Args:
+        events: Iterable of event dicts
+        rules: Iterable of RecurrenceRule
+        path: Output .ics path
+        cache_path: Path of the rendered-VEVENT cache
+
+    Returns:
+        True if the feed was written, False otherwise
+    """
+    path = Path(path)
+    tmp_path = path.with_name(path.name + ".tmp")
+    try:
+        cache = IcsFeedCache(cache_path)
+        with open(tmp_path, 'w', encoding="utf-8", newline="") as f:
+            for chunk in iter_ics(iter_feed_items(events, rules), cache):
+                f.write(chunk)
+        os.replace(tmp_path, path)
+        cache.save()
+        logger.info(f"Successfully wrote ICS feed to {path}")
+        return True
+    except Exception as e:
+        logger.error(f"Error writing ICS feed to {path}: {e}")
+        if tmp_path.exists():
+            tmp_path.unlink()
+        return False
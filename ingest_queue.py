@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Durable Ingest Queue
+====================
+
+SQLite-backed job queue for the Gmail PDF scanner, one job per PDF attachment.
+
+Each job moves through these states, and every transition is committed
+immediately, so a crash only loses the step that was in progress:
+
+    pending -> downloaded -> extracted -> parsed -> merged
+                                                 \\-> failed (after MAX_ATTEMPTS)
+
+On restart the scanner picks every job up from its last checkpoint: files
+already downloaded are not fetched again, extracted text is not re-extracted,
+and parsed events do not go back to the AI parser.
+
+Extracted text is stored as it streams in, one chunk per row of the chunks
+table, and only read back as a whole when the job is parsed.
+"""
+
+import json
+import logging
+import sqlite3
+import time
+from pathlib import Path
+
+logger = logging.getLogger("ingest_queue")
+
+SCRIPT_DIR = Path(__file__).parent
+INGEST_QUEUE_FILE = SCRIPT_DIR / "ingest_queue.sqlite3"
+
+STATES = ("pending", "downloaded", "extracted", "parsed", "merged", "failed")
+FINISHED_STATES = ("merged", "failed")
+MAX_ATTEMPTS = 5
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    email_id TEXT NOT NULL,
+    attachment_id TEXT NOT NULL,
+    filename TEXT NOT NULL,
+    subject TEXT,
+    state TEXT NOT NULL DEFAULT 'pending',
+    pdf_path TEXT,
+    content_hash TEXT,
+    text TEXT,
+    events TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    UNIQUE (email_id, attachment_id)
+);
+CREATE INDEX IF NOT EXISTS jobs_state ON jobs (state);
+CREATE INDEX IF NOT EXISTS jobs_email ON jobs (email_id);
+CREATE TABLE IF NOT EXISTS chunks (
+    job_id INTEGER NOT NULL,
+    seq INTEGER NOT NULL,
+    text TEXT NOT NULL,
+    PRIMARY KEY (job_id, seq)
+);
+"""
+
+
+class IngestQueue:
+    """Per-attachment ingest jobs with checkpointed states."""
+
+    def __init__(self, path=INGEST_QUEUE_FILE):
+        """
+        Open (or create) the queue database.
+
+        Args:
+            path: Path to the SQLite file
+        """
+        self.path = Path(path)
+        self.db = sqlite3.connect(str(self.path))
+        self.db.row_factory = sqlite3.Row
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.executescript(SCHEMA)
+        columns = {row["name"] for row in self.db.execute("PRAGMA table_info(jobs)")}
+        if "content_hash" not in columns:
+            self.db.execute("ALTER TABLE jobs ADD COLUMN content_hash TEXT")
+        self.db.execute("CREATE INDEX IF NOT EXISTS jobs_content_hash ON jobs (content_hash)")
+        self.db.commit()
+
+    def close(self):
+        """Close the database."""
+        self.db.close()
+
+    def enqueue(self, email_id, attachment_id, filename, subject=""):
+        """
+        Add a job for an attachment, unless it is already queued.
+
+        Returns:
+            True if a new job was added
+        """
+        now = time.time()
+        cursor = self.db.execute(
+            "INSERT OR IGNORE INTO jobs (email_id, attachment_id, filename, subject, created_at, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (email_id, attachment_id, filename, subject, now, now)
+        )
+        self.db.commit()
+        return cursor.rowcount > 0
+
+    def jobs(self, state):
+        """
+        Get the jobs in a state, oldest first.
+
+        Returns:
+            List of dicts with the job columns ("events" decoded from JSON)
+        """
+        rows = self.db.execute("SELECT * FROM jobs WHERE state = ? ORDER BY id", (state,)).fetchall()
+        jobs = []
+        for row in rows:
+            job = dict(row)
+            job["events"] = json.loads(job["events"]) if job["events"] else None
+            jobs.append(job)
+        return jobs
+
+    def advance(self, job_id, state, pdf_path=None, content_hash=None, text=None, events=None):
+        """
+        Checkpoint a job in a new state, storing the output of the step.
+
+        Args:
+            job_id: Job ID
+            state: New state (one of STATES)
+            pdf_path: Downloaded file path (for "downloaded")
+            content_hash: SHA-256 of the downloaded file (for "downloaded")
+            text: Extracted text (for "extracted")
+            events: Parsed events (for "parsed")
+        """
+        if state not in STATES:
+            raise ValueError(f"Unknown job state: {state}")
+        self.db.execute(
+            "UPDATE jobs SET state = ?, pdf_path = COALESCE(?, pdf_path), content_hash = COALESCE(?, content_hash), "
+            "text = COALESCE(?, text), events = COALESCE(?, events), last_error = NULL, updated_at = ? WHERE id = ?",
+            (state, pdf_path, content_hash, text, json.dumps(events) if events is not None else None,
+             time.time(), job_id)
+        )
+        self.db.commit()
+
+    def add_chunk(self, job_id, seq, text):
+        """
+        Store one chunk of a job's extracted text.
+
+        Chunks are committed with the job's next checkpoint (see advance), or
+        dropped with discard_chunks if the extraction fails.
+
+        Args:
+            job_id: Job ID
+            seq: Position of the chunk in the document, from 0
+            text: Chunk text
+        """
+        self.db.execute("INSERT OR REPLACE INTO chunks (job_id, seq, text) VALUES (?, ?, ?)", (job_id, seq, text))
+
+    def discard_chunks(self, job_id):
+        """Drop the stored chunks of a job, e.g. after a failed extraction."""
+        self.db.execute("DELETE FROM chunks WHERE job_id = ?", (job_id,))
+        self.db.commit()
+
+    def job_text(self, job):
+        """
+        Get a job's extracted text.
+
+        Args:
+            job: Job dict from jobs()
+
+        Returns:
+            The text stored with the job (jobs extracted before chunking), or
+            its chunks joined in order
+        """
+        if job["text"] is not None:
+            return job["text"]
+        rows = self.db.execute("SELECT text FROM chunks WHERE job_id = ? ORDER BY seq", (job["id"],))
+        return "".join(row["text"] for row in rows)
+
+    def duplicate_of(self, content_hash, job_id):
+        """
+        Find an earlier job with the same file content that has not failed.
+
+        A duplicate is only finished once its original has parsed its events;
+        if the original fails, the next duplicate becomes the original.
+
+        Returns:
+            Dict with the original's "id" and "state", or None
+        """
+        row = self.db.execute(
+            "SELECT id, state FROM jobs WHERE content_hash = ? AND id < ? "
+            "AND state IN ('downloaded', 'extracted', 'parsed', 'merged') ORDER BY id LIMIT 1",
+            (content_hash, job_id)
+        ).fetchone()
+        return dict(row) if row else None
+
+    def record_failure(self, job_id, error, max_attempts=MAX_ATTEMPTS):
+        """
+        Record a failed step. The job stays in its state to be retried on the
+        next run, until it has failed max_attempts times.
+
+        Returns:
+            True if the job has now been given up on
+        """
+        self.db.execute(
+            "UPDATE jobs SET attempts = attempts + 1, last_error = ?, updated_at = ? WHERE id = ?",
+            (str(error), time.time(), job_id)
+        )
+        self.db.execute(
+            "UPDATE jobs SET state = 'failed' WHERE id = ? AND attempts >= ?",
+            (job_id, max_attempts)
+        )
+        self.db.commit()
+        failed = self.db.execute("SELECT state FROM jobs WHERE id = ?", (job_id,)).fetchone()["state"] == "failed"
+        if failed:
+            logger.error(f"Giving up on job {job_id} after {max_attempts} attempts: {error}")
+        return failed
+
+    def has_unfinished_jobs(self):
+        """Check whether any job is still waiting for a step."""
+        placeholders = ",".join("?" * len(FINISHED_STATES))
+        row = self.db.execute(
+            f"SELECT 1 FROM jobs WHERE state NOT IN ({placeholders}) LIMIT 1", FINISHED_STATES
+        ).fetchone()
+        return row is not None
+
+    def finished_emails(self):
+        """Get the email IDs whose jobs have all finished (merged or failed)."""
+        placeholders = ",".join("?" * len(FINISHED_STATES))
+        rows = self.db.execute(
+            f"SELECT email_id FROM jobs GROUP BY email_id "
+            f"HAVING SUM(state NOT IN ({placeholders})) = 0",
+            FINISHED_STATES
+        ).fetchall()
+        return [row["email_id"] for row in rows]
+
+    def counts(self):
+        """Get the number of jobs in each state."""
+        counts = {state: 0 for state in STATES}
+        for row in self.db.execute("SELECT state, COUNT(*) AS n FROM jobs GROUP BY state"):
+            counts[row["state"]] = row["n"]
+        return counts
@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""
+Batched AI Event Parsing
+========================
+
+Packs several documents (or chunks of large documents) into a single chat
+request and asks for structured JSON output, one entry per document ID.
+
+Features:
+- Shared extraction instructions are sent once per batch instead of once per PDF
+- JSON-schema response format, so the reply is always parseable JSON
+- The response is streamed and each document's events are validated as soon
+  as that document's object is complete
+- Documents missing from a response are reported back so the caller can retry
+"""
+
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+
+from event_model import CHILDREN, EVENT_TYPES
+from pdf_text import iter_stored_pages, iter_text_chunks
+from term_calendar import academic_year
+
+logger = logging.getLogger("llm_batch")
+
+MODEL = "gpt-4.1-mini"
+MAX_BATCH_CHARS = 24000
+MAX_BATCH_DOCUMENTS = 8
+MAX_TOKENS = 16000
+
+# The event model registers unknown types and children as it meets them; the AI may only use these
+ALLOWED_EVENT_TYPES = tuple(EVENT_TYPES)
+ALLOWED_CHILDREN = tuple(CHILDREN)
+
+SYSTEM_PROMPT = "You are a precise calendar event extractor. Return only JSON matching the schema."
+
+EXTRACTION_INSTRUCTIONS = """You are analyzing school calendar documents. For EACH document below, extract ALL calendar events, dates, and important school activities.
+
+Return one entry per document, using the document ID given in its header.
+
+Important instructions:
+1. Extract EVERY date mentioned
+2. Include special days like "Odd Socks Day", "Anti-Bullying Week", "Red White and Blue Day"
+3. Include school closures, holidays, half terms and PD days
+4. Include class assemblies, parent meetings, trips
+5. Include term start/end dates
+6. For date ranges (e.g., "10th-14th Anti-Bullying Week"), create events for start and end
+7. If year is not mentioned, assume the {default_year}-{next_year} school year: September to December are {default_year}, January to August are {next_year}
+8. Use "time": "All Day" when no time is given and "location": "School" when no location is given
+9. Use "children": ["Leo"] for Year 2 specific events, ["Leo", "Novah"] for whole school events"""
+
+EVENT_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "date": {"type": "integer"},
+        "month": {"type": "integer"},
+        "year": {"type": "integer"},
+        "title": {"type": "string"},
+        "time": {"type": "string"},
+        "description": {"type": "string"},
+        "location": {"type": "string"},
+        "type": {"type": "string", "enum": list(ALLOWED_EVENT_TYPES)},
+        "children": {"type": "array", "items": {"type": "string", "enum": list(ALLOWED_CHILDREN)}}
+    },
+    "required": ["date", "month", "year", "title", "time", "description", "location", "type", "children"],
+    "additionalProperties": False
+}
+
+RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "school_calendar_events",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {
+                "documents": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "id": {"type": "string"},
+                            "events": {"type": "array", "items": EVENT_SCHEMA}
+                        },
+                        "required": ["id", "events"],
+                        "additionalProperties": False
+                    }
+                }
+            },
+            "required": ["documents"],
+            "additionalProperties": False
+        }
+    }
+}
+
+
+class BatchDocument:
+    """A document (or chunk of one) to be parsed in a batch."""
+
+    def __init__(self, doc_id, filename, text, source_id=None):
+        self.doc_id = doc_id
+        self.filename = filename
+        self.text = text
+        # ID of the whole document this is a chunk of
+        self.source_id = doc_id if source_id is None else source_id
+
+    def __repr__(self):
+        return f"BatchDocument({self.doc_id!r}, {self.filename!r}, {len(self.text)} chars)"
+
+
+def split_document(document, max_chars=MAX_BATCH_CHARS):
+    """
+    Split a document that is too large for one batch into line-aligned chunks.
+
+    Pages (separated by form feeds, as stored by the scanner) are streamed
+    into the chunker one at a time. Chunk IDs are "<doc_id>#<n>"; each chunk's
+    source_id is the document's ID.
+    """
+    if len(document.text) <= max_chars:
+        return [document]
+
+    chunks = iter_text_chunks(iter_stored_pages(document.text), max_chars)
+    return [BatchDocument(f"{document.doc_id}#{i}", document.filename, chunk, document.source_id)
+            for i, chunk in enumerate(chunks, start=1)]
+
+
+def pack_batches(documents, max_chars=MAX_BATCH_CHARS, max_documents=MAX_BATCH_DOCUMENTS):
+    """
+    Pack documents into batches of at most max_chars text and max_documents entries.
+
+    Args:
+        documents: Iterable of BatchDocument
+
+    Returns:
+        List of batches (lists of BatchDocument)
+    """
+    batches = []
+    current = []
+    size = 0
+    for document in documents:
+        for chunk in split_document(document, max_chars):
+            if current and (size + len(chunk.text) > max_chars or len(current) >= max_documents):
+                batches.append(current)
+                current, size = [], 0
+            current.append(chunk)
+            size += len(chunk.text)
+    if current:
+        batches.append(current)
+    return batches
+
+
+def build_batch_prompt(batch, default_year):
+    """Build the user prompt for one batch."""
+    parts = [EXTRACTION_INSTRUCTIONS.format(default_year=default_year, next_year=default_year + 1)]
+    for document in batch:
+        parts.append(f"=== DOCUMENT {document.doc_id} ({document.filename}) ===\n{document.text}")
+    return "\n\n".join(parts)
+
+
+def validate_event(event):
+    """
+    Check an event returned by the model.
+
+    Returns:
+        None if the event is valid, otherwise a description of the problem
+    """
+    try:
+        date(event["year"], event["month"], event["date"])
+    except (KeyError, TypeError, ValueError) as e:
+        return f"invalid date ({e})"
+    if not isinstance(event.get("title"), str) or not event["title"].strip():
+        return "missing title"
+    if event.get("type") not in ALLOWED_EVENT_TYPES:
+        return f"unknown type {event.get('type')!r}"
+    if not event.get("children") or any(c not in ALLOWED_CHILDREN for c in event["children"]):
+        return f"invalid children {event.get('children')!r}"
+    return None
+
+
+class StreamingDocumentParser:
+    """
+    Incrementally parse {"documents": [{"id": ..., "events": [...]}, ...]}.
+
+    Text is fed in as it streams from the API; each document object is
+    decoded and yielded as soon as its closing brace arrives.
+    """
+
+    def __init__(self):
+        self.buffer = []
+        self.depth = 0
+        self.in_string = False
+        self.escaped = False
+        self.object_start = None
+
+    def feed(self, text):
+        """Feed a chunk of response text and yield any completed document objects."""
+        for char in text:
+            self.buffer.append(char)
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif char == "\\":
+                    self.escaped = True
+                elif char == '"':
+                    self.in_string = False
+            elif char == '"':
+                self.in_string = True
+            elif char == "{":
+                self.depth += 1
+                if self.depth == 2:
+                    self.object_start = len(self.buffer) - 1
+            elif char == "}":
+                self.depth -= 1
+                if self.depth == 1 and self.object_start is not None:
+                    document = json.loads("".join(self.buffer[self.object_start:]))
+                    del self.buffer[self.object_start:]
+                    self.object_start = None
+                    yield document
+
+
+class BatchEventParser:
+    """Parses events from many documents with as few chat requests as possible."""
+
+    def __init__(self, client, model=MODEL, default_year=None, max_workers=1):
+        """
+        Initialize the batch parser.
+
+        Args:
+            client: OpenAI client (or anything with the same chat.completions API,
+                such as llm_client.RetryingLLMClient)
+            model: Chat model to use
+            default_year: Academic start year to assume when a document gives
+                none (defaults to the current academic year)
+            max_workers: Number of batches to send concurrently
+        """
+        self.client = client
+        self.model = model
+        self.default_year = default_year or academic_year(date.today())
+        self.max_workers = max_workers
+
+    def iter_batch_events(self, batch):
+        """
+        Send one batch and yield (doc_id, valid events) as each document streams in.
+
+        Raises:
+            Whatever the client raises for API errors
+        """
+        stream = self.client.chat.completions.create(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": build_batch_prompt(batch, self.default_year)}
+            ],
+            response_format=RESPONSE_FORMAT,
+            temperature=0.1,
+            max_tokens=MAX_TOKENS,
+            stream=True
+        )
+
+        parser = StreamingDocumentParser()
+        for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if not delta:
+                continue
+            for document in parser.feed(delta):
+                valid = []
+                for event in document.get("events", []):
+                    problem = validate_event(event)
+                    if problem:
+                        logger.warning(f"Dropping event from {document.get('id')}: {problem}: {event.get('title')}")
+                    else:
+                        valid.append(event)
+                yield document.get("id"), valid
+
+    def parse_documents(self, documents):
+        """
+        Parse events from several documents.
+
+        Args:
+            documents: List of BatchDocument
+
+        Returns:
+            Tuple of (dict of doc_id -> list of events, list of doc_ids with no
+            response because their batch failed or omitted them)
+        """
+        documents = list(documents)
+        results = {document.doc_id: [] for document in documents}
+        answered = set()
+        batches = pack_batches(documents)
+        # Chunk ID -> document ID, so document IDs may contain anything (filenames with "#")
+        source_ids = {chunk.doc_id: chunk.source_id for batch in batches for chunk in batch}
+
+        def run_batch(numbered_batch):
+            number, batch = numbered_batch
+            expected = {chunk.doc_id for chunk in batch}
+            batch_results = []
+            try:
+                for chunk_id, events in self.iter_batch_events(batch):
+                    if chunk_id not in expected:
+                        logger.warning(f"Ignoring response for unknown document {chunk_id}")
+                        continue
+                    batch_results.append((chunk_id, events))
+            except Exception as e:
+                logger.error(f"Error parsing batch {number}/{len(batches)}: {e}")
+            logger.info(f"Batch {number}/{len(batches)}: {len(batch_results)}/{len(expected)} documents answered")
+            return batch_results
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for batch_results in executor.map(run_batch, enumerate(batches, start=1)):
+                for chunk_id, events in batch_results:
+                    results[source_ids[chunk_id]].extend(events)
+                    answered.add(chunk_id)
+
+        missing = sorted({
+            chunk.source_id
+            for batch in batches for chunk in batch
+            if chunk.doc_id not in answered
+        })
+        return {doc_id: events for doc_id, events in results.items() if doc_id not in missing}, missing
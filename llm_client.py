@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Resilient LLM Client
+====================
+
+Wraps an OpenAI client so ingestion can run at the highest safe throughput
+without losing work.
+
+Features:
+- Token-bucket rate limiting (requests per minute)
+- Bounded concurrency (at most N requests, including streams, in flight)
+- Exponential backoff with full jitter on 429s, 5xx and connection errors,
+  honouring Retry-After when the server sends it
+- Circuit breaker: after repeated failures, calls fail fast until a cool-down
+  has passed, then a single trial call decides whether to close it again
+
+RetryingLLMClient exposes the same `chat.completions.create(...)` call as the
+OpenAI client, so it can be passed anywhere the raw client is used (for example
+BatchEventParser in llm_batch.py). Errors that survive the retries are raised
+to the caller, which requeues the documents instead of dropping them.
+"""
+
+import logging
+import random
+import threading
+import time
+
+from metrics import STAGE_SECONDS
+
+logger = logging.getLogger("llm_client")
+
+REQUESTS_PER_MINUTE = 60
+MAX_CONCURRENCY = 4
+MAX_RETRIES = 5
+BASE_DELAY_SECONDS = 1.0
+MAX_DELAY_SECONDS = 60.0
+BREAKER_FAILURE_THRESHOLD = 5
+BREAKER_RESET_SECONDS = 60.0
+
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+RETRYABLE_ERROR_NAMES = {"APIConnectionError", "APITimeoutError", "ConnectionError", "TimeoutError"}
+
+
+class CircuitOpenError(Exception):
+    """Raised when the circuit breaker is open and calls are failing fast."""
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` tokens per second, bursting up to `capacity`."""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self, tokens=1):
+        """Block until `tokens` tokens are available, then take them."""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return
+                wait = (tokens - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class CircuitBreaker:
+    """Closed -> open after `failure_threshold` consecutive failures -> half-open after `reset_timeout`."""
+
+    def __init__(self, failure_threshold=BREAKER_FAILURE_THRESHOLD, reset_timeout=BREAKER_RESET_SECONDS):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+        self.lock = threading.Lock()
+
+    @property
+    def state(self):
+        """Current state: "closed", "open" or "half-open"."""
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def before_call(self):
+        """Check whether a call may go ahead, raising CircuitOpenError if not."""
+        with self.lock:
+            state = self.state
+            if state == "closed":
+                return
+            if state == "half-open" and not self.trial_in_flight:
+                self.trial_in_flight = True
+                return
+            raise CircuitOpenError(f"Circuit open after {self.failures} consecutive failures")
+
+    def record_success(self):
+        """Record a successful call, closing the circuit."""
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+            self.trial_in_flight = False
+
+    def record_failure(self):
+        """Record a failed call, opening the circuit once the threshold is reached."""
+        with self.lock:
+            self.failures += 1
+            self.trial_in_flight = False
+            if self.failures >= self.failure_threshold or self.opened_at is not None:
+                if self.opened_at is None:
+                    logger.warning(f"Opening LLM circuit breaker after {self.failures} consecutive failures")
+                self.opened_at = time.monotonic()
+
+
+def is_retryable(error):
+    """Check whether an API error is worth retrying."""
+    status = getattr(error, "status_code", None)
+    if status is not None:
+        return status in RETRYABLE_STATUS_CODES
+    return type(error).__name__ in RETRYABLE_ERROR_NAMES
+
+
+def retry_after_seconds(error):
+    """Get the server's Retry-After delay from an API error, if any."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+class _Completions:
+    def __init__(self, owner):
+        self._owner = owner
+
+    def create(self, **kwargs):
+        return self._owner.create_chat_completion(**kwargs)
+
+
+class _Chat:
+    def __init__(self, owner):
+        self.completions = _Completions(owner)
+
+
+class RetryingLLMClient:
+    """Rate-limited, concurrency-bounded, retrying wrapper around an OpenAI client."""
+
+    def __init__(self, client, requests_per_minute=REQUESTS_PER_MINUTE, max_concurrency=MAX_CONCURRENCY,
+                 max_retries=MAX_RETRIES, base_delay=BASE_DELAY_SECONDS, max_delay=MAX_DELAY_SECONDS,
+                 breaker=None):
+        """
+        Initialize the client.
+
+        Args:
+            client: OpenAI client to wrap
+            requests_per_minute: Sustained request rate
+            max_concurrency: Maximum requests (or open streams) in flight
+            max_retries: Retries per call after the first attempt
+            base_delay: First backoff delay in seconds
+            max_delay: Largest backoff delay in seconds
+            breaker: Optional CircuitBreaker (a new one by default)
+        """
+        self.client = client
+        self.bucket = TokenBucket(requests_per_minute / 60.0, max(1, max_concurrency))
+        self.semaphore = threading.BoundedSemaphore(max_concurrency)
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.breaker = breaker or CircuitBreaker()
+        self.chat = _Chat(self)
+
+    def backoff_delay(self, attempt, error=None):
+        """Get the delay before retry number `attempt` (exponential backoff, full jitter)."""
+        server_delay = retry_after_seconds(error) if error is not None else None
+        if server_delay is not None:
+            return min(server_delay, self.max_delay)
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    def create_chat_completion(self, **kwargs):
+        """
+        Call chat.completions.create with rate limiting, retries and the circuit breaker.
+
+        For stream=True the concurrency slot is held until the stream is consumed.
+
+        Raises:
+            CircuitOpenError: If the circuit breaker is open
+            The last API error, once retries are exhausted or for non-retryable errors
+        """
+        attempt = 0
+        while True:
+            self.breaker.before_call()
+            self.bucket.acquire()
+            self.semaphore.acquire()
+            start = time.perf_counter()
+            try:
+                response = self.client.chat.completions.create(**kwargs)
+            except Exception as e:
+                self.semaphore.release()
+                self.breaker.record_failure()
+                if not is_retryable(e) or attempt >= self.max_retries:
+                    raise
+                delay = self.backoff_delay(attempt, e)
+                logger.warning(f"LLM call failed ({e}), retry {attempt + 1}/{self.max_retries} in {delay:.1f}s")
+                time.sleep(delay)
+                attempt += 1
+                continue
+
+            self.breaker.record_success()
+            if kwargs.get("stream"):
+                return self._hold_slot(response, start)
+            STAGE_SECONDS.observe(time.perf_counter() - start, stage="llm")
+            self.semaphore.release()
+            return response
+
+    def _hold_slot(self, stream, start):
+        """Yield from a stream, releasing the concurrency slot when it finishes."""
+        try:
+            yield from stream
+            STAGE_SECONDS.observe(time.perf_counter() - start, stage="llm")
+        except Exception:
+            self.breaker.record_failure()
+            raise
+        finally:
+            self.semaphore.release()
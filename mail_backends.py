@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+"""
+Mailbox Backends
+================
+
+Pluggable mailbox clients for the Gmail PDF scanner.
+
+- GmailBackend: the Gmail API (placeholder until API access is enabled)
+- LocalMailboxBackend: a local Maildir directory or mbox file, for offline
+  runs, testing and backfilling archived school mail
+
+Both search for school emails with PDF attachments (from a school sender
+domain, or with a calendar-related subject). The local backend keeps an index
+of Message-ID, date, sender, subject and attachments per mailbox key, so
+repeated scans only parse messages added since the last scan.
+
+Attachments are returned as an iterator of decoded byte chunks of bounded
+size, so callers can write them to disk as they are decoded (see
+attachment_store.py) instead of building the whole decoded attachment. The
+encoded payload itself is still read into memory with the parsed message.
+"""
+
+import html
+import json
+import logging
+import os
+import re
+from pathlib import Path
+
+from attachment_store import iter_base64_decode, iter_text_slices
+from metrics import CACHE_HITS
+
+logger = logging.getLogger("mail_backends")
+
+# Emails count as school emails if they come from one of these domains...
+SCHOOL_SENDER_DOMAINS = ["hampsteadhill.school"]
+# ...or their subject mentions one of these keywords
+SUBJECT_KEYWORDS = ["curriculum", "calendar", "term", "dates", "diary", "newsletter"]
+
+INDEX_VERSION = 1
+
+
+class MailboxBackend:
+    """Interface for mailbox clients."""
+
+    def search_school_emails(self):
+        """
+        Search for school-related emails with PDF attachments.
+
+        Returns:
+            List of {"id", "subject", "sender", "date", "attachments": [{"id", "filename"}]}
+            dicts, oldest first
+        """
+        raise NotImplementedError
+
+    def get_email_body(self, email_id):
+        """
+        Get the plain text body of a message.
+
+        Args:
+            email_id: Message ID (as returned by the backend's search)
+
+        Returns:
+            Body text ("" if the message has none)
+        """
+        raise NotImplementedError
+
+    def iter_attachment_chunks(self, email_id, attachment_id):
+        """
+        Stream an attachment's decoded content.
+
+        Args:
+            email_id: Message ID (as returned by the backend's search)
+            attachment_id: Attachment ID within the message
+
+        Yields:
+            Decoded byte chunks
+        """
+        raise NotImplementedError
+
+
+class GmailBackend(MailboxBackend):
+    """Gmail API backend."""
+
+    def search_school_emails(self):
+        # TODO: Replace with actual Gmail API call when available
+        # Example search query:
+        # from:@hampsteadhill.school OR subject:(curriculum OR calendar OR term OR dates)
+        # has:attachment filename:pdf
+        return []
+
+    def get_email_body(self, email_id):
+        # TODO: Implement with users.messages.get (format=full), decoding the
+        # base64url text/plain part
+        return ""
+
+    def iter_attachment_chunks(self, email_id, attachment_id):
+        # TODO: Implement with users.messages.attachments.get, whose "data"
+        # field is base64url text: iter_base64_decode(iter_text_slices(data), urlsafe=True)
+        logger.info(f"Would download attachment {attachment_id} from email {email_id}")
+        return iter(())
+
+
+def message_id(message, key):
+    """Get a stable ID for a message: its Message-ID header, or the mailbox key."""
+    header = message.get("Message-ID")
+    if header:
+        return header.strip().strip("<>")
+    return str(key)
+
+
+def is_school_email(sender, subject, attachments,
+                    sender_domains=SCHOOL_SENDER_DOMAINS, subject_keywords=SUBJECT_KEYWORDS):
+    """Check whether an email is from the school (or about school dates) and has a PDF."""
+    if not any(a["filename"].lower().endswith(".pdf") for a in attachments):
+        return False
+    # Imported here: the email package is only needed when scanning a mailbox
+    from email.utils import parseaddr
+    domain = parseaddr(sender or "")[1].rpartition("@")[2].lower()
+    if any(domain == d or domain.endswith("." + d) for d in sender_domains):
+        return True
+    subject = (subject or "").lower()
+    return any(re.search(rf"\b{re.escape(k)}", subject) for k in subject_keywords)
+
+
+def iter_attachment_parts(message):
+    """Yield (attachment_id, part) for each part of a message that has a filename."""
+    index = 0
+    for part in message.walk():
+        if part.is_multipart() or not part.get_filename():
+            continue
+        yield str(index), part
+        index += 1
+
+
+def message_body(message):
+    """Get the plain text body of a message, falling back to HTML with the tags stripped."""
+    html_text = None
+    for part in message.walk():
+        if part.is_multipart() or part.get_filename():
+            continue
+        content_type = part.get_content_type()
+        if content_type not in ("text/plain", "text/html"):
+            continue
+        payload = part.get_payload(decode=True) or b""
+        text = payload.decode(part.get_content_charset() or "utf-8", errors="replace")
+        if content_type == "text/plain":
+            return text
+        html_text = html_text or text
+    if html_text is None:
+        return ""
+    text = re.sub(r'(?is)<(script|style).*?</\1>|<br\s*/?>|</p>', '\n', html_text)
+    return html.unescape(re.sub(r'<[^>]+>', ' ', text))
+
+
+def iter_part_chunks(part):
+    """Decode the content of a MIME part chunk by chunk.
+
+    Base64 parts are decoded in bounded slices of the encoded payload. The
+    encoded payload is still held in memory as part of the parsed message;
+    only the decoded output is produced incrementally.
+    """
+    encoding = (part.get("Content-Transfer-Encoding") or "").strip().lower()
+    if encoding == "base64":
+        # Decode the encoded payload slice by slice instead of all at once
+        return iter_base64_decode(iter_text_slices(part.get_payload()))
+    return iter([part.get_payload(decode=True) or b""])
+
+
+def open_mailbox(path):
+    """Open a Maildir directory or an mbox file."""
+    # Imported here: mailbox (and the email package it loads) is slow to import
+    import mailbox
+    path = Path(path)
+    if path.is_dir():
+        return mailbox.Maildir(str(path), create=False)
+    return mailbox.mbox(str(path), create=False)
+
+
+class LocalMailboxBackend(MailboxBackend):
+    """Maildir or mbox archive on the local filesystem, with an incremental index."""
+
+    def __init__(self, path, index_path=None, sender_domains=SCHOOL_SENDER_DOMAINS,
+                 subject_keywords=SUBJECT_KEYWORDS):
+        """
+        Initialize the backend.
+
+        Args:
+            path: Maildir directory or mbox file
+            index_path: Where to keep the message index (defaults to
+                .<name>.index.json next to the mailbox)
+            sender_domains: School sender domains to match
+            subject_keywords: Subject keywords to match
+        """
+        self.path = Path(path)
+        self.mailbox = open_mailbox(self.path)
+        self.is_maildir = self.path.is_dir()
+        self.index_path = Path(index_path) if index_path else self.path.parent / f".{self.path.name}.index.json"
+        self.sender_domains = sender_domains
+        self.subject_keywords = subject_keywords
+        self.entries = {}
+        self._by_id = None
+        self._load_index()
+
+    def _mailbox_signature(self):
+        """Identify the mailbox layout, so a rewritten mbox invalidates the index."""
+        if self.is_maildir:
+            return {"type": "maildir"}
+        stat = os.stat(self.path)
+        return {"type": "mbox", "inode": stat.st_ino}
+
+    def _load_index(self):
+        """Load the index, discarding it if the mailbox was replaced or shrank."""
+        if not self.index_path.exists():
+            return
+        try:
+            with open(self.index_path, 'r') as f:
+                index = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Rebuilding unreadable mailbox index {self.index_path}: {e}")
+            return
+        if index.get("version") != INDEX_VERSION or index.get("mailbox") != self._mailbox_signature():
+            logger.info(f"Mailbox {self.path} changed, rebuilding index")
+            return
+        if index.get("size", 0) > self.path.stat().st_size and not self.path.is_dir():
+            logger.info(f"Mailbox {self.path} was truncated, rebuilding index")
+            return
+        self.entries = index.get("entries", {})
+
+    def _save_index(self):
+        """Save the index atomically."""
+        index = {
+            "version": INDEX_VERSION,
+            "mailbox": self._mailbox_signature(),
+            "size": 0 if self.path.is_dir() else self.path.stat().st_size,
+            "entries": self.entries
+        }
+        tmp_path = self.index_path.with_name(self.index_path.name + ".tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump(index, f)
+        os.replace(tmp_path, self.index_path)
+
+    def _index_message(self, key):
+        """Parse one message into an index entry."""
+        from email.utils import parsedate_to_datetime
+        message = self.mailbox[key]
+        try:
+            sent = parsedate_to_datetime(message.get("Date")).isoformat() if message.get("Date") else None
+        except (TypeError, ValueError):
+            sent = None
+        attachments = [
+            {"id": part_id, "filename": part.get_filename()}
+            for part_id, part in iter_attachment_parts(message)
+        ]
+        return {
+            "id": message_id(message, key),
+            "date": sent,
+            "sender": str(message.get("From", "")),
+            "subject": str(message.get("Subject", "")),
+            "attachments": attachments
+        }
+
+    def refresh(self):
+        """
+        Bring the index up to date, parsing only messages not seen before.
+
+        Returns:
+            Number of newly indexed messages
+        """
+        keys = {str(key): key for key in self.mailbox.iterkeys()}
+        removed = set(self.entries) - set(keys)
+        for key in removed:
+            del self.entries[key]
+
+        added = 0
+        for key_str, key in keys.items():
+            if key_str in self.entries:
+                continue
+            try:
+                self.entries[key_str] = self._index_message(key)
+            except Exception as e:
+                logger.error(f"Skipping unreadable message {key_str} in {self.path}: {e}")
+                continue
+            added += 1
+
+        CACHE_HITS.inc(len(keys) - added, cache="mailbox_index")
+        if added or removed:
+            self._save_index()
+            self._by_id = None
+        logger.info(f"Indexed {added} new messages in {self.path} ({len(self.entries)} total)")
+        return added
+
+    def search_school_emails(self):
+        self.refresh()
+        emails = [
+            entry for entry in self.entries.values()
+            if is_school_email(entry["sender"], entry["subject"], entry["attachments"],
+                               self.sender_domains, self.subject_keywords)
+        ]
+        emails.sort(key=lambda e: e["date"] or "")
+        logger.info(f"Found {len(emails)} school emails with PDF attachments in {self.path}")
+        return emails
+
+    def _key_for(self, email_id):
+        """Find the mailbox key of a message by its ID."""
+        if self._by_id is None:
+            if not self.entries:
+                self.refresh()
+            self._by_id = {entry["id"]: key for key, entry in self.entries.items()}
+        key = self._by_id.get(email_id)
+        if key is None:
+            return None
+        # mbox keys are integers, Maildir keys are strings
+        return key if self.is_maildir else int(key)
+
+    def get_email_body(self, email_id):
+        key = self._key_for(email_id)
+        if key is None:
+            logger.error(f"Message {email_id} not found in {self.path}")
+            return ""
+        return message_body(self.mailbox[key])
+
+    def iter_attachment_chunks(self, email_id, attachment_id):
+        key = self._key_for(email_id)
+        if key is None:
+            logger.error(f"Message {email_id} not found in {self.path}")
+            return iter(())
+        for part_id, part in iter_attachment_parts(self.mailbox[key]):
+            if part_id == attachment_id:
+                return iter_part_chunks(part)
+        logger.error(f"Attachment {attachment_id} not found in message {email_id}")
+        return iter(())
@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Pipeline Metrics
+================
+
+Per-stage timings and counters for the calendar updater and the Gmail PDF
+scanner, written as a Prometheus text file (for node_exporter's textfile
+collector) at the end of each run.
+
+Metrics:
+- schoolcalendar_stage_seconds{stage=...}: histogram of stage durations
+  (download, extract, llm, merge, generate, validate, write, views, ics, git_push)
+- schoolcalendar_cache_hits_total{cache=...}: ICS render cache and mailbox index hits
+- schoolcalendar_duplicates_total{kind=...}: duplicate attachments and events skipped
+- schoolcalendar_events_added_total: new events merged
+- schoolcalendar_last_run_timestamp_seconds / schoolcalendar_last_run_success
+
+Each script is a short-lived cron job, so the file holds the values of the
+last run. Pass --profile to either script for a per-stage summary on exit.
+"""
+
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+logger = logging.getLogger("metrics")
+
+SCRIPT_DIR = Path(__file__).parent
+METRICS_DIR = SCRIPT_DIR / "metrics"
+
+# Seconds; wide enough for both a fast merge and a slow git push or LLM call
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+
+def format_labels(labelnames, values, extra=None):
+    """Format a Prometheus label set, e.g. {stage="merge",le="0.1"}."""
+    pairs = list(zip(labelnames, values)) + list(extra or [])
+    if not pairs:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in pairs)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+
+def format_value(value):
+    """Format a sample value."""
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    """Base class for labelled metrics."""
+
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.lock = threading.Lock()
+
+    def label_values(self, labels):
+        """Get the label values in labelnames order."""
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def render(self):
+        """Render the metric in the Prometheus text format."""
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self.lock:
+            lines.extend(self.samples())
+        return lines
+
+    def samples(self):
+        raise NotImplementedError
+
+
+class Counter(Metric):
+    """Monotonically increasing count."""
+
+    kind = "counter"
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self.values = {}
+
+    def inc(self, amount=1, **labels):
+        """Increase the counter."""
+        key = self.label_values(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def value(self, **labels):
+        """Get the current count."""
+        return self.values.get(self.label_values(labels), 0)
+
+    def samples(self):
+        if not self.values and not self.labelnames:
+            return [f"{self.name} 0"]
+        return [f"{self.name}{format_labels(self.labelnames, key)} {format_value(value)}"
+                for key, value in sorted(self.values.items())]
+
+
+class Gauge(Counter):
+    """Value that can be set."""
+
+    kind = "gauge"
+
+    def set(self, value, **labels):
+        """Set the gauge."""
+        key = self.label_values(labels)
+        with self.lock:
+            self.values[key] = value
+
+
+class Histogram(Metric):
+    """Distribution of observed values in cumulative buckets."""
+
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [bucket counts, count, sum, max]
+        self.series = {}
+
+    def observe(self, value, **labels):
+        """Record an observation."""
+        key = self.label_values(labels)
+        with self.lock:
+            series = self.series.get(key)
+            if series is None:
+                series = self.series[key] = [[0] * len(self.buckets), 0, 0.0, 0.0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+            series[1] += 1
+            series[2] += value
+            series[3] = max(series[3], value)
+
+    @contextmanager
+    def time(self, **labels):
+        """Time a block of code."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def summary(self):
+        """Get (label values, count, sum, max) for each series."""
+        with self.lock:
+            return [(key, s[1], s[2], s[3]) for key, s in sorted(self.series.items())]
+
+    def samples(self):
+        lines = []
+        for key, (bucket_counts, count, total, _) in sorted(self.series.items()):
+            for bound, bucket_count in zip(self.buckets, bucket_counts):
+                lines.append(f"{self.name}_bucket{format_labels(self.labelnames, key, [('le', bound)])} {bucket_count}")
+            lines.append(f"{self.name}_bucket{format_labels(self.labelnames, key, [('le', '+Inf')])} {count}")
+            lines.append(f"{self.name}_sum{format_labels(self.labelnames, key)} {format_value(total)}")
+            lines.append(f"{self.name}_count{format_labels(self.labelnames, key)} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Collection of metrics rendered together."""
+
+    def __init__(self):
+        self.metrics = []
+
+    def register(self, metric):
+        """Add a metric to the registry."""
+        self.metrics.append(metric)
+        return metric
+
+    def render(self):
+        """Render all metrics in the Prometheus text format."""
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self, path):
+        """
+        Write the metrics atomically, so a collector never reads a partial file.
+
+        Returns:
+            True if successful, False otherwise
+        """
+        path = Path(path)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(path.name + ".tmp")
+            with open(tmp_path, 'w') as f:
+                f.write(self.render())
+            os.replace(tmp_path, path)
+            logger.info(f"Wrote metrics to {path}")
+            return True
+        except Exception as e:
+            logger.error(f"Error writing metrics to {path}: {e}")
+            return False
+
+
+REGISTRY = MetricsRegistry()
+
+STAGE_SECONDS = REGISTRY.register(Histogram(
+    "schoolcalendar_stage_seconds", "Duration of pipeline stages in seconds.", ("stage",)))
+CACHE_HITS = REGISTRY.register(Counter(
+    "schoolcalendar_cache_hits_total", "Work skipped thanks to a cache.", ("cache",)))
+DUPLICATES = REGISTRY.register(Counter(
+    "schoolcalendar_duplicates_total", "Duplicate inputs skipped.", ("kind",)))
+EVENTS_ADDED = REGISTRY.register(Counter(
+    "schoolcalendar_events_added_total", "New events merged into the calendar."))
+REMINDERS_SENT = REGISTRY.register(Counter(
+    "schoolcalendar_reminders_sent_total", "Reminders delivered to parents.", ("sink",)))
+LAST_RUN_TIMESTAMP = REGISTRY.register(Gauge(
+    "schoolcalendar_last_run_timestamp_seconds", "Unix time the last run finished.", ("job",)))
+LAST_RUN_SUCCESS = REGISTRY.register(Gauge(
+    "schoolcalendar_last_run_success", "Whether the last run succeeded (1) or failed (0).", ("job",)))
+
+
+def timed(stage):
+    """Time a block of code as a pipeline stage."""
+    return STAGE_SECONDS.time(stage=stage)
+
+
+def default_metrics_path(job):
+    """Get the default text file path for a job's metrics."""
+    return METRICS_DIR / f"{job}.prom"
+
+
+def profile_report():
+    """Format a per-stage timing summary, slowest stage first."""
+    rows = sorted(STAGE_SECONDS.summary(), key=lambda row: row[2], reverse=True)
+    overall = sum(row[2] for row in rows) or 1.0
+    lines = [f"{'stage':<12} {'calls':>6} {'total s':>9} {'mean s':>9} {'max s':>9} {'share':>6}"]
+    for (stage,), count, total, longest in rows:
+        lines.append(f"{stage:<12} {count:>6} {total:>9.3f} {total / count:>9.3f} {longest:>9.3f} {total / overall:>6.1%}")
+    counters = [(metric, key, value) for metric in (CACHE_HITS, DUPLICATES, EVENTS_ADDED)
+                for key, value in sorted(metric.values.items())]
+    for metric, key, value in counters:
+        lines.append(f"{metric.name}{format_labels(metric.labelnames, key)} {value}")
+    return "\n".join(lines)
+
+
+def finish_run(job, success, metrics_path=None, profile=False):
+    """
+    Record the run outcome, write the metrics text file and optionally print the profile.
+
+    Args:
+        job: Job name ("update_calendar_data" or "gmail_pdf_scanner")
+        success: Whether the run succeeded
+        metrics_path: Text file path (defaults to metrics/<job>.prom)
+        profile: Whether to print the per-stage summary
+    """
+    LAST_RUN_TIMESTAMP.set(time.time(), job=job)
+    LAST_RUN_SUCCESS.set(1 if success else 0, job=job)
+    REGISTRY.write_textfile(metrics_path or default_metrics_path(job))
+    if profile:
+        print(profile_report())
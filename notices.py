@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+"""
+School Notices
+==============
+
+Extracts notices (permission slips, bookings, closures, kit reminders...)
+from school email bodies and PDF text, and keeps them in a store indexed by
+priority, expiry and child.
+
+Features:
+- Rule-based extraction: one notice per sentence (or, for PDF text, per
+  line) that asks parents to act, with a priority, a deadline (when the
+  sentence gives a date) and the children it applies to
+- Stable IDs, so re-reading the same email or PDF updates notices in place
+- Expiry min-heap: expired notices are pruned incrementally, touching only
+  the notices that have expired
+- Per-priority lists kept in deadline order, and per-child counts, so the app
+  notices and the notification count are read straight from the indexes
+"""
+
+import hashlib
+import heapq
+import json
+import logging
+import os
+import re
+from bisect import bisect_left, insort
+from datetime import date, timedelta
+from pathlib import Path
+
+from rule_extractor import MONTH_NAMES, WEEKDAY_NAMES, event_children, month_number
+
+logger = logging.getLogger("notices")
+
+SCRIPT_DIR = Path(__file__).parent
+NOTICES_FILE = SCRIPT_DIR / "notices.json"
+
+PRIORITIES = ["high", "medium", "low"]
+# Notices without a deadline are shown for this long after the email was sent
+DEFAULT_NOTICE_DAYS = 14
+MAX_DESCRIPTION_CHARS = 240
+
+# (pattern, title, priority), first match wins
+NOTICE_RULES = [
+    (re.compile(r'permission slip|consent form', re.IGNORECASE), "Permission Slip Needed", "high"),
+    (re.compile(r'\bbook(?:ing)?\b.*\b(?:consultation|appointment|slot|meeting)s?\b', re.IGNORECASE), "Booking Required", "high"),
+    (re.compile(r'school (?:will be )?closed|school closure', re.IGNORECASE), "School Closure", "high"),
+    (re.compile(r'\b(?:payment|pay)\b.*\b(?:by|before)\b', re.IGNORECASE), "Payment Due", "high"),
+    (re.compile(r'\b(?:bring|remember)\b.*\bkit\b', re.IGNORECASE), "Kit Reminder", "medium"),
+    (re.compile(r'non-uniform|dress(?:ed)? up|costume', re.IGNORECASE), "Dress-Up Day", "medium"),
+    (re.compile(r'\b(?:please|kindly)\b.*\b(?:return|send in|complete|sign)\b', re.IGNORECASE), "Action Needed", "medium"),
+    (re.compile(r'\breminder\b', re.IGNORECASE), "Reminder", "low"),
+]
+
+# Sentences end at punctuation, blank lines and bulleted lines
+SENTENCE_PATTERN = re.compile(r'(?<=[.!?])\s+|\n\s*\n|\n(?=\s*[•●▪*–-]\s)')
+# pdftotext output has no punctuation between diary lines, so every line is a sentence
+LINE_PATTERN = re.compile(r'(?<=[.!?])\s+|[\n\f]')
+BULLET_PATTERN = re.compile(r'^[•●▪*–-]\s+')
+DEADLINE_PATTERN = re.compile(
+    rf'\b(?:{WEEKDAY_NAMES},?\s+)?(\d{{1,2}})(?:st|nd|rd|th)?\s+({MONTH_NAMES})\.?\b'
+    rf'|\b({MONTH_NAMES})\.?\s+(\d{{1,2}})(?:st|nd|rd|th)?\b',
+    re.IGNORECASE
+)
+URL_PATTERN = re.compile(r'https?://[^\s<>"\')]+')
+
+
+def ordinal_suffix(day):
+    """Get the English ordinal suffix for a day of the month."""
+    if 11 <= day <= 13:
+        return "th"
+    return {1: "st", 2: "nd", 3: "rd"}.get(day % 10, "th")
+
+
+def find_deadline(text, sent):
+    """
+    Find the first date in a sentence, in the year that makes it on or after the email.
+
+    Returns:
+        date or None
+    """
+    for match in DEADLINE_PATTERN.finditer(text):
+        day_text, month_text = (match.group(1), match.group(2)) if match.group(1) else (match.group(4), match.group(3))
+        month = month_number(month_text)
+        if not month:
+            continue
+        for year in (sent.year, sent.year + 1):
+            try:
+                deadline = date(year, month, int(day_text))
+            except ValueError:
+                break
+            # A date well before the email is next year's (e.g. a January date in a December email)
+            if deadline >= sent - timedelta(days=30):
+                return deadline
+    return None
+
+
+def truncate(text, limit=MAX_DESCRIPTION_CHARS):
+    """Shorten text to at most limit characters, at a word boundary."""
+    if len(text) <= limit:
+        return text
+    cut = text.rfind(" ", 0, limit)
+    return text[:cut if cut > 0 else limit - 1].rstrip(" ,;:") + "…"
+
+
+def notice_id(title, text):
+    """Get a stable ID for a notice from its title and source sentence."""
+    slug = re.sub(r'[^a-z0-9]+', '-', title.lower()).strip('-')
+    return f"{slug}-{hashlib.sha1(text.encode('utf-8')).hexdigest()[:6]}"
+
+
+def extract_notices(text, source, sent=None, lines=False):
+    """
+    Extract notices from an email body or PDF text.
+
+    Args:
+        text: Plain text
+        source: Where the text came from (email ID or PDF filename)
+        sent: Date the email was sent (defaults to today)
+        lines: Treat every line as a sentence (for PDF text)
+
+    Returns:
+        List of notice dicts (app fields plus "expires" and "source")
+    """
+    sent = sent or date.today()
+    notices = {}
+    for sentence in (LINE_PATTERN if lines else SENTENCE_PATTERN).split(text):
+        sentence = BULLET_PATTERN.sub("", " ".join(sentence.split()))
+        if not sentence:
+            continue
+        for pattern, title, priority in NOTICE_RULES:
+            if not pattern.search(sentence):
+                continue
+            deadline = find_deadline(sentence, sent)
+            expires = deadline or sent + timedelta(days=DEFAULT_NOTICE_DAYS)
+            notice = {
+                "id": notice_id(title, sentence),
+                "title": title,
+                "priority": priority,
+                "deadline": f"{deadline.strftime('%B')} {deadline.day}{ordinal_suffix(deadline.day)}" if deadline else "Ongoing",
+                "description": truncate(sentence),
+                "children": event_children(sentence),
+                "expires": expires.isoformat(),
+                "source": source
+            }
+            url = URL_PATTERN.search(sentence)
+            if url:
+                notice["actionButton"] = {
+                    "text": "Complete Form" if re.search(r'form|slip', sentence, re.IGNORECASE) else "Open Link",
+                    "url": url.group(0).rstrip(".,")
+                }
+            notices[notice["id"]] = notice
+            break
+    return list(notices.values())
+
+
+def to_app_notice(notice):
+    """Strip store-only fields from a notice for the app JSON."""
+    return {key: value for key, value in notice.items() if key not in ("expires", "source")}
+
+
+class NoticeStore:
+    """Notices indexed by priority, expiry and child."""
+
+    def __init__(self, path=NOTICES_FILE):
+        """
+        Load the store.
+
+        Args:
+            path: JSON file holding the notices
+        """
+        self.path = Path(path)
+        self.notices = {}
+        # priority -> [(expires, id)] in deadline order
+        self.by_priority = {priority: [] for priority in PRIORITIES}
+        # child -> number of notices
+        self.child_counts = {}
+        # (expires, id) min-heap; stale entries are skipped when popped
+        self.expiry_heap = []
+        self.dirty = False
+
+        if self.path.exists():
+            try:
+                with open(self.path, 'r') as f:
+                    stored = json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                logger.warning(f"Ignoring unreadable notices file {self.path}: {e}")
+                stored = {}
+            for notice in stored.get("notices", []):
+                self._index(notice)
+            self.expiry_heap = [(notice["expires"], notice_id) for notice_id, notice in self.notices.items()]
+            heapq.heapify(self.expiry_heap)
+
+    def __len__(self):
+        return len(self.notices)
+
+    def _index(self, notice):
+        """Add a notice to the priority and child indexes."""
+        self.notices[notice["id"]] = notice
+        insort(self.by_priority[notice["priority"]], (notice["expires"], notice["id"]))
+        for child in notice["children"]:
+            self.child_counts[child] = self.child_counts.get(child, 0) + 1
+
+    def _unindex(self, notice_id):
+        """Remove a notice from the indexes. Its heap entry is left to go stale."""
+        notice = self.notices.pop(notice_id)
+        entries = self.by_priority[notice["priority"]]
+        del entries[bisect_left(entries, (notice["expires"], notice_id))]
+        for child in notice["children"]:
+            self.child_counts[child] -= 1
+        return notice
+
+    def add(self, notice):
+        """
+        Add or update a notice.
+
+        Returns:
+            True if the store changed
+        """
+        existing = self.notices.get(notice["id"])
+        if existing == notice:
+            return False
+        if existing:
+            self._unindex(notice["id"])
+        self._index(notice)
+        heapq.heappush(self.expiry_heap, (notice["expires"], notice["id"]))
+        self.dirty = True
+        return True
+
+    def add_all(self, notices):
+        """Add notices. Returns the number of new or changed notices."""
+        return sum(1 for notice in notices if self.add(notice))
+
+    def prune(self, today=None):
+        """
+        Remove notices that expired before today, popping only expired heap entries.
+
+        Returns:
+            Number of notices removed
+        """
+        cutoff = (today or date.today()).isoformat()
+        removed = 0
+        while self.expiry_heap and self.expiry_heap[0][0] < cutoff:
+            expires, notice_id = heapq.heappop(self.expiry_heap)
+            notice = self.notices.get(notice_id)
+            # Skip entries left behind by updated or removed notices
+            if notice is None or notice["expires"] != expires:
+                continue
+            self._unindex(notice_id)
+            removed += 1
+        if removed:
+            self.dirty = True
+            logger.info(f"Pruned {removed} expired notices")
+        return removed
+
+    def count(self, child=None):
+        """Get the number of notices, for all children or one child."""
+        if child is None:
+            return len(self.notices)
+        return self.child_counts.get(child, 0)
+
+    def active(self, child=None, limit=None):
+        """
+        Get notices, high priority first, soonest deadline first within a priority.
+
+        Args:
+            child: Only notices for this child
+            limit: Maximum number of notices
+
+        Returns:
+            List of notice dicts
+        """
+        result = []
+        for priority in PRIORITIES:
+            for _, notice_id in self.by_priority[priority]:
+                notice = self.notices[notice_id]
+                if child is None or child in notice["children"]:
+                    result.append(notice)
+                    if limit is not None and len(result) >= limit:
+                        return result
+        return result
+
+    def save(self, force=False):
+        """
+        Save the store atomically, if it changed.
+
+        Returns:
+            True if successful, False otherwise
+        """
+        if not self.dirty and not force:
+            return True
+        try:
+            tmp_path = self.path.with_name(self.path.name + ".tmp")
+            with open(tmp_path, 'w') as f:
+                json.dump({"notices": self.active()}, f, indent=2)
+            os.replace(tmp_path, self.path)
+            self.dirty = False
+            logger.info(f"Saved {len(self.notices)} notices to {self.path}")
+            return True
+        except Exception as e:
+            logger.error(f"Error saving notices to {self.path}: {e}")
+            return False
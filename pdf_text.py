@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+PDF Text Extraction
+===================
+
+Pluggable PDF text extraction that streams text page by page.
+
+Backends, in order of preference:
+- pypdf: in-process, no subprocess per file (used when pypdf is installed)
+- pdfminer.six: in-process (used when pdfminer is installed)
+- pdftotext (poppler-utils): runs over page ranges with -f/-l, so pages are
+  emitted as each range finishes instead of after the whole document
+
+Callers iterate pages (iter_pdf_pages) or fixed-size text chunks
+(iter_text_chunks) and can start work before the whole document is parsed.
+"""
+
+import logging
+import re
+import shutil
+import subprocess
+
+logger = logging.getLogger("pdf_text")
+
+# Pages per pdftotext call when streaming with -f/-l
+PDFTOTEXT_PAGES_PER_CALL = 8
+DEFAULT_CHUNK_CHARS = 8000
+# Separator between pages when a document's text is stored as one string
+PAGE_SEPARATOR = "\f"
+
+
+class PdfTextBackend:
+    """Interface for PDF text extraction backends."""
+
+    name = None
+
+    def available(self):
+        """Check whether the backend can be used on this system."""
+        raise NotImplementedError
+
+    def iter_pages(self, pdf_path):
+        """Yield the text of each page in order."""
+        raise NotImplementedError
+
+
+class PypdfBackend(PdfTextBackend):
+    """In-process extraction with pypdf."""
+
+    name = "pypdf"
+
+    def available(self):
+        try:
+            import pypdf  # noqa: F401
+            return True
+        except ImportError:
+            return False
+
+    def iter_pages(self, pdf_path):
+        from pypdf import PdfReader
+
+        reader = PdfReader(str(pdf_path))
+        for page in reader.pages:
+            try:
+                # Layout mode keeps columns aligned like pdftotext -layout
+                yield page.extract_text(extraction_mode="layout")
+            except TypeError:
+                # Older pypdf without extraction modes
+                yield page.extract_text()
+
+
+class PdfminerBackend(PdfTextBackend):
+    """In-process extraction with pdfminer.six."""
+
+    name = "pdfminer"
+
+    def available(self):
+        try:
+            import pdfminer.high_level  # noqa: F401
+            return True
+        except ImportError:
+            return False
+
+    def iter_pages(self, pdf_path):
+        from pdfminer.high_level import extract_pages
+        from pdfminer.layout import LTTextContainer
+
+        for page_layout in extract_pages(str(pdf_path)):
+            yield "".join(element.get_text() for element in page_layout if isinstance(element, LTTextContainer))
+
+
+class PdftotextBackend(PdfTextBackend):
+    """poppler-utils pdftotext, run over page ranges."""
+
+    name = "pdftotext"
+
+    def available(self):
+        return shutil.which("pdftotext") is not None
+
+    def page_count(self, pdf_path):
+        """Get the number of pages with pdfinfo, or None if unavailable."""
+        if shutil.which("pdfinfo") is None:
+            return None
+        result = subprocess.run(['pdfinfo', str(pdf_path)], capture_output=True, text=True)
+        match = re.search(r'^Pages:\s+(\d+)', result.stdout, re.MULTILINE)
+        return int(match.group(1)) if match else None
+
+    def iter_pages(self, pdf_path):
+        pages = self.page_count(pdf_path)
+        if pages is None:
+            # No page count: one call for the whole document
+            ranges = [(None, None)]
+        else:
+            ranges = [(first, min(first + PDFTOTEXT_PAGES_PER_CALL - 1, pages))
+                      for first in range(1, pages + 1, PDFTOTEXT_PAGES_PER_CALL)]
+
+        for first, last in ranges:
+            command = ['pdftotext', '-layout']
+            if first is not None:
+                command += ['-f', str(first), '-l', str(last)]
+            result = subprocess.run(command + [str(pdf_path), '-'], capture_output=True, text=True, check=True)
+            # pdftotext ends every page with a form feed
+            page_texts = result.stdout.split("\f")
+            if page_texts and not page_texts[-1].strip():
+                page_texts.pop()
+            yield from page_texts
+
+
+BACKENDS = [PypdfBackend(), PdfminerBackend(), PdftotextBackend()]
+
+
+def get_backend(name=None):
+    """
+    Get a PDF text backend.
+
+    Args:
+        name: Optional backend name ("pypdf", "pdfminer" or "pdftotext");
+            defaults to the first available backend
+
+    Returns:
+        PdfTextBackend, or None if none is available
+    """
+    for backend in BACKENDS:
+        if (name is None or backend.name == name) and backend.available():
+            return backend
+    return None
+
+
+def iter_pdf_pages(pdf_path, backend=None):
+    """Yield the text of each page of a PDF with the given (or best available) backend."""
+    backend = backend or get_backend()
+    if backend is None:
+        raise RuntimeError("No PDF text backend available. Install pypdf or poppler-utils")
+    yield from backend.iter_pages(pdf_path)
+
+
+def iter_stored_pages(text):
+    """Lazily split text stored as PAGE_SEPARATOR-joined pages back into pages."""
+    start = 0
+    while True:
+        end = text.find(PAGE_SEPARATOR, start)
+        if end == -1:
+            yield text[start:]
+            return
+        yield text[start:end]
+        start = end + len(PAGE_SEPARATOR)
+
+
+def _split_long_line(line, max_chars):
+    """Split a line longer than max_chars into pieces, at spaces where possible."""
+    while len(line) > max_chars:
+        cut = line.rfind(" ", 0, max_chars)
+        cut = cut + 1 if cut > 0 else max_chars
+        yield line[:cut]
+        line = line[cut:]
+    if line:
+        yield line
+
+
+def iter_text_chunks(pages, max_chars=DEFAULT_CHUNK_CHARS):
+    """
+    Group streamed page texts into chunks of at most max_chars (line-aligned).
+
+    Chunks are emitted as soon as they fill, while later pages are still
+    being extracted. Lines longer than max_chars are split across chunks,
+    at a space where there is one.
+    """
+    current = []
+    size = 0
+    for page in pages:
+        if current and not current[-1].endswith("\n"):
+            # Keep the last line of the previous page separate
+            current.append("\n")
+            size += 1
+        for line in page.splitlines(keepends=True):
+            for piece in _split_long_line(line, max_chars):
+                if current and size + len(piece) > max_chars:
+                    yield "".join(current)
+                    current, size = [], 0
+                current.append(piece)
+                size += len(piece)
+    if current:
+        yield "".join(current)
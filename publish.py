@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Versioned Publishing
+====================
+
+Optimistic-concurrency publishing for school_calendar_data.json.
+
+Every published document carries a version stamp in its "meta" section:
+- generation: monotonic counter, one higher than the document it replaced
+- parent: content hash of the document it replaced
+- contentHash: hash of this document (everything except "meta")
+
+A writer records the head it started from, and publish_json() only replaces
+the file if that head is still current (compare-and-swap under a lock file).
+A writer working from a stale head is refused instead of silently overwriting
+newer data, which is how November/December events were lost before (see
+CRITICAL_ISSUE.md).
+
+The check only covers the window between read_head() and publish_json(): the
+updater regenerates the whole document (create_json_structure) rather than
+building on the head's content, so anything that exists only in the
+published file and not in the generator is still replaced by the next
+successful publish.
+"""
+
+import fcntl
+import hashlib
+import json
+import logging
+import os
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+logger = logging.getLogger("publish")
+
+LOCK_TIMEOUT_SECONDS = 30
+
+
+class StalePublishError(Exception):
+    """Raised when a document's parent is no longer the current head."""
+
+
+def content_hash(data):
+    """Hash a calendar document, ignoring its meta section."""
+    body = {k: v for k, v in data.items() if k != "meta"}
+    canonical = json.dumps(body, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def read_head(path):
+    """
+    Read the version stamp of the currently published document.
+
+    Documents published before versioning have generation 0 and their hash is
+    computed from the content. An unreadable or corrupt document is logged and
+    treated as if nothing were published, so the next publish replaces it.
+
+    Args:
+        path: Path to the published JSON file
+
+    Returns:
+        Tuple of (generation, content hash), or (0, None) if nothing is published
+    """
+    path = Path(path)
+    if not path.exists():
+        return 0, None
+    try:
+        with open(path, 'r') as f:
+            data = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        logger.error(f"Ignoring unreadable head {path}: {e}")
+        return 0, None
+    if not isinstance(data, dict):
+        logger.error(f"Ignoring unreadable head {path}: not a JSON object")
+        return 0, None
+    meta = data.get("meta", {})
+    return meta.get("generation", 0), meta.get("contentHash") or content_hash(data)
+
+
+@contextmanager
+def publish_lock(path, timeout=LOCK_TIMEOUT_SECONDS):
+    """Hold an exclusive lock on <path>.lock for the duration of a publish."""
+    lock_path = Path(str(path) + ".lock")
+    with open(lock_path, 'w') as lock_file:
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                break
+            except BlockingIOError:
+                if time.monotonic() >= deadline:
+                    raise TimeoutError(f"Timed out waiting for publish lock {lock_path}")
+                time.sleep(0.1)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def publish_json(data, path, parent_hash):
+    """
+    Publish a document if its parent is still the current head.
+
+    Stamps data["meta"] with generation, parent and contentHash, then swaps the
+    file into place atomically. Publishing content identical to the head is a
+    no-op that stamps data["meta"] with the head's generation and contentHash.
+
+    Args:
+        data: Calendar document to publish
+        path: Path to the published JSON file
+        parent_hash: Content hash of the head this document was generated from
+            (from read_head() before generation started)
+
+    Returns:
+        True if the file was replaced, False if the content was unchanged
+
+    Raises:
+        StalePublishError: If another writer published since parent_hash was read
+        TimeoutError: If the publish lock could not be acquired
+    """
+    path = Path(path)
+    with publish_lock(path):
+        head_generation, head_hash = read_head(path)
+        if head_hash != parent_hash:
+            raise StalePublishError(
+                f"Head of {path.name} moved to generation {head_generation} ({(head_hash or 'none')[:12]}) "
+                f"since this document was generated from {(parent_hash or 'none')[:12]}"
+            )
+
+        new_hash = content_hash(data)
+        if new_hash == head_hash:
+            logger.info(f"Content unchanged at generation {head_generation}, not publishing {path.name}")
+            data["meta"].update({"generation": head_generation, "contentHash": head_hash})
+            return False
+
+        data["meta"].update({
+            "generation": head_generation + 1,
+            "parent": head_hash,
+            "contentHash": new_hash
+        })
+
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    logger.info(f"Published {path.name} generation {head_generation + 1} ({new_hash[:12]})")
+    return True
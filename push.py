@@ -0,0 +1,426 @@
+#!/usr/bin/env python3
+"""
+Push Fan-out
+============
+
+Pushes calendar changes to subscribed clients instead of having them poll
+school_calendar_data.json.
+
+Every published generation is turned into a delta: the top-level sections
+whose content changed, and for "events" only the events added, changed or
+removed (by event signature). Deltas are:
+- appended to a bounded delta log (push_log.jsonl), which `push.py serve`
+  streams to connected clients as server-sent events (see push_server.py)
+- queued for every webhook subscriber in the subscription registry
+  (subscriptions.json), filtered to the sections it subscribed to, and
+  POSTed in batches by a small pool of workers
+
+Backpressure is per subscriber: a webhook subscriber that falls more than
+MAX_PENDING_DELTAS deltas behind, or an SSE client whose queue fills up, has
+its backlog dropped and is sent a single resync (a snapshot of its sections)
+instead.
+
+Usage:
+    python3 push.py subscribe https://example.org/hook --sections today,tomorrow,events
+    python3 push.py unsubscribe <id>
+    python3 push.py list
+    python3 push.py serve --port 8766     # SSE at /events?sections=events,notices
+
+See fake_push_receiver.py for a local webhook receiver to test against.
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import sys
+import time
+from pathlib import Path
+
+from event_model import event_signature
+from publish import publish_lock
+
+logger = logging.getLogger("push")
+
+SCRIPT_DIR = Path(__file__).parent
+SUBSCRIPTIONS_FILE = SCRIPT_DIR / "subscriptions.json"
+PUSH_STATE_FILE = SCRIPT_DIR / "push_state.json"
+PUSH_LOG_FILE = SCRIPT_DIR / "push_log.jsonl"
+
+# Deltas kept in the log for SSE clients catching up with Last-Event-ID
+DELTA_LOG_LIMIT = 100
+# Deltas a webhook subscriber may fall behind before it is resynced instead
+MAX_PENDING_DELTAS = 20
+# Deltas per webhook request
+BATCH_SIZE = 10
+FANOUT_WORKERS = 8
+WEBHOOK_TIMEOUT = 10
+# Retry delay after a failed delivery, doubled per consecutive failure
+RETRY_DELAY = 60
+MAX_RETRY_DELAY = 6 * 3600
+
+
+def section_hash(value):
+    """Hash a section's content."""
+    data = json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha1(data.encode("utf-8")).hexdigest()
+
+
+def build_delta(data, state):
+    """
+    Build the delta from the last pushed generation to a published document.
+
+    Args:
+        data: Published calendar document (with its meta version stamp)
+        state: Push state from the previous generation ({"hashes", "events"}),
+            empty for the first push
+
+    Returns:
+        Tuple of (delta or None if nothing changed, new state)
+    """
+    hashes = {name: section_hash(value) for name, value in data.items() if name not in ("meta", "events")}
+    event_hashes = {event_signature(event): section_hash(event) for event in data["events"]}
+    old_hashes = state.get("hashes", {})
+    old_events = state.get("events", {})
+
+    sections = {name: data[name] for name, value_hash in hashes.items() if old_hashes.get(name) != value_hash}
+    removed_sections = [name for name in old_hashes if name not in hashes]
+    upserted = [event for event in data["events"] if old_events.get(event_signature(event)) != event_hashes[event_signature(event)]]
+    removed_events = [signature for signature in old_events if signature not in event_hashes]
+
+    new_state = {"generation": data["meta"].get("generation"), "hashes": hashes, "events": event_hashes}
+    if not sections and not removed_sections and not upserted and not removed_events:
+        return None, new_state
+
+    delta = {
+        "type": "delta",
+        "generation": data["meta"].get("generation"),
+        "parent": data["meta"].get("parent"),
+        "contentHash": data["meta"].get("contentHash"),
+        "generated": data["meta"].get("generated"),
+        "sections": sections
+    }
+    if removed_sections:
+        delta["removedSections"] = removed_sections
+    if upserted or removed_events:
+        delta["events"] = {"upserted": upserted, "removed": removed_events}
+    return delta, new_state
+
+
+def build_snapshot(data, sections=None):
+    """Build a resync message carrying the full content of some sections (all when None)."""
+    return {
+        "type": "snapshot",
+        "generation": data["meta"].get("generation"),
+        "contentHash": data["meta"].get("contentHash"),
+        "generated": data["meta"].get("generated"),
+        "sections": {name: value for name, value in data.items()
+                     if name != "meta" and (sections is None or name in sections)}
+    }
+
+
+def filter_delta(delta, sections):
+    """
+    Restrict a delta to the sections a subscriber wants.
+
+    Returns:
+        The filtered delta, or None if none of its changes are wanted
+    """
+    if sections is None:
+        return delta
+    filtered = dict(delta, sections={name: value for name, value in delta["sections"].items() if name in sections})
+    filtered.pop("events", None)
+    if "events" in sections and "events" in delta:
+        filtered["events"] = delta["events"]
+    if "removedSections" in delta:
+        filtered["removedSections"] = [name for name in delta["removedSections"] if name in sections]
+    if not filtered["sections"] and "events" not in filtered and not filtered.get("removedSections"):
+        return None
+    return filtered
+
+
+class SubscriptionRegistry:
+    """Webhook subscribers, with their pending deltas and delivery state."""
+
+    def __init__(self, path=SUBSCRIPTIONS_FILE):
+        self.path = Path(path)
+        # subscriber_id -> {"id", "url", "sections", "pending", "resync", "failures", "retryAt", "delivered"}
+        self.subscribers = {}
+        if self.path.exists():
+            try:
+                with open(self.path, 'r') as f:
+                    self.subscribers = json.load(f)["subscribers"]
+            except (OSError, json.JSONDecodeError, KeyError) as e:
+                logger.warning(f"Ignoring unreadable subscriptions file {self.path}: {e}")
+
+    def __len__(self):
+        return len(self.subscribers)
+
+    def subscribe(self, url, sections=None, subscriber_id=None):
+        """
+        Add or update a webhook subscriber. New subscribers start with a resync.
+
+        Args:
+            url: Webhook URL
+            sections: Section names to receive (None for all)
+            subscriber_id: Optional ID (defaults to a hash of the URL)
+
+        Returns:
+            The subscriber ID
+        """
+        subscriber_id = subscriber_id or hashlib.sha1(url.encode("utf-8")).hexdigest()[:12]
+        existing = self.subscribers.get(subscriber_id)
+        if existing:
+            existing.update({"url": url, "sections": sections})
+        else:
+            self.subscribers[subscriber_id] = {
+                "id": subscriber_id,
+                "url": url,
+                "sections": sections,
+                "pending": [],
+                "resync": True,
+                "failures": 0,
+                "retryAt": 0,
+                "delivered": None
+            }
+        return subscriber_id
+
+    def unsubscribe(self, subscriber_id):
+        """Remove a subscriber. Returns True if it existed."""
+        return self.subscribers.pop(subscriber_id, None) is not None
+
+    def save(self):
+        """
+        Save the registry atomically.
+
+        Returns:
+            True if successful, False otherwise
+        """
+        try:
+            tmp_path = self.path.with_name(self.path.name + ".tmp")
+            with open(tmp_path, 'w') as f:
+                json.dump({"subscribers": self.subscribers}, f, indent=1)
+            os.replace(tmp_path, self.path)
+            return True
+        except Exception as e:
+            logger.error(f"Error saving subscriptions to {self.path}: {e}")
+            return False
+
+
+def post_json(url, payload, timeout=WEBHOOK_TIMEOUT):
+    """POST a JSON payload, raising on failure."""
+    # Imported here, like the rest of the delivery machinery, so the updater only pays for it when pushing
+    import urllib.request
+    body = json.dumps(payload).encode("utf-8")
+    request = urllib.request.Request(url, data=body, headers={"Content-Type": "application/json"})
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        response.read()
+
+
+class FanoutDispatcher:
+    """Queues deltas per subscriber and delivers them in batches, in parallel."""
+
+    def __init__(self, registry, max_pending=MAX_PENDING_DELTAS, batch_size=BATCH_SIZE,
+                 workers=FANOUT_WORKERS, timeout=WEBHOOK_TIMEOUT):
+        self.registry = registry
+        self.max_pending = max_pending
+        self.batch_size = batch_size
+        self.workers = workers
+        self.timeout = timeout
+
+    def enqueue(self, delta):
+        """
+        Queue a delta for every subscriber that wants part of it.
+
+        Returns:
+            Number of subscribers it was queued for
+        """
+        queued = 0
+        for subscriber in self.registry.subscribers.values():
+            if subscriber["resync"]:
+                # The coming snapshot covers this delta
+                continue
+            filtered = filter_delta(delta, subscriber["sections"])
+            if filtered is None:
+                continue
+            subscriber["pending"].append(filtered)
+            if len(subscriber["pending"]) > self.max_pending:
+                logger.warning(f"Subscriber {subscriber['id']} is {len(subscriber['pending'])} deltas behind, resyncing")
+                subscriber["pending"] = []
+                subscriber["resync"] = True
+            queued += 1
+        return queued
+
+    def _deliver(self, subscriber, data):
+        """Send one batch to a subscriber. Returns (subscriber, number of deltas sent, error)."""
+        if subscriber["resync"]:
+            batch = [build_snapshot(data, subscriber["sections"])]
+        else:
+            batch = subscriber["pending"][:self.batch_size]
+        try:
+            post_json(subscriber["url"], {"subscriber": subscriber["id"], "deltas": batch}, self.timeout)
+            return subscriber, len(batch), None
+        except Exception as e:
+            return subscriber, 0, e
+
+    def dispatch(self, data, now=None):
+        """
+        Deliver the pending deltas (or resync snapshots) of every subscriber that is due.
+
+        Args:
+            data: Current published document, for snapshots
+            now: Unix time (defaults to the current time)
+
+        Returns:
+            Tuple of (subscribers delivered to, subscribers that failed)
+        """
+        now = time.time() if now is None else now
+        due = [subscriber for subscriber in self.registry.subscribers.values()
+               if (subscriber["pending"] or subscriber["resync"]) and subscriber["retryAt"] <= now]
+        if not due:
+            return 0, 0
+
+        from concurrent.futures import ThreadPoolExecutor
+        delivered = failed = 0
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(due))) as executor:
+            for subscriber, sent, error in executor.map(lambda s: self._deliver(s, data), due):
+                if error is not None:
+                    subscriber["failures"] += 1
+                    subscriber["retryAt"] = now + min(RETRY_DELAY * 2 ** (subscriber["failures"] - 1), MAX_RETRY_DELAY)
+                    logger.warning(f"Push to {subscriber['id']} failed ({subscriber['failures']} in a row): {error}")
+                    failed += 1
+                    continue
+                if subscriber["resync"]:
+                    subscriber["resync"] = False
+                    subscriber["pending"] = []
+                else:
+                    subscriber["pending"] = subscriber["pending"][sent:]
+                subscriber["failures"] = 0
+                subscriber["retryAt"] = 0
+                subscriber["delivered"] = data["meta"].get("generation")
+                delivered += 1
+        return delivered, failed
+
+
+def read_delta_log(path=PUSH_LOG_FILE):
+    """Read the deltas in the log, oldest first."""
+    path = Path(path)
+    if not path.exists():
+        return []
+    with open(path, 'r') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def append_delta_log(delta, path=PUSH_LOG_FILE, limit=DELTA_LOG_LIMIT):
+    """Append a delta to the log, keeping only the newest `limit` deltas."""
+    path = Path(path)
+    deltas = read_delta_log(path)[-(limit - 1):] + [delta] if limit > 1 else [delta]
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, 'w') as f:
+        for entry in deltas:
+            f.write(json.dumps(entry) + "\n")
+    os.replace(tmp_path, path)
+
+
+def load_push_state(path=PUSH_STATE_FILE):
+    """Load the section hashes of the last pushed generation."""
+    path = Path(path)
+    if not path.exists():
+        return {}
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        logger.warning(f"Ignoring unreadable push state {path}: {e}")
+        return {}
+
+
+def save_push_state(state, path=PUSH_STATE_FILE):
+    """Save the push state atomically."""
+    path = Path(path)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, 'w') as f:
+        json.dump(state, f)
+    os.replace(tmp_path, path)
+
+
+def push_update(data, registry_path=SUBSCRIPTIONS_FILE, state_path=PUSH_STATE_FILE, log_path=PUSH_LOG_FILE):
+    """
+    Push a published document's changes to SSE clients (via the log) and webhook subscribers.
+
+    Also retries subscribers with deliveries still pending from earlier runs.
+
+    Returns:
+        Tuple of (subscribers delivered to, subscribers that failed), or None on failure
+    """
+    try:
+        with publish_lock(registry_path):
+            delta, state = build_delta(data, load_push_state(state_path))
+            registry = SubscriptionRegistry(registry_path)
+            dispatcher = FanoutDispatcher(registry)
+            if delta is not None:
+                append_delta_log(delta, log_path)
+                queued = dispatcher.enqueue(delta)
+                logger.info(f"Queued generation {delta['generation']} for {queued} of {len(registry)} subscribers")
+            counts = dispatcher.dispatch(data)
+            save_push_state(state, state_path)
+            if not registry.save():
+                return None
+        return counts
+    except Exception as e:
+        logger.error(f"Error pushing update: {e}")
+        return None
+
+
+def main():
+    """Manage webhook subscriptions, or serve deltas over SSE."""
+    parser = argparse.ArgumentParser(description="Push calendar changes to subscribers")
+    parser.add_argument("--registry", default=SUBSCRIPTIONS_FILE, help="Subscription registry file")
+    commands = parser.add_subparsers(dest="command", required=True)
+    subscribe = commands.add_parser("subscribe", help="Add a webhook subscriber")
+    subscribe.add_argument("url")
+    subscribe.add_argument("--sections", help="Comma-separated sections (default: all)")
+    subscribe.add_argument("--id", help="Subscriber ID (default: derived from the URL)")
+    unsubscribe = commands.add_parser("unsubscribe", help="Remove a webhook subscriber")
+    unsubscribe.add_argument("id")
+    commands.add_parser("list", help="List webhook subscribers")
+    serve = commands.add_parser("serve", help="Serve deltas as server-sent events at /events")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8766)
+    serve.add_argument("--log", default=PUSH_LOG_FILE, help="Delta log file")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    if args.command == "serve":
+        from push_server import start_sse_server
+        server, stop = start_sse_server(args.host, args.port, args.log)
+        print(f"Serving deltas at http://{args.host}:{server.server_address[1]}/events")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            stop.set()
+            server.shutdown()
+        return True
+
+    with publish_lock(args.registry):
+        registry = SubscriptionRegistry(args.registry)
+        if args.command == "subscribe":
+            sections = args.sections.split(",") if args.sections else None
+            print(registry.subscribe(args.url, sections, args.id))
+        elif args.command == "unsubscribe":
+            if not registry.unsubscribe(args.id):
+                logger.error(f"No subscriber {args.id}")
+                return False
+        else:
+            for subscriber in registry.subscribers.values():
+                print(f"{subscriber['id']}  {subscriber['url']}  sections={','.join(subscriber['sections'] or ['all'])}  "
+                      f"pending={len(subscriber['pending'])}  delivered={subscriber['delivered']}")
+            return True
+        return registry.save()
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
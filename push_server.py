@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Push Server
+===========
+
+Server-sent event stream of calendar deltas, started by `push.py serve`.
+
+A DeltaBroker tails the delta log written by push.push_update() and fans new
+deltas out to the connected clients. Each client has a bounded queue; a
+client that falls SSE_QUEUE_SIZE messages behind, or reconnects with a
+Last-Event-ID older than the log, is sent a "resync" event instead of the
+deltas it missed.
+"""
+
+import json
+import logging
+import queue
+import threading
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from push import PUSH_LOG_FILE, filter_delta, read_delta_log
+
+logger = logging.getLogger("push")
+
+# Messages an SSE client may have queued before it is resynced
+SSE_QUEUE_SIZE = 32
+SSE_KEEPALIVE_SECONDS = 15
+LOG_POLL_SECONDS = 1
+
+
+class SSEClient:
+    """A connected SSE client with a bounded message queue."""
+
+    def __init__(self, sections):
+        self.sections = sections
+        self.queue = queue.Queue(maxsize=SSE_QUEUE_SIZE)
+        self.overflowed = False
+
+    def offer(self, delta):
+        """Queue a delta without blocking. A full queue marks the client for resync."""
+        filtered = filter_delta(delta, self.sections)
+        if filtered is None or self.overflowed:
+            return
+        try:
+            self.queue.put_nowait(filtered)
+        except queue.Full:
+            self.overflowed = True
+
+
+class DeltaBroker:
+    """Tails the delta log and fans new deltas out to connected SSE clients."""
+
+    def __init__(self, log_path=PUSH_LOG_FILE):
+        self.log_path = Path(log_path)
+        self.clients = set()
+        self.lock = threading.Lock()
+        deltas = read_delta_log(self.log_path)
+        self.last_generation = deltas[-1]["generation"] if deltas else 0
+
+    def connect(self, sections, last_event_id=None):
+        """
+        Register a client, queueing the deltas it missed since last_event_id.
+
+        Returns:
+            (SSEClient, needs_resync), where needs_resync means the missed
+            deltas are no longer in the log
+        """
+        client = SSEClient(sections)
+        needs_resync = False
+        with self.lock:
+            if last_event_id is not None:
+                # Deltas after last_generation reach the client through poll()
+                missed = [delta for delta in read_delta_log(self.log_path)
+                          if last_event_id < delta["generation"] <= self.last_generation]
+                needs_resync = bool(missed) and missed[0]["generation"] != last_event_id + 1
+                if not needs_resync:
+                    for delta in missed:
+                        client.offer(delta)
+            self.clients.add(client)
+        return client, needs_resync or client.overflowed
+
+    def disconnect(self, client):
+        with self.lock:
+            self.clients.discard(client)
+
+    def poll(self):
+        """Fan out deltas added to the log since the last poll. Returns how many were new."""
+        new = [delta for delta in read_delta_log(self.log_path) if delta["generation"] > self.last_generation]
+        with self.lock:
+            for delta in new:
+                for client in self.clients:
+                    client.offer(delta)
+        if new:
+            self.last_generation = new[-1]["generation"]
+        return len(new)
+
+    def run(self, stop):
+        """Poll the log until the stop event is set."""
+        while not stop.wait(LOG_POLL_SECONDS):
+            try:
+                self.poll()
+            except Exception as e:
+                logger.warning(f"Error reading delta log {self.log_path}: {e}")
+
+
+class PushEventHandler(BaseHTTPRequestHandler):
+    """Serves GET /events as a server-sent event stream of deltas."""
+
+    broker = None
+
+    def do_GET(self):
+        url = urllib.parse.urlparse(self.path)
+        if url.path.rstrip("/") != "/events":
+            self.send_error(404)
+            return
+        query = urllib.parse.parse_qs(url.query)
+        sections = query["sections"][0].split(",") if "sections" in query else None
+        last_event_id = self.headers.get("Last-Event-ID")
+        client, needs_resync = self.broker.connect(sections, int(last_event_id) if last_event_id else None)
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        try:
+            if needs_resync:
+                self.send_event("resync", None, {"reason": "missed deltas are no longer available"})
+                return
+            while True:
+                try:
+                    delta = client.queue.get(timeout=SSE_KEEPALIVE_SECONDS)
+                except queue.Empty:
+                    self.wfile.write(b": keepalive\n\n")
+                    self.wfile.flush()
+                    continue
+                self.send_event("delta", delta["generation"], delta)
+                if client.overflowed and client.queue.empty():
+                    # Too slow to keep up: tell the client to refetch the document
+                    self.send_event("resync", None, {"reason": "client fell behind"})
+                    return
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            self.broker.disconnect(client)
+
+    def send_event(self, event, event_id, payload):
+        """Send one server-sent event."""
+        lines = [f"event: {event}"]
+        if event_id is not None:
+            lines.append(f"id: {event_id}")
+        lines.append(f"data: {json.dumps(payload)}")
+        self.wfile.write(("\n".join(lines) + "\n\n").encode("utf-8"))
+        self.wfile.flush()
+
+    def log_message(self, format, *args):
+        logger.debug(f"{self.address_string()} {format % args}")
+
+
+def start_sse_server(host="127.0.0.1", port=0, log_path=PUSH_LOG_FILE):
+    """
+    Start the SSE server and its log poller in background threads.
+
+    Returns:
+        (ThreadingHTTPServer, stop event); call server.shutdown() and stop.set() to stop it
+    """
+    broker = DeltaBroker(log_path)
+    handler = type("ConfiguredPushEventHandler", (PushEventHandler,), {"broker": broker})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    stop = threading.Event()
+    threading.Thread(target=broker.run, args=(stop,), daemon=True).start()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, stop
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Recurring Events
+================
+
+RRULE-style weekly recurrence for activities and repeating school events.
+
+Instead of materialising every instance of a weekly club or assembly as its own
+dated row, a RecurrenceRule stores the pattern once:
+- weekly on one or more weekdays (optionally every N weeks)
+- bounded by the term (dtstart/until)
+- with exception dates (half term, PD days, closures)
+
+Instances are expanded lazily for a query window, so the cost of expansion is
+proportional to the window rather than to the length of the calendar.
+"""
+
+import heapq
+from datetime import date, timedelta
+
+WEEKDAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+RRULE_DAYS = ["MO", "TU", "WE", "TH", "FR", "SA", "SU"]
+
+
+class RecurrenceRule:
+    """A weekly recurrence bounded by a start and end date, with exception dates."""
+
+    def __init__(self, template, dtstart, until=None, weekdays=None, interval=1, exdates=()):
+        """
+        Initialize the rule.
+
+        Args:
+            template: Dict of fields copied into every expanded instance
+                (title, time, description, children, ...)
+            dtstart: First possible occurrence (datetime.date)
+            until: Last possible occurrence (datetime.date), or None for open-ended
+            weekdays: Weekdays to repeat on (0=Monday ... 6=Sunday),
+                defaults to the weekday of dtstart
+            interval: Repeat every N weeks
+            exdates: Dates to skip (half term, PD days, ...)
+        """
+        self.template = template
+        self.dtstart = dtstart
+        self.until = until
+        self.weekdays = sorted(set(weekdays if weekdays is not None else [dtstart.weekday()]))
+        self.interval = interval
+        self.exdates = frozenset(exdates)
+
+    def occurrences(self, start, end):
+        """
+        Lazily yield the dates of this rule between start and end (inclusive).
+
+        Jumps straight to the first week in the window, so the cost depends
+        only on the size of the window.
+        """
+        first = max(start, self.dtstart)
+        last = end if self.until is None else min(end, self.until)
+        if first > last:
+            return
+
+        # Weeks are counted from the Monday of the dtstart week
+        anchor = self.dtstart - timedelta(days=self.dtstart.weekday())
+        weeks = (first - anchor).days // 7
+        weeks -= weeks % self.interval
+        week_start = anchor + timedelta(weeks=weeks)
+
+        while week_start <= last:
+            for weekday in self.weekdays:
+                day = week_start + timedelta(days=weekday)
+                if day < first or day in self.exdates:
+                    continue
+                if day > last:
+                    return
+                yield day
+            week_start += timedelta(weeks=self.interval)
+
+    def expand(self, start, end):
+        """Lazily yield (date, event dict) instances between start and end (inclusive)."""
+        for day in self.occurrences(start, end):
+            yield day, {
+                "date": day.day,
+                "month": day.month,
+                "year": day.year,
+                **self.template
+            }
+
+    def to_rrule(self):
+        """Format the rule as an iCalendar RRULE value (without EXDATEs)."""
+        parts = ["FREQ=WEEKLY"]
+        if self.interval != 1:
+            parts.append(f"INTERVAL={self.interval}")
+        parts.append("BYDAY=" + ",".join(RRULE_DAYS[d] for d in self.weekdays))
+        if self.until is not None:
+            # Floating local time, matching the floating DTSTART used in the ICS feed
+            parts.append(f"UNTIL={self.until.strftime('%Y%m%d')}T235959")
+        return ";".join(parts)
+
+    def __repr__(self):
+        return f"RecurrenceRule({self.template.get('title')!r}, {self.to_rrule()})"
+
+
+def expand_rules(rules, start, end):
+    """
+    Lazily expand several rules into one date-ordered stream.
+
+    Args:
+        rules: Iterable of RecurrenceRule
+        start: First date of the query window
+        end: Last date of the query window
+
+    Returns:
+        Iterator of (date, event dict) tuples in date order
+    """
+    streams = [rule.expand(start, end) for rule in rules]
+    return heapq.merge(*streams, key=lambda item: item[0])
+
+
+def activity_rules(child_name, activities, term_start, term_end, exdates=()):
+    """
+    Build weekly rules from a child's activity schedule (see get_child_activities).
+
+    Args:
+        child_name: Name of the child
+        activities: List of {"day": "Monday", "activities": [...]} entries
+        term_start: First day of term
+        term_end: Last day of term
+        exdates: Dates with no school (half term, PD days, ...)
+
+    Returns:
+        List of RecurrenceRule, one per weekly activity
+    """
+    rules = []
+    for day_entry in activities:
+        weekday = WEEKDAYS.index(day_entry["day"])
+        for activity in day_entry["activities"]:
+            template = {
+                "title": activity["title"],
+                "time": activity["time"],
+                "description": f"{activity['title']} with {activity['teacher']}",
+                "location": "School",
+                "type": "Activity",
+                "children": [child_name]
+            }
+            rules.append(RecurrenceRule(template, term_start, term_end, [weekday], exdates=exdates))
+    return rules
+
+
+def collapse_weekly_series(events, min_occurrences=3):
+    """
+    Fold runs of identical weekly events into recurrence rules.
+
+    Events are grouped on every field except the date. Within a group, runs of
+    at least min_occurrences dates spaced exactly one week apart become a single
+    RecurrenceRule; everything else is returned unchanged.
+
+    Args:
+        events: List of event dicts
+        min_occurrences: Shortest run worth folding into a rule
+
+    Returns:
+        Tuple of (rules, remaining event dicts)
+    """
+    groups = {}
+    for event in events:
+        template = {k: v for k, v in event.items() if k not in ("date", "month", "year")}
+        key = tuple(sorted((k, tuple(v) if isinstance(v, list) else v) for k, v in template.items()))
+        day = date(event["year"], event["month"], event["date"])
+        groups.setdefault(key, (template, []))[1].append((day, event))
+
+    rules = []
+    remaining = []
+    for template, dated in groups.values():
+        dated.sort(key=lambda item: item[0])
+        run = [dated[0]]
+        for item in dated[1:] + [None]:
+            if item is not None and (item[0] - run[-1][0]).days == 7:
+                run.append(item)
+                continue
+            if len(run) >= min_occurrences:
+                rules.append(RecurrenceRule(template, run[0][0], run[-1][0]))
+            else:
+                remaining.extend(event for _, event in run)
+            if item is not None:
+                run = [item]
+
+    remaining.sort(key=lambda e: (e['year'], e['month'], e['date']))
+    return rules, remaining
@@ -0,0 +1,481 @@
+#!/usr/bin/env python3
+"""
+Reminder Scheduler
+==================
+
+Sends parents reminders such as "Tomorrow is Sports Wear for Leo" or
+"Odd Sock Day tomorrow" without them opening the app.
+
+Features:
+- A hierarchical timer wheel (one-minute ticks, 64 slots per level) holds the
+  reminders of every tenant: scheduling and cancelling are O(1), and each
+  reminder is cascaded at most once per level before it fires
+- Incremental recompute: sync() compares a tenant's fresh reminders with the
+  scheduled ones by ID and content hash, and only reschedules what changed
+- Pluggable delivery: a local JSON-lines outbox file, or a webhook
+- Reminders that fail to deliver are retried, with the retry time stored, so
+  the next run waits RETRY_DELAY too; sent reminders are remembered until they
+  expire, so a regenerated schedule does not send them twice
+- Each run only places the timers due within its horizon on the wheel; the
+  rest stay in the state file until a run whose horizon reaches them
+
+update_calendar_data.py syncs the reminders every time it runs; this script
+fires the due ones and should run every few minutes from cron:
+
+    */5 * * * * /path/to/reminders.py --sink file
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import sys
+import time
+import urllib.request
+from datetime import datetime
+from pathlib import Path
+
+from metrics import REMINDERS_SENT, finish_run
+from publish import publish_lock
+
+logger = logging.getLogger("reminders")
+
+SCRIPT_DIR = Path(__file__).parent
+REMINDERS_FILE = SCRIPT_DIR / "reminders.json"
+REMINDER_OUTBOX_FILE = SCRIPT_DIR / "reminders_outbox.jsonl"
+STATE_VERSION = 1
+
+TICK_SECONDS = 60
+# 64 slots per level: level 0 spans ~1 hour, level 1 ~3 days, level 2 ~6 months
+WHEEL_SLOTS = 64
+WHEEL_LEVELS = 3
+# Seconds before retrying a reminder whose delivery failed
+RETRY_DELAY = 300
+# Timers due within this many seconds of a run are placed on its wheel (one cron interval)
+LOAD_HORIZON = 5 * 60
+WEBHOOK_TIMEOUT = 10
+
+# Sink: "file", "file:<path>" or a webhook URL
+REMINDER_SINK = os.environ.get("REMINDER_SINK", "file")
+
+
+def to_timestamp(value):
+    """Convert an ISO local datetime string to Unix time."""
+    return datetime.fromisoformat(value).timestamp()
+
+
+def reminder_hash(reminder):
+    """Hash a reminder's content, to detect changes on sync."""
+    data = json.dumps(reminder, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha1(data.encode("utf-8")).hexdigest()
+
+
+class TimerWheel:
+    """
+    Hierarchical timer wheel of timer IDs.
+
+    Level L has WHEEL_SLOTS slots of WHEEL_SLOTS**L ticks each. A timer goes
+    into the lowest level whose span covers it; when the wheel reaches a
+    higher-level slot, that slot's timers cascade down a level. Timers beyond
+    the top level wait in an overflow set that is re-placed once per turn of
+    the top level.
+    """
+
+    def __init__(self, now_tick, slots=WHEEL_SLOTS, levels=WHEEL_LEVELS):
+        self.now_tick = now_tick
+        self.slots = slots
+        self.levels = levels
+        self.wheels = [[set() for _ in range(slots)] for _ in range(levels)]
+        self.overflow = set()
+        # timer_id -> due tick
+        self.due_ticks = {}
+        # timer_id -> the slot set holding it, for O(1) cancel
+        self.buckets = {}
+
+    def __len__(self):
+        return len(self.due_ticks)
+
+    def __contains__(self, timer_id):
+        return timer_id in self.due_ticks
+
+    def schedule(self, timer_id, due_tick):
+        """Schedule (or reschedule) a timer. Overdue timers fire on the next tick."""
+        self.cancel(timer_id)
+        self.due_ticks[timer_id] = max(due_tick, self.now_tick + 1)
+        self._place(timer_id)
+
+    def cancel(self, timer_id):
+        """Cancel a timer. Returns True if it was scheduled."""
+        if timer_id not in self.due_ticks:
+            return False
+        del self.due_ticks[timer_id]
+        self.buckets.pop(timer_id).discard(timer_id)
+        return True
+
+    def _place(self, timer_id):
+        due_tick = self.due_ticks[timer_id]
+        delta = due_tick - self.now_tick
+        granularity = 1
+        bucket = self.overflow
+        for level in range(self.levels):
+            if delta < granularity * self.slots:
+                bucket = self.wheels[level][(due_tick // granularity) % self.slots]
+                break
+            granularity *= self.slots
+        bucket.add(timer_id)
+        self.buckets[timer_id] = bucket
+
+    def _cascade(self, bucket):
+        timer_ids = list(bucket)
+        bucket.clear()
+        for timer_id in timer_ids:
+            self._place(timer_id)
+
+    def advance(self, to_tick):
+        """
+        Move the wheel forward to a tick, firing timers on the way.
+
+        Returns:
+            List of fired timer IDs, in due order
+        """
+        fired = []
+        while self.now_tick < to_tick:
+            if not self.due_ticks:
+                # Nothing scheduled: jump straight there
+                self.now_tick = to_tick
+                break
+            tick = self.now_tick = self.now_tick + 1
+            if tick % self.slots ** self.levels == 0:
+                self._cascade(self.overflow)
+            granularity = self.slots ** (self.levels - 1)
+            for level in range(self.levels - 1, 0, -1):
+                if tick % granularity == 0:
+                    self._cascade(self.wheels[level][(tick // granularity) % self.slots])
+                granularity //= self.slots
+            bucket = self.wheels[0][tick % self.slots]
+            if bucket:
+                for timer_id in sorted(bucket):
+                    del self.due_ticks[timer_id]
+                    del self.buckets[timer_id]
+                    fired.append(timer_id)
+                bucket.clear()
+        return fired
+
+
+class ReminderSink:
+    """Interface for reminder delivery."""
+
+    name = None
+
+    def deliver(self, reminders):
+        """
+        Deliver a batch of reminders.
+
+        Raises:
+            Exception if the batch could not be delivered (it is retried later)
+        """
+        raise NotImplementedError
+
+
+class FileSink(ReminderSink):
+    """Appends reminders to a local JSON-lines outbox."""
+
+    name = "file"
+
+    def __init__(self, path=REMINDER_OUTBOX_FILE):
+        self.path = Path(path)
+
+    def deliver(self, reminders):
+        sent_at = datetime.now().isoformat(timespec="seconds")
+        with open(self.path, 'a') as f:
+            for reminder in reminders:
+                f.write(json.dumps(dict(reminder, sentAt=sent_at)) + "\n")
+
+
+class WebhookSink(ReminderSink):
+    """POSTs each batch of reminders as JSON to a webhook."""
+
+    name = "webhook"
+
+    def __init__(self, url, timeout=WEBHOOK_TIMEOUT):
+        self.url = url
+        self.timeout = timeout
+
+    def deliver(self, reminders):
+        body = json.dumps({"reminders": reminders}).encode("utf-8")
+        request = urllib.request.Request(self.url, data=body, headers={"Content-Type": "application/json"})
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            response.read()
+
+
+def get_sink(spec):
+    """Get a sink from a spec: "file", "file:<path>" or an http(s) webhook URL."""
+    if spec == "file":
+        return FileSink()
+    if spec.startswith("file:"):
+        return FileSink(spec[len("file:"):])
+    if spec.startswith(("http://", "https://")):
+        return WebhookSink(spec)
+    raise ValueError(f"Unknown reminder sink: {spec}")
+
+
+class ReminderScheduler:
+    """Reminders for every tenant, scheduled on one timer wheel."""
+
+    def __init__(self, path=REMINDERS_FILE, now=None, horizon=LOAD_HORIZON):
+        """
+        Load the scheduler state.
+
+        Args:
+            path: JSON state file
+            now: Unix time (defaults to the current time)
+            horizon: Seconds after now whose timers go on the wheel; later
+                timers are kept in the state only
+        """
+        self.path = Path(path)
+        now = time.time() if now is None else now
+        self.horizon = horizon
+        self.horizon_end = now + horizon
+        # timer_id -> {"due", "hash", "reminder"}
+        self.timers = {}
+        # timer_id -> {"hash", "expires"} for reminders already delivered
+        self.sent = {}
+        # tenant -> set of timer_ids
+        self.tenants = {}
+        tick = int(now // TICK_SECONDS)
+
+        if self.path.exists():
+            try:
+                with open(self.path, 'r') as f:
+                    stored = json.load(f)
+                if stored.get("version") == STATE_VERSION:
+                    self.timers = stored["timers"]
+                    self.sent = stored["sent"]
+                    tick = min(tick, stored["tick"])
+            except (OSError, json.JSONDecodeError, KeyError) as e:
+                logger.warning(f"Ignoring unreadable reminder state {self.path}: {e}")
+
+        self.wheel = TimerWheel(tick)
+        for timer_id, timer in self.timers.items():
+            self._schedule(timer_id)
+            self.tenants.setdefault(timer["reminder"]["tenant"], set()).add(timer_id)
+        self.dirty = False
+
+    def __len__(self):
+        return len(self.timers)
+
+    def _schedule(self, timer_id):
+        """Place a stored timer on the wheel if it is due within the horizon."""
+        due = self.timers[timer_id]["due"]
+        if due <= self.horizon_end:
+            self.wheel.schedule(timer_id, int(due // TICK_SECONDS))
+        else:
+            self.wheel.cancel(timer_id)
+
+    def _extend_horizon(self, now):
+        """
+        Place the stored timers that a later moment's horizon now reaches.
+
+        The wheel only resolves whole ticks, so the stored timers are not
+        rescanned until the horizon has moved on by at least one tick.
+        """
+        if now + self.horizon < self.horizon_end + TICK_SECONDS:
+            return
+        self.horizon_end = now + self.horizon
+        for timer_id, timer in self.timers.items():
+            if timer_id not in self.wheel and timer["due"] <= self.horizon_end:
+                self._schedule(timer_id)
+
+    def _cancel(self, timer_id):
+        timer = self.timers.pop(timer_id)
+        self.wheel.cancel(timer_id)
+        self.tenants[timer["reminder"]["tenant"]].discard(timer_id)
+
+    def sync(self, tenant, reminders, now=None):
+        """
+        Make a tenant's schedule match a complete list of reminders, touching only changes.
+
+        Args:
+            tenant: Tenant ID (one family or school)
+            reminders: Iterable of reminder dicts with "id", "due" and "expires"
+                (ISO local datetimes), "title", "message", ...
+            now: Unix time (defaults to the current time)
+
+        Returns:
+            Tuple of (scheduled or rescheduled, cancelled) counts
+        """
+        now = time.time() if now is None else now
+        seen = set()
+        scheduled = 0
+        for reminder in reminders:
+            reminder = dict(reminder, tenant=tenant)
+            timer_id = f"{tenant}/{reminder['id']}"
+            content_hash = reminder_hash(reminder)
+            if to_timestamp(reminder["expires"]) <= now:
+                continue
+            sent = self.sent.get(timer_id)
+            if sent and sent["hash"] == content_hash:
+                continue
+            seen.add(timer_id)
+            timer = self.timers.get(timer_id)
+            if timer and timer["hash"] == content_hash:
+                continue
+            self.timers[timer_id] = {"due": to_timestamp(reminder["due"]), "hash": content_hash, "reminder": reminder}
+            self._schedule(timer_id)
+            self.tenants.setdefault(tenant, set()).add(timer_id)
+            scheduled += 1
+
+        stale = [timer_id for timer_id in self.tenants.get(tenant, ()) if timer_id not in seen]
+        for timer_id in stale:
+            self._cancel(timer_id)
+        if scheduled or stale:
+            self.dirty = True
+        return scheduled, len(stale)
+
+    def fire_due(self, sink, now=None):
+        """
+        Deliver every reminder that is due, as one batch.
+
+        Reminders that expired while nobody was firing them are dropped, and a
+        failed batch is rescheduled RETRY_DELAY seconds later.
+
+        Returns:
+            Number of reminders delivered
+        """
+        now = time.time() if now is None else now
+        self._extend_horizon(now)
+        fired = self.wheel.advance(int(now // TICK_SECONDS))
+        if not fired:
+            return 0
+        # Every fired timer is delivered, dropped as expired or rescheduled below
+        self.dirty = True
+
+        batch = []
+        for timer_id in fired:
+            timer = self.timers[timer_id]
+            if to_timestamp(timer["reminder"]["expires"]) <= now:
+                self._cancel(timer_id)
+                continue
+            batch.append(timer_id)
+        if not batch:
+            return 0
+
+        try:
+            sink.deliver([self.timers[timer_id]["reminder"] for timer_id in batch])
+        except Exception as e:
+            logger.warning(f"Could not deliver {len(batch)} reminders via {sink.name}, retrying later: {e}")
+            for timer_id in batch:
+                # Stored, so a later run does not retry before RETRY_DELAY either
+                self.timers[timer_id]["due"] = now + RETRY_DELAY
+                self._schedule(timer_id)
+            return 0
+
+        for timer_id in batch:
+            timer = self.timers[timer_id]
+            self.sent[timer_id] = {"hash": timer["hash"], "expires": timer["reminder"]["expires"]}
+            self._cancel(timer_id)
+        REMINDERS_SENT.inc(len(batch), sink=sink.name)
+        logger.info(f"Delivered {len(batch)} reminders via {sink.name}")
+        return len(batch)
+
+    def prune_sent(self, now=None):
+        """Forget delivered reminders that have expired. Returns the number forgotten."""
+        now = time.time() if now is None else now
+        expired = [timer_id for timer_id, sent in self.sent.items() if to_timestamp(sent["expires"]) <= now]
+        for timer_id in expired:
+            del self.sent[timer_id]
+        if expired:
+            self.dirty = True
+        return len(expired)
+
+    def save(self):
+        """
+        Save the state atomically, if it changed.
+
+        Returns:
+            True if successful, False otherwise
+        """
+        if not self.dirty and self.path.exists():
+            return True
+        try:
+            tmp_path = self.path.with_name(self.path.name + ".tmp")
+            with open(tmp_path, 'w') as f:
+                json.dump({
+                    "version": STATE_VERSION,
+                    "tick": self.wheel.now_tick,
+                    "timers": self.timers,
+                    "sent": self.sent
+                }, f, indent=1)
+            os.replace(tmp_path, self.path)
+            self.dirty = False
+            return True
+        except Exception as e:
+            logger.error(f"Error saving reminder state to {self.path}: {e}")
+            return False
+
+
+def sync_reminders(tenant, reminders, path=REMINDERS_FILE):
+    """
+    Update a tenant's reminders in the shared state file (under its lock).
+
+    Returns:
+        Tuple of (scheduled or rescheduled, cancelled) counts, or None on failure
+    """
+    try:
+        with publish_lock(path):
+            scheduler = ReminderScheduler(path)
+            counts = scheduler.sync(tenant, reminders)
+            scheduler.prune_sent()
+            if not scheduler.save():
+                return None
+        return counts
+    except Exception as e:
+        logger.error(f"Error syncing reminders for {tenant}: {e}")
+        return None
+
+
+def fire_due_reminders(sink, path=REMINDERS_FILE):
+    """
+    Deliver the due reminders of every tenant from the shared state file (under its lock).
+
+    Returns:
+        Number of reminders delivered, or None on failure
+    """
+    try:
+        with publish_lock(path):
+            scheduler = ReminderScheduler(path)
+            delivered = scheduler.fire_due(sink)
+            if not scheduler.save():
+                return None
+        return delivered
+    except Exception as e:
+        logger.error(f"Error firing reminders: {e}")
+        return None
+
+
+def main():
+    """Deliver the reminders that are due."""
+    parser = argparse.ArgumentParser(description="Deliver due school calendar reminders")
+    parser.add_argument("--sink", default=REMINDER_SINK,
+                        help='"file", "file:<path>" or a webhook URL (default: $REMINDER_SINK or file)')
+    parser.add_argument("--state-file", default=REMINDERS_FILE, help="Reminder state file")
+    parser.add_argument("--metrics-file", help="Prometheus text file to write (default: metrics/reminders.prom)")
+    parser.add_argument("--verbose", action="store_true", help="Log debug messages")
+    args = parser.parse_args()
+    logging.basicConfig(
+        level=logging.DEBUG if args.verbose else logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    success = False
+    try:
+        success = fire_due_reminders(get_sink(args.sink), args.state_file) is not None
+    finally:
+        finish_run("reminders", success, args.metrics_file)
+    return success
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+Rule-Based Event Extractor
+==========================
+
+Deterministic extraction of events from "Dates for your diary" sections of
+school letters, as produced by `pdftotext -layout`.
+
+Recognised layouts (one event per line, under a month heading):
+
+    October
+    Friday 3rd        Poplar Class Assembly        9:00am - 9:30am
+    10th-14th         Anti-Bullying Week
+    Week beginning 8th PE and Clubs Begin
+    Monday 20th October - Friday 24th October   Half Term
+
+Every line that looks like it carries a date is a candidate; the confidence
+score is the share of candidate lines that parsed into events. Documents that
+score below the threshold (or the lines that did not parse) are left for the
+AI parser in gmail_pdf_event_scanner.py.
+"""
+
+import re
+from datetime import date
+
+# Documents scoring at least this are trusted without calling the AI parser
+RULE_CONFIDENCE_THRESHOLD = 0.8
+
+MONTHS = {
+    name: i for i, name in enumerate(
+        ["january", "february", "march", "april", "may", "june", "july",
+         "august", "september", "october", "november", "december"], start=1)
+}
+MONTH_NAMES = "|".join(list(MONTHS) + [m[:3] for m in MONTHS if m != "may"])
+WEEKDAY_NAMES = r'(?:mon|tues?|wed(?:nes)?|thu(?:rs)?|fri|sat(?:ur)?|sun)(?:day)?'
+
+DIARY_HEADING_PATTERN = re.compile(r'dates?\s+for\s+(?:your|the)\s+diary|key\s+dates|diary\s+dates', re.IGNORECASE)
+MONTH_HEADING_PATTERN = re.compile(rf'^\s*({MONTH_NAMES})\.?(?:\s+(20\d\d))?\s*:?\s*$', re.IGNORECASE)
+ACADEMIC_YEAR_PATTERN = re.compile(r'\b(20\d\d)\s*[-/–]\s*(?:20)?(\d\d)\b')
+YEAR_PATTERN = re.compile(r'\b(20\d\d)\b')
+
+DAY = r'(\d{1,2})(?:st|nd|rd|th)?'
+MONTH = rf'(?:\s+({MONTH_NAMES})\.?)?'
+DATE_LINE_PATTERN = re.compile(
+    rf'^\s*(?:(week\s+(?:beginning|commencing))\s+)?(?:{WEEKDAY_NAMES},?\s+)?{DAY}{MONTH}'
+    rf'(?:\s*(?:-|–|to)\s*(?:{WEEKDAY_NAMES},?\s+)?{DAY}{MONTH})?'
+    rf'\s*[:\-–]?\s+(.+?)\s*$',
+    re.IGNORECASE
+)
+CANDIDATE_PATTERN = re.compile(rf'\b\d{{1,2}}(?:st|nd|rd|th)\b|^\s*{WEEKDAY_NAMES}\b', re.IGNORECASE)
+TIME_PATTERN = re.compile(
+    r'\(?\b(\d{1,2}(?:[:.]\d{2})?\s*(?:am|pm)?\s*[-–]\s*\d{1,2}(?:[:.]\d{2})?\s*(?:am|pm)?'
+    r'|\d{1,2}(?:[:.]\d{2})?\s*(?:am|pm))\b\)?',
+    re.IGNORECASE
+)
+# A time with the word introducing it ("at 2pm", "from 9am - 10am"), removed from titles
+TITLE_TIME_PATTERN = re.compile(rf'(?:\b(?:at|from)\s+)?{TIME_PATTERN.pattern}', re.IGNORECASE)
+
+# (pattern, event type), first match wins
+TYPE_RULES = [
+    (re.compile(r'half[\s-]*term|holiday|bank holiday', re.IGNORECASE), "Holiday"),
+    (re.compile(r'closed|closure|pd day|inset', re.IGNORECASE), "Closure"),
+    (re.compile(r'term\s+(?:starts?|begins?|ends?)|last day of term|first day of term', re.IGNORECASE), "Term End"),
+    (re.compile(r'assembly', re.IGNORECASE), "Assembly"),
+    (re.compile(r'trip|visit\b|outing', re.IGNORECASE), "School Trip"),
+    (re.compile(r'exhibition', re.IGNORECASE), "Exhibition"),
+    (re.compile(r'party|birthday|celebrat|festival|fair\b', re.IGNORECASE), "Celebration"),
+    (re.compile(r'meeting|consultation|preparation|assessment|exam|interview', re.IGNORECASE), "Academic"),
+    (re.compile(r'\bweek\b', re.IGNORECASE), "Special Week"),
+    (re.compile(r'club|\bpe\b|swimming|sport', re.IGNORECASE), "Activity"),
+]
+DEFAULT_TYPE = "Special Day"
+
+# Year groups each child belongs to; events naming only one child's year group
+# (or one of its classes) go to that child alone
+CHILD_GROUPS = {
+    "Leo": re.compile(r'year\s*2\b|\b(?:maple|chestnut|pine|poplar)\s+class', re.IGNORECASE),
+    "Novah": re.compile(r'early\s+years|reception|nursery|butterflies', re.IGNORECASE),
+}
+
+
+class ExtractionResult:
+    """Events found by the rule-based extractor, with a confidence score."""
+
+    def __init__(self, events, candidate_lines, unparsed_lines):
+        self.events = events
+        self.candidate_lines = candidate_lines
+        self.unparsed_lines = unparsed_lines
+
+    @property
+    def confidence(self):
+        """Share of date-bearing lines that parsed into events (0.0 - 1.0)."""
+        if not self.events or not self.candidate_lines:
+            return 0.0
+        return (self.candidate_lines - len(self.unparsed_lines)) / self.candidate_lines
+
+    @property
+    def unparsed_text(self):
+        """The lines that did not parse, with their month headings, for the AI parser."""
+        return "\n".join(self.unparsed_lines)
+
+
+def classify_event(title):
+    """Guess the event type from its title."""
+    for pattern, event_type in TYPE_RULES:
+        if pattern.search(title):
+            return event_type
+    return DEFAULT_TYPE
+
+
+def event_children(text):
+    """Get the children an event applies to from year group or class mentions."""
+    matched = [child for child, pattern in CHILD_GROUPS.items() if pattern.search(text)]
+    return matched or list(CHILD_GROUPS)
+
+
+def month_number(name):
+    """Convert a full or abbreviated month name to its number."""
+    name = name.lower().rstrip(".")
+    for month_name, number in MONTHS.items():
+        if month_name.startswith(name):
+            return number
+    return None
+
+
+def _year_for_month(month, start_year, explicit_year=None):
+    """Get the calendar year of a month within an academic year starting in start_year."""
+    if explicit_year:
+        return explicit_year
+    return start_year if month >= 9 else start_year + 1
+
+
+def _make_event(day, month, year, title, time_text, context):
+    """Build an event dict in the standard calendar format."""
+    return {
+        "date": day,
+        "month": month,
+        "year": year,
+        "title": title,
+        "time": time_text or "All Day",
+        "description": f"{title}.",
+        "location": "School",
+        "type": classify_event(title),
+        "children": event_children(context)
+    }
+
+
+def extract_events_with_rules(text, default_year=None):
+    """
+    Extract events from the text of a school letter.
+
+    The year of each date comes from, in order: the month heading ("January
+    2026"), the only calendar year the document mentions, or the academic year
+    ("2025-26", or default_year) with September-December in its first year.
+    With a single calendar year, months earlier than the document's first
+    month are in the following year.
+
+    Args:
+        text: Output of `pdftotext -layout`
+        default_year: Academic start year to assume when the document has none
+            (defaults to the current academic year)
+
+    Returns:
+        ExtractionResult
+    """
+    lines = text.splitlines()
+
+    # Only parse the diary section when the document has one
+    for i, line in enumerate(lines):
+        if DIARY_HEADING_PATTERN.search(line):
+            lines = lines[i + 1:]
+            break
+
+    academic = ACADEMIC_YEAR_PATTERN.search(text)
+    years = {int(year) for year in YEAR_PATTERN.findall(text)}
+    # A letter that only mentions one calendar year ("January 2026") dates its months in that year
+    document_year = years.pop() if not academic and len(years) == 1 else None
+    if academic:
+        start_year = int(academic.group(1))
+    elif document_year:
+        start_year = document_year
+    elif years:
+        start_year = min(years)
+    elif default_year:
+        start_year = default_year
+    else:
+        today = date.today()
+        start_year = today.year if today.month >= 9 else today.year - 1
+
+    events = []
+    unparsed = []
+    candidates = 0
+    month = None
+    month_year = None
+    month_heading = ""
+    first_month = None
+
+    for line in lines:
+        if not line.strip():
+            continue
+
+        heading = MONTH_HEADING_PATTERN.match(line)
+        if heading:
+            month = month_number(heading.group(1))
+            month_year = int(heading.group(2)) if heading.group(2) else None
+            month_heading = line.strip()
+            continue
+
+        if not CANDIDATE_PATTERN.search(line):
+            continue
+        candidates += 1
+
+        match = DATE_LINE_PATTERN.match(line)
+        if not match:
+            unparsed.append(f"{month_heading}: {line.strip()}" if month_heading else line.strip())
+            continue
+
+        _, start_day, start_month, end_day, end_month, rest = match.groups()
+        start_month = month_number(start_month) if start_month else month
+        end_month = month_number(end_month) if end_month else start_month
+        if start_month is None:
+            unparsed.append(line.strip())
+            continue
+
+        time_match = TIME_PATTERN.search(rest)
+        time_text = time_match.group(1).strip() if time_match else None
+        title = re.sub(r'\s{2,}', ' ', TITLE_TIME_PATTERN.sub('', rest)).strip(" -–,:")
+        if not title:
+            unparsed.append(line.strip())
+            continue
+
+        if first_month is None:
+            first_month = start_month
+        explicit_year = month_year
+        if not explicit_year and document_year:
+            # An autumn 2025 letter that goes on to list "January" means January 2026
+            explicit_year = document_year + 1 if start_month < first_month else document_year
+        try:
+            start = date(_year_for_month(start_month, start_year, explicit_year), start_month, int(start_day))
+            if end_day:
+                end = date(_year_for_month(end_month, start_year, explicit_year), end_month, int(end_day))
+                if end < start and end_month < start_month:
+                    # "20th December - 3rd January" runs into the next year
+                    end = date(end.year + 1, end_month, int(end_day))
+        except ValueError:
+            unparsed.append(line.strip())
+            continue
+
+        if end_day and end > start:
+            events.append(_make_event(start.day, start.month, start.year, f"{title} Start", time_text, line))
+            events.append(_make_event(end.day, end.month, end.year, f"{title} End", time_text, line))
+        else:
+            events.append(_make_event(start.day, start.month, start.year, title, time_text, line))
+
+    return ExtractionResult(events, candidates, unparsed)
@@ -11,6 +11,7 @@ fi
 # Get the absolute path to the update script
 SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
 UPDATE_SCRIPT="$SCRIPT_DIR/update_calendar_data.py"
+REMINDER_SCRIPT="$SCRIPT_DIR/reminders.py"
 
 # Create a temporary file for the crontab
 TEMP_CRONTAB=$(mktemp)
@@ -24,10 +25,17 @@ if grep -q "$UPDATE_SCRIPT" "$TEMP_CRONTAB"; then
     grep -v "$UPDATE_SCRIPT" "$TEMP_CRONTAB" > "${TEMP_CRONTAB}.new"
     mv "${TEMP_CRONTAB}.new" "$TEMP_CRONTAB"
 fi
+if grep -q "$REMINDER_SCRIPT" "$TEMP_CRONTAB"; then
+    grep -v "$REMINDER_SCRIPT" "$TEMP_CRONTAB" > "${TEMP_CRONTAB}.new"
+    mv "${TEMP_CRONTAB}.new" "$TEMP_CRONTAB"
+fi
 
 # Add the new schedule (6:00 AM and 6:00 PM)
 echo "0 6,18 * * * $UPDATE_SCRIPT >> $SCRIPT_DIR/cron.log 2>&1" >> "$TEMP_CRONTAB"
 
+# Deliver due reminders every 5 minutes
+echo "*/5 * * * * $REMINDER_SCRIPT >> $SCRIPT_DIR/cron.log 2>&1" >> "$TEMP_CRONTAB"
+
 # Install the new crontab
 crontab "$TEMP_CRONTAB"
 
@@ -35,4 +43,5 @@ crontab "$TEMP_CRONTAB"
 rm "$TEMP_CRONTAB"
 
 echo "The update script has been scheduled to run at 6:00 AM and 6:00 PM daily."
+echo "Reminders will be delivered every 5 minutes."
 echo "You can check the cron.log file in the repository directory for execution logs."
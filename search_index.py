@@ -0,0 +1,355 @@
+#!/usr/bin/env python3
+"""
+Search Index
+============
+
+Inverted full-text index over events, activities and notices, so parents can
+search for "assembly", "PE" or "trip" without the app scanning every event.
+
+Features:
+- Tokenisation with light stemming ("trips" -> "trip", "assemblies" -> "assembly")
+- Title words weigh more than description words
+- Prefix search on the last query word, for search-as-you-type ("assem")
+- Incremental maintenance: documents are added, replaced or removed one at a
+  time (the Gmail scanner adds events as merge_events_with_existing accepts
+  them), and sync() only re-tokenises documents whose content changed
+- A prebuilt search shard (views/search.json) with sorted terms and postings,
+  for clients to search without downloading the full events array
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+from bisect import bisect_left, insort
+from pathlib import Path
+
+from event_model import event_signature
+from publish import publish_lock
+
+logger = logging.getLogger("search_index")
+
+SCRIPT_DIR = Path(__file__).parent
+SEARCH_INDEX_FILE = SCRIPT_DIR / "search_index.json"
+SEARCH_SHARD_NAME = "search.json"
+INDEX_VERSION = 1
+
+# Title words count three times as much as other fields
+FIELD_WEIGHTS = {"title": 3, "description": 1, "location": 1, "teacher": 1, "type": 1}
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "in", "is", "it",
+    "of", "on", "or", "our", "the", "this", "to", "will", "with", "your"
+}
+TOKEN_PATTERN = re.compile(r'[a-z0-9]+')
+DEFAULT_LIMIT = 20
+
+
+def stem(word):
+    """Strip common English suffixes (a light stemmer, not Porter)."""
+    if len(word) <= 3 or word.isdigit():
+        return word
+    if word.endswith("ies") and len(word) > 4:
+        return word[:-3] + "y"
+    if word.endswith("ing") and len(word) > 5:
+        return word[:-3]
+    if word.endswith("ed") and len(word) > 4:
+        return word[:-2]
+    if word.endswith(("ches", "shes", "sses", "xes", "zes")):
+        return word[:-2]
+    if word.endswith("s") and not word.endswith(("ss", "us", "is")):
+        return word[:-1]
+    return word
+
+
+def tokenize(text):
+    """Split text into stemmed search terms, dropping stopwords and single characters."""
+    return [stem(word) for word in TOKEN_PATTERN.findall((text or "").lower())
+            if len(word) > 1 and word not in STOPWORDS]
+
+
+def event_document(event):
+    """Get (doc_id, fields, ref) for an event dict."""
+    return (
+        f"event:{event_signature(event)}",
+        {field: event.get(field, "") for field in ("title", "description", "location", "type")},
+        {
+            "kind": "event",
+            "title": event["title"],
+            "date": f"{event['year']:04d}-{event['month']:02d}-{event['date']:02d}",
+            "type": event.get("type"),
+            "children": event.get("children", [])
+        }
+    )
+
+
+def activity_documents(child_name, activities):
+    """Get (doc_id, fields, ref) for each of a child's weekly activities (get_child_activities format)."""
+    for day_info in activities:
+        for activity in day_info["activities"]:
+            yield (
+                f"activity:{child_name}:{day_info['day']}:{activity['title']}:{activity['time']}",
+                {"title": activity["title"], "teacher": activity.get("teacher", "")},
+                {
+                    "kind": "activity",
+                    "title": activity["title"],
+                    "day": day_info["day"],
+                    "time": activity["time"],
+                    "children": [child_name]
+                }
+            )
+
+
+def notice_document(notice):
+    """Get (doc_id, fields, ref) for a notice dict."""
+    return (
+        f"notice:{notice['id']}",
+        {"title": notice["title"], "description": notice.get("description", "")},
+        {
+            "kind": "notice",
+            "title": notice["title"],
+            "priority": notice.get("priority"),
+            "deadline": notice.get("deadline"),
+            "children": notice.get("children", [])
+        }
+    )
+
+
+def document_hash(fields, ref):
+    """Hash a document's content, to detect changes on sync."""
+    data = json.dumps([fields, ref], sort_keys=True, separators=(",", ":"))
+    return hashlib.sha1(data.encode("utf-8")).hexdigest()
+
+
+class SearchIndex:
+    """Inverted index of terms to weighted document postings."""
+
+    def __init__(self, path=None):
+        """
+        Create an index, loading it from a file if one is given and exists.
+
+        Args:
+            path: Optional JSON file to load from and save to
+        """
+        self.path = Path(path) if path else None
+        # doc_id -> {"kind", "ref", "hash", "terms"}
+        self.docs = {}
+        # term -> {doc_id: weight}
+        self.postings = {}
+        # All terms, sorted, for prefix search
+        self.terms = []
+        self.dirty = False
+
+        if self.path and self.path.exists():
+            try:
+                with open(self.path, 'r') as f:
+                    stored = json.load(f)
+                if stored.get("version") == INDEX_VERSION:
+                    self.docs = stored["docs"]
+                    self.postings = stored["postings"]
+                    self.terms = sorted(self.postings)
+            except (OSError, json.JSONDecodeError, KeyError) as e:
+                logger.warning(f"Rebuilding unreadable search index {self.path}: {e}")
+
+    def __len__(self):
+        return len(self.docs)
+
+    def add(self, doc_id, fields, ref):
+        """
+        Add or replace a document.
+
+        Args:
+            doc_id: Unique document ID ("event:...", "activity:...", "notice:...")
+            fields: Dict of field name -> text
+            ref: What a search result returns for the document (includes "kind")
+
+        Returns:
+            True if the index changed
+        """
+        content_hash = document_hash(fields, ref)
+        existing = self.docs.get(doc_id)
+        if existing and existing["hash"] == content_hash:
+            return False
+        if existing:
+            self.remove(doc_id)
+
+        weights = {}
+        for field, text in fields.items():
+            for term in tokenize(text):
+                weights[term] = weights.get(term, 0) + FIELD_WEIGHTS.get(field, 1)
+        for term, weight in weights.items():
+            postings = self.postings.get(term)
+            if postings is None:
+                postings = self.postings[term] = {}
+                insort(self.terms, term)
+            postings[doc_id] = weight
+
+        self.docs[doc_id] = {"kind": ref["kind"], "ref": ref, "hash": content_hash, "terms": list(weights)}
+        self.dirty = True
+        return True
+
+    def remove(self, doc_id):
+        """Remove a document. Returns True if it was indexed."""
+        doc = self.docs.pop(doc_id, None)
+        if doc is None:
+            return False
+        for term in doc["terms"]:
+            postings = self.postings[term]
+            del postings[doc_id]
+            if not postings:
+                del self.postings[term]
+                del self.terms[bisect_left(self.terms, term)]
+        self.dirty = True
+        return True
+
+    def add_event(self, event):
+        """Add or replace an event dict."""
+        return self.add(*event_document(event))
+
+    def sync(self, kind, documents):
+        """
+        Make the documents of one kind match a complete list, touching only changes.
+
+        Args:
+            kind: "event", "activity" or "notice"
+            documents: Iterable of (doc_id, fields, ref)
+
+        Returns:
+            Tuple of (added or changed, removed) counts
+        """
+        seen = set()
+        changed = 0
+        for doc_id, fields, ref in documents:
+            seen.add(doc_id)
+            if self.add(doc_id, fields, ref):
+                changed += 1
+        stale = [doc_id for doc_id, doc in self.docs.items() if doc["kind"] == kind and doc_id not in seen]
+        for doc_id in stale:
+            self.remove(doc_id)
+        return changed, len(stale)
+
+    def matching_terms(self, prefix):
+        """Get the indexed terms starting with a prefix."""
+        start = bisect_left(self.terms, prefix)
+        end = start
+        while end < len(self.terms) and self.terms[end].startswith(prefix):
+            end += 1
+        return self.terms[start:end]
+
+    def search(self, query, kind=None, child=None, limit=DEFAULT_LIMIT):
+        """
+        Search for documents containing every query word (the last one as a prefix).
+
+        Args:
+            query: Search text, e.g. "class assem"
+            kind: Optional "event", "activity" or "notice"
+            child: Optional child name
+            limit: Maximum number of results
+
+        Returns:
+            List of result refs, best match first, each with a "score"
+        """
+        terms = tokenize(query)
+        if not terms:
+            return []
+
+        scores = None
+        for i, term in enumerate(terms):
+            matches = {}
+            for indexed in (self.matching_terms(term) if i == len(terms) - 1 else [term]):
+                for doc_id, weight in self.postings.get(indexed, {}).items():
+                    matches[doc_id] = max(matches.get(doc_id, 0), weight)
+            if scores is None:
+                scores = matches
+            else:
+                scores = {doc_id: score + matches[doc_id] for doc_id, score in scores.items() if doc_id in matches}
+            if not scores:
+                return []
+
+        results = []
+        for doc_id, score in sorted(scores.items(), key=lambda item: (-item[1], item[0])):
+            ref = self.docs[doc_id]["ref"]
+            if kind and ref["kind"] != kind:
+                continue
+            if child and child not in ref.get("children", []):
+                continue
+            results.append(dict(ref, score=score))
+            if limit is not None and len(results) >= limit:
+                break
+        return results
+
+    def to_shard(self, generated=None):
+        """
+        Build the client search shard.
+
+        Returns:
+            {"generated", "docs": [ref, ...], "terms": {term: [[doc index, weight], ...]}}
+            with terms in sorted order
+        """
+        doc_ids = sorted(self.docs)
+        positions = {doc_id: i for i, doc_id in enumerate(doc_ids)}
+        return {
+            "generated": generated,
+            "docs": [self.docs[doc_id]["ref"] for doc_id in doc_ids],
+            "terms": {
+                term: sorted([positions[doc_id], weight] for doc_id, weight in self.postings[term].items())
+                for term in self.terms
+            }
+        }
+
+    def save(self, path=None):
+        """
+        Save the index atomically, if it changed.
+
+        Returns:
+            True if successful, False otherwise
+        """
+        path = Path(path) if path else self.path
+        if not self.dirty and path == self.path and path.exists():
+            return True
+        try:
+            # The scanner and the updater both write the index
+            with publish_lock(path):
+                tmp_path = path.with_name(path.name + ".tmp")
+                with open(tmp_path, 'w') as f:
+                    json.dump({"version": INDEX_VERSION, "docs": self.docs, "postings": self.postings}, f)
+                os.replace(tmp_path, path)
+            self.dirty = False
+            return True
+        except Exception as e:
+            logger.error(f"Error saving search index to {path}: {e}")
+            return False
+
+
+def sync_calendar_data(index, data):
+    """
+    Bring the index in line with a calendar JSON document (events, activities and notices).
+
+    Returns:
+        Tuple of (added or changed, removed) counts
+    """
+    activities = [doc for child, child_activities in data["activities"].items()
+                  for doc in activity_documents(child, child_activities)]
+    totals = [index.sync("event", (event_document(event) for event in data["events"])),
+              index.sync("activity", activities),
+              index.sync("notice", (notice_document(notice) for notice in data["notices"]))]
+    return sum(t[0] for t in totals), sum(t[1] for t in totals)
+
+
+def write_search_shard(index, output_dir, generated=None):
+    """
+    Write the client search shard to <output_dir>/search.json.
+
+    Returns:
+        True if successful, False otherwise
+    """
+    path = Path(output_dir) / SEARCH_SHARD_NAME
+    try:
+        path.parent.mkdir(exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(index.to_shard(generated), f, indent=1)
+        logger.info(f"Wrote search shard with {len(index.terms)} terms and {len(index)} documents to {path}")
+        return True
+    except Exception as e:
+        logger.error(f"Error writing search shard to {path}: {e}")
+        return False
@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+"""
+Snapshot Store
+==============
+
+History of every published generation of school_calendar_data.json, to
+answer "what did the calendar say yesterday?" without digging through git.
+
+Features:
+- Each generation is split into section chunks ("today", "notices", ...,
+  with "events" split per month), compressed with zlib and stored under their
+  content hash, so unchanged sections and months are stored once across all
+  generations
+- An append-only manifest index (snapshots/index.jsonl) maps generations and
+  publish timestamps to chunk hashes; point-in-time lookups bisect it
+- Diffs between any two generations compare chunk hashes first and only
+  decompress the chunks that differ
+
+Usage:
+    python3 snapshots.py list
+    python3 snapshots.py show --at 2025-10-06T18:00 > calendar_then.json
+    python3 snapshots.py diff 41 42
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import sys
+import zlib
+from bisect import bisect_right
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+
+from event_model import event_signature
+
+logger = logging.getLogger("snapshots")
+
+SCRIPT_DIR = Path(__file__).parent
+SNAPSHOTS_DIR = SCRIPT_DIR / "snapshots"
+INDEX_NAME = "index.jsonl"
+COMPRESSION_LEVEL = 6
+# Decompressed chunks kept in memory per store
+CHUNK_CACHE_SIZE = 256
+
+
+def chunk_bytes(value):
+    """Serialise a chunk canonically, so equal content gets equal hashes."""
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def local_time(when):
+    """
+    Convert a datetime to naive local time, the form publish timestamps are stored in.
+
+    Aware datetimes (e.g. "2025-10-06T18:00+00:00") are converted to the
+    local time zone; naive ones are taken as local already.
+    """
+    if when.tzinfo is not None:
+        return when.astimezone().replace(tzinfo=None)
+    return when
+
+
+def month_key(event):
+    """Get the "YYYY-MM" events chunk an event belongs to."""
+    return f"{event['year']:04d}-{event['month']:02d}"
+
+
+class SnapshotStore:
+    """Content-addressed section chunks plus a manifest per generation."""
+
+    def __init__(self, root=SNAPSHOTS_DIR):
+        """
+        Open a store, loading its manifest index.
+
+        Args:
+            root: Store directory (chunks/ and index.jsonl)
+        """
+        self.root = Path(root)
+        self.chunks_dir = self.root / "chunks"
+        self.index_path = self.root / INDEX_NAME
+        # Manifests in publish order: {"generation", "generated", "contentHash", "sections"}
+        self.manifests = []
+        # Publish times of the manifests, for bisecting
+        self.times = []
+        if self.index_path.exists():
+            with open(self.index_path, 'r') as f:
+                for line in f:
+                    if line.strip():
+                        self._add_manifest(json.loads(line))
+        self.read_chunk = lru_cache(maxsize=CHUNK_CACHE_SIZE)(self._read_chunk)
+
+    def __len__(self):
+        return len(self.manifests)
+
+    def _add_manifest(self, manifest):
+        # Keep the index in time order even if a manifest arrives out of order
+        when = local_time(datetime.fromisoformat(manifest["generated"]))
+        position = bisect_right(self.times, when)
+        self.times.insert(position, when)
+        self.manifests.insert(position, manifest)
+
+    def _chunk_path(self, chunk_hash):
+        return self.chunks_dir / chunk_hash[:2] / f"{chunk_hash}.z"
+
+    def write_chunk(self, value):
+        """
+        Store a chunk if it is not stored already.
+
+        Returns:
+            Tuple of (chunk hash, True if it was new)
+        """
+        data = chunk_bytes(value)
+        chunk_hash = hashlib.sha256(data).hexdigest()
+        path = self._chunk_path(chunk_hash)
+        if path.exists():
+            return chunk_hash, False
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, 'wb') as f:
+            f.write(zlib.compress(data, COMPRESSION_LEVEL))
+        os.replace(tmp_path, path)
+        return chunk_hash, True
+
+    def _read_chunk(self, chunk_hash):
+        with open(self._chunk_path(chunk_hash), 'rb') as f:
+            return json.loads(zlib.decompress(f.read()))
+
+    def record(self, data):
+        """
+        Record a published generation.
+
+        Args:
+            data: Published calendar document (with its meta version stamp)
+
+        Returns:
+            The manifest, or None if the latest snapshot already has this content
+        """
+        meta = data["meta"]
+        if self.manifests and self.manifests[-1]["contentHash"] == meta.get("contentHash") and meta.get("contentHash"):
+            return None
+
+        sections = {}
+        new_chunks = 0
+        for name, value in data.items():
+            if name == "events":
+                months = {}
+                for event in value:
+                    months.setdefault(month_key(event), []).append(event)
+                sections[name] = {}
+                for month, events in sorted(months.items()):
+                    sections[name][month], is_new = self.write_chunk(events)
+                    new_chunks += is_new
+            else:
+                sections[name], is_new = self.write_chunk(value)
+                new_chunks += is_new
+
+        manifest = {
+            "generation": meta.get("generation", len(self.manifests) + 1),
+            "generated": meta["generated"],
+            "contentHash": meta.get("contentHash"),
+            "sections": sections
+        }
+        self.root.mkdir(parents=True, exist_ok=True)
+        with open(self.index_path, 'a') as f:
+            f.write(json.dumps(manifest) + "\n")
+        self._add_manifest(manifest)
+        logger.info(f"Recorded generation {manifest['generation']} with {new_chunks} new chunks")
+        return manifest
+
+    def get(self, generation):
+        """Get the manifest of a generation (the latest one if it was published twice), or None."""
+        for manifest in reversed(self.manifests):
+            if manifest["generation"] == generation:
+                return manifest
+        return None
+
+    def at(self, when):
+        """
+        Get the manifest that was current at a moment.
+
+        Args:
+            when: datetime or ISO string; naive times are local time, aware
+                times are converted to it
+
+        Returns:
+            The last manifest published at or before `when`, or None
+        """
+        if isinstance(when, str):
+            when = datetime.fromisoformat(when)
+        when = local_time(when)
+        position = bisect_right(self.times, when)
+        return self.manifests[position - 1] if position else None
+
+    def reconstruct(self, manifest):
+        """Rebuild the full calendar document of a manifest."""
+        data = {}
+        for name, chunk in manifest["sections"].items():
+            if name == "events":
+                data[name] = [event for month in sorted(chunk) for event in self.read_chunk(chunk[month])]
+            else:
+                data[name] = self.read_chunk(chunk)
+        return data
+
+    def diff(self, old, new):
+        """
+        Compare two manifests, decompressing only the chunks that differ.
+
+        Returns:
+            {"sections": {name: {"before", "after"}}, "events": {"added", "removed", "changed"}}
+            with "added"/"removed" event dicts and "changed" {"before", "after"} pairs
+        """
+        sections = {}
+        names = list(old["sections"]) + [name for name in new["sections"] if name not in old["sections"]]
+        for name in names:
+            if name in ("meta", "events"):
+                continue
+            before, after = old["sections"].get(name), new["sections"].get(name)
+            if before != after:
+                sections[name] = {
+                    "before": self.read_chunk(before) if before else None,
+                    "after": self.read_chunk(after) if after else None
+                }
+
+        old_months, new_months = old["sections"].get("events", {}), new["sections"].get("events", {})
+        old_events, new_events = {}, {}
+        for month in set(old_months) | set(new_months):
+            if old_months.get(month) == new_months.get(month):
+                continue
+            if month in old_months:
+                old_events.update((event_signature(e), e) for e in self.read_chunk(old_months[month]))
+            if month in new_months:
+                new_events.update((event_signature(e), e) for e in self.read_chunk(new_months[month]))
+        events = {
+            "added": [e for signature, e in new_events.items() if signature not in old_events],
+            "removed": [e for signature, e in old_events.items() if signature not in new_events],
+            "changed": [{"before": old_events[signature], "after": e} for signature, e in new_events.items()
+                        if signature in old_events and old_events[signature] != e]
+        }
+        return {"sections": sections, "events": events}
+
+
+def record_snapshot(data, root=SNAPSHOTS_DIR):
+    """
+    Record a published generation in the snapshot store.
+
+    Returns:
+        True if successful, False otherwise
+    """
+    try:
+        SnapshotStore(root).record(data)
+        return True
+    except Exception as e:
+        logger.error(f"Error recording snapshot in {root}: {e}")
+        return False
+
+
+def main():
+    """List, show and diff recorded generations."""
+    parser = argparse.ArgumentParser(description="Browse the history of published calendar data")
+    parser.add_argument("--root", default=SNAPSHOTS_DIR, help="Snapshot store directory")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("list", help="List recorded generations")
+    show = commands.add_parser("show", help="Print a generation's calendar JSON")
+    which = show.add_mutually_exclusive_group(required=True)
+    which.add_argument("--generation", type=int)
+    which.add_argument("--at", help="ISO date/time; shows the generation current at that moment")
+    diff = commands.add_parser("diff", help="Show what changed between two generations")
+    diff.add_argument("old", type=int)
+    diff.add_argument("new", type=int)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    store = SnapshotStore(args.root)
+    if args.command == "list":
+        for manifest in store.manifests:
+            print(f"{manifest['generation']:>6}  {manifest['generated']}  {(manifest['contentHash'] or '')[:12]}  "
+                  f"{sum(1 for _ in manifest['sections'].get('events', {}))} event months")
+        return True
+
+    if args.command == "show":
+        manifest = store.get(args.generation) if args.generation is not None else store.at(args.at)
+        if manifest is None:
+            logger.error("No matching generation")
+            return False
+        json.dump(store.reconstruct(manifest), sys.stdout, indent=2)
+        print()
+        return True
+
+    old, new = store.get(args.old), store.get(args.new)
+    if old is None or new is None:
+        logger.error(f"Generation {args.old if old is None else args.new} is not recorded")
+        return False
+    changes = store.diff(old, new)
+    for name, change in changes["sections"].items():
+        print(f"~ section {name}")
+    for event in changes["events"]["added"]:
+        print(f"+ {event['year']}-{event['month']:02d}-{event['date']:02d} {event['title']}")
+    for event in changes["events"]["removed"]:
+        print(f"- {event['year']}-{event['month']:02d}-{event['date']:02d} {event['title']}")
+    for change in changes["events"]["changed"]:
+        event = change["after"]
+        print(f"~ {event['year']}-{event['month']:02d}-{event['date']:02d} {event['title']}")
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
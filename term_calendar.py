@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Term Calendar
+=============
+
+School-day lookups for the academic year.
+
+Term starts, term ends, half terms and PD days arrive as ordinary events
+("Autumn Term Starts", "Half Term Start"/"Half Term End", "PD Day – School
+Closed", "Last Day of Term"). TermCalendar reads those events once and
+precomputes a per-date bitmap for each academic year (1 September to
+31 August), so is_school_day() is a single byte lookup.
+
+When the events stop part-way through a year (e.g. only the autumn term has
+been published), the days after the last recorded term end are not school
+days: they may be holidays, and nothing is planned for them until the next
+term's dates arrive. is_known() tells those days apart from real closures.
+"""
+
+import re
+from datetime import date, timedelta
+
+# Title patterns used to recognise term boundaries and closures
+HALF_TERM_PATTERN = re.compile(r'half[\s-]*term', re.IGNORECASE)
+TERM_START_PATTERN = re.compile(r'\bterm\s+(starts?|begins?)\b|first day of term', re.IGNORECASE)
+TERM_END_PATTERN = re.compile(r'\bterm\s+ends?\b|last day of term', re.IGNORECASE)
+RANGE_START_PATTERN = re.compile(r'\b(start|starts|begins?)\b', re.IGNORECASE)
+CLOSURE_TYPES = {"Closure", "Holiday"}
+# A term ending in or after this month is the summer term, which ends the academic year
+SUMMER_TERM_END_MONTH = 7
+
+
+def academic_year(day):
+    """Get the academic year (the calendar year it starts in) for a date."""
+    return day.year if day.month >= 9 else day.year - 1
+
+
+def academic_year_bounds(start_year):
+    """Get the first and last date of an academic year."""
+    return date(start_year, 9, 1), date(start_year + 1, 8, 31)
+
+
+class TermCalendar:
+    """Per-date school-day bitmap built from term, holiday and closure events."""
+
+    def __init__(self, events):
+        """
+        Initialize the term calendar.
+
+        Args:
+            events: List of Event records (see event_model.build_events)
+        """
+        self.term_starts = []
+        self.term_ends = []
+        self.closed_ranges = []
+        self._bitmaps = {}
+
+        half_term_start = None
+        for event in sorted(events, key=lambda e: e.ordinal):
+            day = event.date
+            if HALF_TERM_PATTERN.search(event.title):
+                # Half term arrives as a start/end pair of events
+                if RANGE_START_PATTERN.search(event.title):
+                    half_term_start = day
+                else:
+                    self.closed_ranges.append((half_term_start or day, day))
+                    half_term_start = None
+            elif TERM_START_PATTERN.search(event.title):
+                self.term_starts.append(day)
+            elif TERM_END_PATTERN.search(event.title):
+                self.term_ends.append(day)
+            elif event.type in CLOSURE_TYPES:
+                self.closed_ranges.append((day, day))
+
+        if half_term_start is not None:
+            self.closed_ranges.append((half_term_start, half_term_start))
+
+        for year in {academic_year(e.date) for e in events}:
+            self._bitmaps[year] = self._build_bitmap(year)
+
+    def terms(self, start_year=None):
+        """
+        Get the (first day, last day) pairs of each term.
+
+        A term with no recorded start begins on 1 September; a term with no
+        recorded end runs to the end of the academic year.
+
+        Args:
+            start_year: Optional academic year to restrict to
+
+        Returns:
+            List of (date, date) tuples in date order
+        """
+        years = [start_year] if start_year is not None else sorted(self._bitmaps)
+        terms = []
+        for year in years:
+            year_start, year_end = academic_year_bounds(year)
+            starts = [d for d in self.term_starts if year_start <= d <= year_end]
+            ends = [d for d in self.term_ends if year_start <= d <= year_end]
+            if ends and (not starts or ends[0] < starts[0]):
+                starts.insert(0, year_start)
+            for term_start in starts:
+                term_end = next((d for d in ends if d >= term_start), year_end)
+                terms.append((term_start, term_end))
+            if not starts:
+                terms.append((year_start, year_end))
+        return terms
+
+    def known_until(self, start_year):
+        """
+        Get the last date of an academic year whose term dates are known.
+
+        That is the last recorded term end, unless it is the summer term's
+        (or there is none), in which case the whole year is known.
+
+        Args:
+            start_year: Academic year
+
+        Returns:
+            datetime.date
+        """
+        year_start, year_end = academic_year_bounds(start_year)
+        ends = [d for d in self.term_ends if year_start <= d <= year_end]
+        if ends and ends[-1] < date(start_year + 1, SUMMER_TERM_END_MONTH, 1):
+            return ends[-1]
+        return year_end
+
+    def _build_bitmap(self, year):
+        """Build the school-day bitmap for one academic year."""
+        year_start, year_end = academic_year_bounds(year)
+        bitmap = bytearray((year_end - year_start).days + 1)
+
+        for term_start, term_end in self.terms(year):
+            day = term_start
+            while day <= term_end:
+                if day.weekday() < 5:
+                    bitmap[(day - year_start).days] = 1
+                day += timedelta(days=1)
+
+        for closed_start, closed_end in self.closed_ranges:
+            day = max(closed_start, year_start)
+            while day <= min(closed_end, year_end):
+                bitmap[(day - year_start).days] = 0
+                day += timedelta(days=1)
+
+        return bitmap
+
+    def is_school_day(self, day):
+        """
+        Check whether school is open on a date.
+
+        Dates in academic years with no events fall back to weekdays only.
+
+        Args:
+            day: datetime.date or datetime.datetime
+
+        Returns:
+            True if school is open
+        """
+        if hasattr(day, "date"):
+            day = day.date()
+        bitmap = self._bitmaps.get(academic_year(day))
+        if bitmap is None:
+            return day.weekday() < 5
+        return bool(bitmap[(day - date(academic_year(day), 9, 1)).days])
+
+    def is_known(self, day):
+        """
+        Check whether the term dates covering a date have been recorded.
+
+        Days after the last recorded term end of a year are not school days,
+        but are not known closures either.
+
+        Args:
+            day: datetime.date or datetime.datetime
+
+        Returns:
+            True if is_school_day() is based on recorded term dates
+        """
+        if hasattr(day, "date"):
+            day = day.date()
+        if academic_year(day) not in self._bitmaps:
+            return True
+        return day <= self.known_until(academic_year(day))
+
+    def closed_weekdays(self, start, end):
+        """Get the weekdays between start and end (inclusive) when school is closed."""
+        closed = []
+        day = start
+        while day <= end:
+            if day.weekday() < 5 and not self.is_school_day(day):
+                closed.append(day)
+            day += timedelta(days=1)
+        return closed
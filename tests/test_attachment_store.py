@@ -0,0 +1,65 @@
+"""Tests for attachment_store decoding and content-hash deduplication."""
+
+import base64
+import json
+from email.message import EmailMessage
+
+import pytest
+
+from attachment_store import HASH_INDEX_NAME, AttachmentStore, iter_base64_decode
+from mail_backends import iter_attachment_parts, iter_part_chunks
+
+PDF_BYTES = b"%PDF-1.4\n" + bytes(range(256)) * 40
+
+
+def test_base64_decodes_across_odd_chunk_boundaries():
+    encoded = base64.b64encode(PDF_BYTES).decode("ascii")
+    # Wrapped like a MIME body and split at sizes that are not multiples of four
+    wrapped = "\r\n".join(encoded[i:i + 76] for i in range(0, len(encoded), 76))
+    chunks = [wrapped[i:i + 7] for i in range(0, len(wrapped), 7)]
+    assert b"".join(iter_base64_decode(chunks)) == PDF_BYTES
+
+
+def test_urlsafe_unpadded_tail():
+    encoded = base64.urlsafe_b64encode(PDF_BYTES[:100]).rstrip(b"=")
+    assert b"".join(iter_base64_decode([encoded[:50], encoded[50:]], urlsafe=True)) == PDF_BYTES[:100]
+
+
+def test_truncated_base64_is_an_error():
+    with pytest.raises(ValueError):
+        list(iter_base64_decode(["QUJDR"]))
+
+
+def test_base64_mime_part_round_trips():
+    message = EmailMessage()
+    message.set_content("See attached")
+    message.add_attachment(PDF_BYTES, maintype="application", subtype="pdf", filename="diary.pdf")
+    [(attachment_id, part)] = list(iter_attachment_parts(message))
+    chunks = list(iter_part_chunks(part))
+    assert attachment_id == "0"
+    assert b"".join(chunks) == PDF_BYTES
+
+
+def test_identical_content_is_stored_once(tmp_path):
+    store = AttachmentStore(tmp_path)
+    path, digest, already_stored = store.save_stream([PDF_BYTES[:100], PDF_BYTES[100:]], "diary.pdf")
+    assert path == tmp_path / "diary.pdf" and not already_stored
+    assert path.read_bytes() == PDF_BYTES
+
+    # Same content under another name is not written again
+    again = AttachmentStore(tmp_path).save_stream([PDF_BYTES], "diary (1).pdf")
+    assert again == (path, digest, True)
+    assert not (tmp_path / "diary (1).pdf").exists()
+
+    # Different content with a clashing name gets a hash suffix
+    other_path, other_digest, _ = store.save_stream([b"%PDF-1.4 other"], "diary.pdf")
+    assert other_path.name == f"diary-{other_digest[:12]}.pdf"
+    assert json.loads((tmp_path / HASH_INDEX_NAME).read_text()) == {digest: "diary.pdf",
+                                                                    other_digest: other_path.name}
+    assert store.digest(other_path) == other_digest
+
+
+def test_empty_stream_stores_nothing(tmp_path):
+    store = AttachmentStore(tmp_path)
+    assert store.save_stream([], "../../empty.pdf") is None
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,49 @@
+"""Tests for conflicts.ConflictIndex."""
+
+from datetime import date, timedelta
+
+from conflicts import ConflictIndex
+
+
+def test_regular_sibling_pickups_are_reported_once():
+    index = ConflictIndex()
+    start = date(2025, 10, 6)
+    for offset in range(5):
+        day = start + timedelta(days=offset)
+        index.add_pickup("Leo", day, "3:40 PM", "West Gate")
+        index.add_pickup("Novah", day, "3:40 PM", "Meadow Gate")
+    # Same gate: no clash
+    index.add_pickup("Novah", date(2025, 10, 13), "3:40 PM", "West Gate")
+    index.add_pickup("Leo", date(2025, 10, 13), "3:40 PM", "West Gate")
+
+    conflicts = index.conflicts(start, date(2025, 10, 31))
+
+    assert len(conflicts) == 1
+    assert conflicts[0]["type"] == "sibling-pickup"
+    assert conflicts[0]["date"] == "2025-10-06"
+    assert conflicts[0]["dates"] == [(start + timedelta(days=i)).isoformat() for i in range(5)]
+
+
+def test_activity_overlapping_event():
+    index = ConflictIndex()
+    day = date(2025, 10, 7)
+    index.add_activity("Leo", day, {"title": "Chess Club", "time": "15:45-16:45"})
+    index.add_event({"date": 7, "month": 10, "year": 2025, "title": "Parents Evening",
+                     "time": "4:00pm - 6:00pm", "children": ["Leo"]})
+
+    conflicts = index.conflicts(day, day)
+
+    assert [(c["type"], [i["title"] for i in c["items"]]) for c in conflicts] == [
+        ("overlap", ["Chess Club", "Parents Evening"])]
+
+
+def test_activity_uses_stored_minutes():
+    index = ConflictIndex()
+    day = date(2025, 10, 7)
+    # A series row whose time text was normalised at ingest
+    index.add_activity("Leo", day, {"title": "Football", "time": "after school", "startMinute": 15 * 60 + 30,
+                                    "endMinute": 16 * 60 + 30})
+    index.add_event({"date": 7, "month": 10, "year": 2025, "title": "Parents Evening",
+                     "time": "4:00pm - 6:00pm", "children": ["Leo"]})
+
+    assert [c["type"] for c in index.conflicts(day, day)] == ["overlap"]
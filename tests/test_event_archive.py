@@ -0,0 +1,62 @@
+"""Tests for event_archive round trips and the archive read path in verify_events."""
+
+import json
+from datetime import date
+
+import pytest
+
+from event_archive import ArchiveFormatError, EventArchive, write_archive
+from event_model import build_events
+from verify_events import archive_events_by_month, json_events_by_month
+
+
+def make_event(day, title, time="All Day", event_type="Special Day", children=("Leo", "Novah")):
+    return {"date": day.day, "month": day.month, "year": day.year, "title": title, "time": time,
+            "description": f"{title} description", "location": "School", "type": event_type,
+            "children": list(children)}
+
+
+EVENTS = [
+    make_event(date(2025, 9, 3), "Autumn Term Starts", event_type="Academic"),
+    make_event(date(2025, 10, 3), "Harvest Festival", "2:00pm - 3:00pm", "Celebration", ["Leo"]),
+    make_event(date(2025, 10, 3), "Odd Socks Day"),
+    make_event(date(2025, 11, 14), "PD Day", event_type="Closure"),
+    make_event(date(2026, 1, 6), "Spring Term Starts", event_type="Academic"),
+    make_event(date(2026, 1, 9), "Science Show", event_type="Robotics Day"),
+]
+
+
+@pytest.fixture
+def archive_path(tmp_path):
+    path = tmp_path / "events.bin"
+    assert write_archive(build_events(EVENTS), path)
+    return path
+
+
+def test_round_trip_through_mmap(archive_path):
+    with EventArchive(archive_path) as archive:
+        assert len(archive) == len(EVENTS)
+        october = archive.events_in_range(date(2025, 10, 1).toordinal(), date(2025, 10, 31).toordinal())
+        # All-day events first, then by start time
+        assert [e.to_dict() for e in october] == [e.to_dict() for e in build_events(EVENTS[1:3])]
+        assert october[1].start_minute == 14 * 60 and october[1].children == ["Leo"]
+        assert archive.count_in_range(date(2025, 12, 1).toordinal(), date(2025, 12, 31).toordinal()) == 0
+        # Types registered after the writer's type table still map back by name
+        assert [e.type for e in archive][-1] == "Robotics Day"
+
+
+def test_not_an_archive(tmp_path):
+    path = tmp_path / "events.bin"
+    path.write_bytes(b"not an archive, just some bytes for the header")
+    with pytest.raises(ArchiveFormatError):
+        EventArchive(path)
+
+
+def test_verify_reads_the_same_months_from_archive_and_json(archive_path, tmp_path):
+    json_path = tmp_path / "school_calendar_data.json"
+    json_path.write_text(json.dumps({"events": EVENTS}))
+    count, by_month = archive_events_by_month(archive_path)
+    json_count, json_by_month = json_events_by_month(json_path)
+    assert count == json_count == len(EVENTS)
+    assert {month: len(events) for month, events in by_month.items()} == {
+        month: len(events) for month, events in json_by_month.items()}
@@ -0,0 +1,62 @@
+"""Tests for event_model."""
+
+import json
+from datetime import date, datetime
+
+from event_model import (Event, build_events, events_in_range, filter_events, load_ai_extracted_events,
+                         next_events)
+
+
+def make_event(day, title, time="All Day", event_type="Academic", children=("Leo", "Novah")):
+    return {
+        "date": day.day,
+        "month": day.month,
+        "year": day.year,
+        "title": title,
+        "time": time,
+        "description": "",
+        "location": "School",
+        "type": event_type,
+        "children": list(children)
+    }
+
+
+EVENTS = [
+    make_event(date(2025, 10, 3), "Harvest Festival", "2:00pm - 3:00pm", "Celebration"),
+    make_event(date(2025, 10, 3), "Odd Socks Day", event_type="Special Day"),
+    make_event(date(2025, 10, 9), "Maple Class Assembly", "9:00am - 9:30am", "Assembly", ["Leo"]),
+    make_event(date(2025, 10, 20), "Half Term Start", event_type="Holiday"),
+]
+
+
+def test_build_events_sorts_all_day_events_first():
+    events = build_events(EVENTS)
+    assert [e.title for e in events] == ["Odd Socks Day", "Harvest Festival", "Maple Class Assembly",
+                                         "Half Term Start"]
+
+
+def test_to_dict_round_trips_with_minutes():
+    event = Event.from_dict(EVENTS[0])
+    assert event.to_dict() == {**EVENTS[0], "startMinute": 14 * 60, "endMinute": 15 * 60}
+    # All-day events have no minutes to emit
+    assert Event.from_dict(EVENTS[1]).to_dict() == EVENTS[1]
+
+
+def test_filters_and_ranges():
+    events = build_events(EVENTS)
+    assert [e.title for e in filter_events(events, child="Leo", event_type="Assembly")] == ["Maple Class Assembly"]
+    assert filter_events(events, child="Nobody") == []
+    in_range = events_in_range(events, date(2025, 10, 3).toordinal(), date(2025, 10, 9).toordinal())
+    assert len(in_range) == 3
+
+
+def test_next_events_skips_events_already_started():
+    events = build_events(EVENTS)
+    upcoming = next_events(events, datetime(2025, 10, 3, 14, 30), limit=2)
+    assert [e.title for e in upcoming] == ["Maple Class Assembly", "Half Term Start"]
+
+
+def test_load_ai_extracted_events(tmp_path):
+    path = tmp_path / "ai_extracted_events.json"
+    path.write_text(json.dumps(list(reversed(EVENTS))))
+    assert [e.title for e in load_ai_extracted_events(path)][0] == "Odd Socks Day"
@@ -0,0 +1,64 @@
+"""Tests for event_views.EventIndex and write_view_shards."""
+
+import json
+
+from event_model import build_events
+from event_views import EventIndex, write_view_shards
+
+
+def make_event(day, title, event_type, children):
+    return {"date": day, "month": 10, "year": 2025, "title": title, "time": "All Day", "description": "",
+            "location": "School", "type": event_type, "children": list(children)}
+
+
+EVENTS = [
+    make_event(3, "Maple Class Assembly", "Assembly", ["Leo"]),
+    make_event(10, "Butterflies Assembly", "Assembly", ["Novah"]),
+    make_event(14, "PD Day", "Closure", ["Leo", "Novah"]),
+    make_event(17, "Museum Trip", "Trip", ["Leo"]),
+]
+
+
+def titles(events):
+    return [e["title"] for e in events]
+
+
+def read_json(path):
+    return json.loads(path.read_text())
+
+
+def test_views_filter_and_intersect():
+    index = EventIndex(build_events(EVENTS))
+    assert titles(index.view(child="Leo")) == ["Maple Class Assembly", "PD Day", "Museum Trip"]
+    assert titles(index.view(event_type="Assembly")) == ["Maple Class Assembly", "Butterflies Assembly"]
+    assert titles(index.view(child="Novah", event_type="Assembly")) == ["Butterflies Assembly"]
+    assert len(index.view()) == len(EVENTS)
+    assert index.event_types() == ["Assembly", "Closure", "Trip"]
+
+
+def test_shards_and_manifest(tmp_path):
+    assert write_view_shards(EventIndex(build_events(EVENTS)), tmp_path, generated="2025-10-06T07:00:00")
+    manifest = read_json(tmp_path / "index.json")
+    assert manifest["children"]["Novah"] == {"file": "child-novah.json", "count": 2}
+    assert manifest["types"]["Trip"] == {"file": "type-trip.json", "count": 1}
+    shard = read_json(tmp_path / "type-assembly.json")
+    assert shard["filter"] == {"type": "Assembly"}
+    assert titles(shard["events"]) == ["Maple Class Assembly", "Butterflies Assembly"]
+
+
+def test_stale_shards_are_removed(tmp_path):
+    write_view_shards(EventIndex(build_events(EVENTS)), tmp_path)
+    (tmp_path / "search.json").write_text("{}")
+
+    write_view_shards(EventIndex(build_events(EVENTS[:2])), tmp_path)
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        "child-leo.json", "child-novah.json", "index.json", "search.json", "type-assembly.json"]
+
+
+def test_names_with_the_same_slug_get_distinct_shards(tmp_path):
+    events = [make_event(1, "Open Day", "Open Day", ["Leo"]), make_event(2, "Open morning", "Open-Day", ["Leo"])]
+    write_view_shards(EventIndex(build_events(events)), tmp_path)
+    types = read_json(tmp_path / "index.json")["types"]
+    assert types["Open Day"]["file"] == "type-open-day.json"
+    assert types["Open-Day"]["file"] == "type-open-day-2.json"
+    assert titles(read_json(tmp_path / "type-open-day-2.json")["events"]) == ["Open morning"]
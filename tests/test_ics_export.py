@@ -0,0 +1,91 @@
+"""Tests for ics_export."""
+
+import json
+from datetime import date
+
+from ics_export import IcsFeedCache, fold_line, iter_feed_items, iter_ics, render_vevent, write_ics_feed
+from recurrence import RecurrenceRule
+
+
+def make_event(time, **fields):
+    return {"date": 3, "month": 10, "year": 2025, "title": "Harvest Festival", "time": time,
+            "description": "", "location": "School", "type": "Celebration", "children": ["Leo"], **fields}
+
+
+def vevent_lines(event):
+    return render_vevent("uid-1", event, "20251001T000000Z", date(2025, 10, 3)).split("\r\n")
+
+
+def test_time_range_gives_start_and_end():
+    lines = vevent_lines(make_event("2:00pm - 3:00pm"))
+    assert "DTSTART:20251003T140000" in lines
+    assert "DTEND:20251003T150000" in lines
+
+
+def test_single_time_is_not_exported_as_all_day():
+    lines = vevent_lines(make_event("9:30am"))
+    assert "DTSTART:20251003T093000" in lines
+    assert not any(line.startswith("DTEND") for line in lines)
+
+
+def test_stored_minutes_are_used_over_the_time_text():
+    lines = vevent_lines(make_event("After lunch", startMinute=13 * 60, endMinute=14 * 60))
+    assert "DTSTART:20251003T130000" in lines
+    assert "DTEND:20251003T140000" in lines
+
+
+def test_all_day_event():
+    lines = vevent_lines(make_event("All Day"))
+    assert "DTSTART;VALUE=DATE:20251003" in lines
+    assert "DTEND;VALUE=DATE:20251004" in lines
+
+
+def feed_text(events, cache, dtstamp, rules=()):
+    return "".join(iter_ics(iter_feed_items(events, rules), cache, dtstamp))
+
+
+def uid_lines(text):
+    return [line for line in text.split("\r\n") if line.startswith("UID:")]
+
+
+def test_only_changed_events_are_re_rendered(tmp_path):
+    cache = IcsFeedCache(tmp_path / "cache.json")
+    harvest, socks = make_event("2:00pm - 3:00pm"), make_event("All Day", date=17, title="Odd Socks Day")
+    first = feed_text([harvest, socks], cache, "20251001T000000Z")
+    assert first.startswith("BEGIN:VCALENDAR\r\n") and first.endswith("END:VCALENDAR\r\n")
+    assert first.count("BEGIN:VEVENT") == 2
+
+    moved = dict(harvest, time="1:30pm - 3:00pm")
+    second = feed_text([moved, socks], cache, "20251008T000000Z")
+    # The unchanged event keeps its DTSTAMP; the changed one keeps its UID but is re-rendered
+    assert second.count("DTSTAMP:20251001T000000Z") == 1
+    assert second.count("DTSTAMP:20251008T000000Z") == 1
+    assert "DTSTART:20251003T133000" in second
+    assert uid_lines(second) == uid_lines(first)
+
+    # Removed events are dropped from the cache
+    feed_text([socks], cache, "20251009T000000Z")
+    assert len(cache.entries) == 1
+
+
+def test_write_ics_feed_with_weekly_rule(tmp_path):
+    template = {"title": "PE", "time": "9:00am - 10:00am", "description": "PE with Mr Hill",
+                "location": "School", "type": "Activity", "children": ["Leo"]}
+    rule = RecurrenceRule(template, date(2025, 9, 1), date(2025, 12, 19), [0],
+                          exdates=[date(2025, 10, 27), date(2025, 10, 29)])
+    path, cache_path = tmp_path / "calendar.ics", tmp_path / ".ics_cache.json"
+    assert write_ics_feed([make_event("All Day")], [rule], path=path, cache_path=cache_path)
+
+    lines = path.read_bytes().decode("utf-8").split("\r\n")
+    assert "RRULE:FREQ=WEEKLY;BYDAY=MO;UNTIL=20251219T235959" in lines
+    # Only exception dates that fall on the rule's weekdays are listed
+    assert [line for line in lines if line.startswith("EXDATE")] == ["EXDATE:20251027T090000"]
+    assert len(json.loads(cache_path.read_text())) == 2
+    assert not (tmp_path / "calendar.ics.tmp").exists()
+
+
+def test_long_lines_fold_without_splitting_characters():
+    folded = fold_line("DESCRIPTION:" + "Café " * 30)
+    parts = folded[:-2].split("\r\n ")
+    assert all(len(part.encode("utf-8")) <= 75 for part in parts)
+    assert "".join(parts) == "DESCRIPTION:" + "Café " * 30
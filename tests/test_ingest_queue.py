@@ -0,0 +1,60 @@
+"""Tests for ingest_queue.IngestQueue."""
+
+import pytest
+
+from ingest_queue import IngestQueue
+
+
+@pytest.fixture
+def queue(tmp_path):
+    queue = IngestQueue(tmp_path / "queue.sqlite3")
+    yield queue
+    queue.close()
+
+
+def add_downloaded(queue, email_id, content_hash):
+    queue.enqueue(email_id, "att-1", "newsletter.pdf")
+    job = [j for j in queue.jobs("pending") if j["email_id"] == email_id][0]
+    queue.advance(job["id"], "downloaded", pdf_path="/tmp/newsletter.pdf", content_hash=content_hash)
+    return job["id"]
+
+
+def test_duplicate_waits_for_original_in_progress(queue):
+    original = add_downloaded(queue, "email-1", "abc")
+    duplicate = add_downloaded(queue, "email-2", "abc")
+    assert queue.duplicate_of("abc", duplicate) == {"id": original, "state": "downloaded"}
+    # The original never counts itself or a later job as its original
+    assert queue.duplicate_of("abc", original) is None
+
+    queue.advance(original, "parsed", events=[])
+    assert queue.duplicate_of("abc", duplicate) == {"id": original, "state": "parsed"}
+
+
+def test_failed_original_hands_over_to_duplicate(queue):
+    original = add_downloaded(queue, "email-1", "abc")
+    duplicate = add_downloaded(queue, "email-2", "abc")
+    third = add_downloaded(queue, "email-3", "abc")
+    queue.record_failure(original, "text extraction failed", max_attempts=1)
+
+    assert queue.duplicate_of("abc", duplicate) is None
+    assert queue.duplicate_of("abc", third)["id"] == duplicate
+
+
+def test_different_content_is_not_a_duplicate(queue):
+    add_downloaded(queue, "email-1", "abc")
+    other = add_downloaded(queue, "email-2", "def")
+    assert queue.duplicate_of("def", other) is None
+
+
+def test_extracted_text_is_stored_in_chunks(queue):
+    job_id = add_downloaded(queue, "email-1", "abc")
+    for seq, chunk in enumerate(["October 2025\n", "Friday 3rd   Odd Socks Day\n"]):
+        queue.add_chunk(job_id, seq, chunk)
+    queue.advance(job_id, "extracted")
+
+    [job] = queue.jobs("extracted")
+    assert job["text"] is None
+    assert queue.job_text(job) == "October 2025\nFriday 3rd   Odd Socks Day\n"
+
+    queue.discard_chunks(job_id)
+    assert queue.job_text(job) == ""
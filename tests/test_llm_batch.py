@@ -0,0 +1,58 @@
+"""Tests for llm_batch chunking and document ID mapping."""
+
+import json
+import re
+from types import SimpleNamespace
+
+from llm_batch import BatchDocument, BatchEventParser, build_batch_prompt, pack_batches
+
+
+def make_event(day, title):
+    return {
+        "date": day, "month": 10, "year": 2025, "title": title, "time": "All Day",
+        "description": f"{title}.", "location": "School", "type": "Special Day", "children": ["Leo", "Novah"]
+    }
+
+
+class FakeCompletions:
+    """Answers every document in the prompt with one event, streamed a few characters at a time."""
+
+    def __init__(self):
+        self.prompts = []
+
+    def create(self, messages, **kwargs):
+        prompt = messages[-1]["content"]
+        self.prompts.append(prompt)
+        ids = re.findall(r'^=== DOCUMENT (.+) \(', prompt, re.MULTILINE)
+        reply = json.dumps({"documents": [{"id": doc_id, "events": [make_event(i, doc_id)]}
+                                          for i, doc_id in enumerate(ids, start=1)]})
+        return [SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=reply[i:i + 7]))])
+                for i in range(0, len(reply), 7)]
+
+
+def make_parser(default_year=None):
+    completions = FakeCompletions()
+    client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    return BatchEventParser(client, default_year=default_year), completions
+
+
+def test_chunks_map_back_to_documents_with_hash_in_id():
+    long_text = "\n".join(f"Line {i} of the newsletter" for i in range(3000))
+    documents = [
+        BatchDocument("Newsletter #3.pdf", "Newsletter #3.pdf", long_text),
+        BatchDocument("Diary.pdf", "Diary.pdf", "Friday 3rd October  Odd Socks Day"),
+    ]
+    assert len(pack_batches(documents)) > 1
+    parser, _ = make_parser(2025)
+
+    results, missing = parser.parse_documents(documents)
+
+    assert missing == []
+    assert set(results) == {"Newsletter #3.pdf", "Diary.pdf"}
+    assert len(results["Newsletter #3.pdf"]) > 1
+    assert all(e["title"].startswith("Newsletter #3.pdf#") for e in results["Newsletter #3.pdf"])
+
+
+def test_default_year_is_academic_start_year():
+    prompt = build_batch_prompt([BatchDocument("a", "a.pdf", "text")], 2025)
+    assert "September to December are 2025, January to August are 2026" in prompt
@@ -0,0 +1,108 @@
+"""Tests for llm_client.RetryingLLMClient against fake_llm_server."""
+
+import json
+import urllib.error
+import urllib.request
+from types import SimpleNamespace
+
+import pytest
+
+from fake_llm_server import build_response_content, start_fake_server
+from llm_batch import BatchDocument, build_batch_prompt
+from llm_client import CircuitBreaker, CircuitOpenError, RetryingLLMClient
+
+
+class HttpStatusError(Exception):
+    """An HTTP error carrying status_code and response headers, like the OpenAI SDK's APIStatusError."""
+
+    def __init__(self, error):
+        super().__init__(f"HTTP {error.code}")
+        self.status_code = error.code
+        self.response = SimpleNamespace(headers=error.headers)
+
+
+class HttpChatClient:
+    """Non-streaming chat.completions.create over plain HTTP, with no retries of its own."""
+
+    def __init__(self, base_url):
+        self.base_url = base_url
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, **kwargs):
+        request = urllib.request.Request(f"{self.base_url}/chat/completions", data=json.dumps(kwargs).encode("utf-8"),
+                                         headers={"Content-Type": "application/json"})
+        try:
+            with urllib.request.urlopen(request, timeout=5) as response:
+                return json.loads(response.read())
+        except urllib.error.HTTPError as e:
+            raise HttpStatusError(e) from None
+
+
+@pytest.fixture
+def fake_server(request):
+    server = start_fake_server(**request.param)
+    yield server
+    server.shutdown()
+
+
+def make_client(server, **kwargs):
+    base_url = f"http://127.0.0.1:{server.server_address[1]}/v1"
+    return RetryingLLMClient(HttpChatClient(base_url), requests_per_minute=6000, base_delay=0, **kwargs)
+
+
+def request_count(server):
+    return server.RequestHandlerClass.request_count
+
+
+def ask(client):
+    prompt = build_batch_prompt([BatchDocument("1", "diary.pdf", "October 2025\nFriday 3rd   Odd Socks Day\n")], 2025)
+    return client.chat.completions.create(model="fake", messages=[{"role": "user", "content": prompt}])
+
+
+@pytest.mark.parametrize("fake_server", [{"pattern": "429,500,ok"}], indirect=True)
+def test_retries_429_and_500_until_success(fake_server):
+    response = ask(make_client(fake_server))
+    content = json.loads(response["choices"][0]["message"]["content"])
+    assert content["documents"][0]["events"][0]["title"] == "Odd Socks Day"
+    assert request_count(fake_server) == 3
+
+
+@pytest.mark.parametrize("fake_server", [{"pattern": "500"}], indirect=True)
+def test_gives_up_after_max_retries(fake_server):
+    with pytest.raises(HttpStatusError):
+        ask(make_client(fake_server, max_retries=2))
+    assert request_count(fake_server) == 3
+
+
+@pytest.mark.parametrize("fake_server", [{"pattern": "400"}], indirect=True)
+def test_client_errors_are_not_retried(fake_server):
+    with pytest.raises(HttpStatusError):
+        ask(make_client(fake_server))
+    assert request_count(fake_server) == 1
+
+
+@pytest.mark.parametrize("fake_server", [{"pattern": "429", "retry_after": 7}], indirect=True)
+def test_retry_after_header_sets_the_delay(fake_server):
+    client = make_client(fake_server, max_retries=0)
+    with pytest.raises(HttpStatusError) as error:
+        ask(client)
+    assert client.backoff_delay(0, error.value) == 7
+
+
+@pytest.mark.parametrize("fake_server", [{"pattern": "500"}], indirect=True)
+def test_circuit_opens_after_repeated_failures(fake_server):
+    client = make_client(fake_server, max_retries=0, breaker=CircuitBreaker(failure_threshold=2, reset_timeout=60))
+    for _ in range(2):
+        with pytest.raises(HttpStatusError):
+            ask(client)
+    with pytest.raises(CircuitOpenError):
+        ask(client)
+    assert request_count(fake_server) == 2
+
+
+def test_fake_server_reads_any_document_id():
+    documents = [BatchDocument("job 12:part-1", "Spring letter (final).pdf", "March 2026\n2nd   World Book Day\n"),
+                 BatchDocument("7", "diary.pdf", "October 2025\n3rd   Odd Socks Day\n")]
+    content = json.loads(build_response_content(build_batch_prompt(documents, 2025)))
+    assert [(d["id"], d["events"][0]["title"]) for d in content["documents"]] == [
+        ("job 12:part-1", "World Book Day"), ("7", "Odd Socks Day")]
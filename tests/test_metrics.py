@@ -0,0 +1,65 @@
+"""Tests for the Prometheus text exposition in metrics."""
+
+import pytest
+
+from metrics import Counter, Gauge, Histogram, MetricsRegistry, finish_run
+
+
+def test_counter_and_gauge_exposition():
+    registry = MetricsRegistry()
+    hits = registry.register(Counter("test_hits_total", "Cache hits.", ("cache",)))
+    added = registry.register(Counter("test_added_total", "Events added."))
+    success = registry.register(Gauge("test_success", "Last run succeeded.", ("job",)))
+
+    hits.inc(3, cache="ics")
+    hits.inc(cache='mail "index"')
+    success.set(1, job="update")
+    success.set(0, job="update")
+
+    assert hits.value(cache="ics") == 3
+    assert registry.render() == "\n".join([
+        "# HELP test_hits_total Cache hits.",
+        "# TYPE test_hits_total counter",
+        'test_hits_total{cache="ics"} 3',
+        'test_hits_total{cache="mail \\"index\\""} 1',
+        "# HELP test_added_total Events added.",
+        "# TYPE test_added_total counter",
+        "test_added_total 0",
+        "# HELP test_success Last run succeeded.",
+        "# TYPE test_success gauge",
+        'test_success{job="update"} 0',
+    ]) + "\n"
+
+
+def test_labels_must_match():
+    counter = Counter("test_total", "Test.", ("kind",))
+    with pytest.raises(ValueError):
+        counter.inc(stage="merge")
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram("test_seconds", "Stage durations.", ("stage",), buckets=(0.1, 1))
+    for value in (0.05, 0.5, 2.5):
+        histogram.observe(value, stage="merge")
+
+    assert histogram.render()[2:] == [
+        'test_seconds_bucket{stage="merge",le="0.1"} 1',
+        'test_seconds_bucket{stage="merge",le="1"} 2',
+        'test_seconds_bucket{stage="merge",le="+Inf"} 3',
+        'test_seconds_sum{stage="merge"} 3.05',
+        'test_seconds_count{stage="merge"} 3',
+    ]
+    assert histogram.summary() == [(("merge",), 3, 3.05, 2.5)]
+
+    with histogram.time(stage="write"):
+        pass
+    assert [key for key, *_ in histogram.summary()] == [("merge",), ("write",)]
+
+
+def test_finish_run_writes_the_textfile(tmp_path):
+    path = tmp_path / "metrics" / "update_calendar_data.prom"
+    finish_run("update_calendar_data", True, metrics_path=path)
+    text = path.read_text()
+    assert 'schoolcalendar_last_run_success{job="update_calendar_data"} 1' in text
+    assert "# TYPE schoolcalendar_stage_seconds histogram" in text
+    assert not (path.parent / "update_calendar_data.prom.tmp").exists()
@@ -0,0 +1,41 @@
+"""Tests for notices.extract_notices."""
+
+from datetime import date
+
+from notices import MAX_DESCRIPTION_CHARS, extract_notices
+
+SENT = date(2025, 10, 1)
+
+PDF_TEXT = (
+    "Dates for your diary\n"
+    "Friday 3rd October      Odd Socks Day\n"
+    "Please return the permission slip for the Year 2 trip by 10th October\n"
+    "Remember PE kit every Tuesday\n"
+    "\f"
+    "School closed on Friday 14th November for staff training\n"
+)
+
+
+def test_pdf_text_gives_one_notice_per_line():
+    notices = extract_notices(PDF_TEXT, "diary.pdf", SENT, lines=True)
+    by_title = {n["title"]: n for n in notices}
+    assert set(by_title) == {"Permission Slip Needed", "Kit Reminder", "School Closure"}
+    assert by_title["Permission Slip Needed"]["deadline"] == "October 10th"
+    assert by_title["Permission Slip Needed"]["children"] == ["Leo"]
+    assert by_title["School Closure"]["deadline"] == "November 14th"
+    assert by_title["Kit Reminder"]["description"] == "Remember PE kit every Tuesday"
+
+
+def test_email_sentences_and_bullets():
+    body = ("Dear parents,\nplease sign and return the consent form by Friday 10th October.\n"
+            "Other news:\n- Remember your PE kit\n- Non-uniform day on 17th October")
+    titles = sorted(n["title"] for n in extract_notices(body, "email-1", SENT))
+    assert titles == ["Dress-Up Day", "Kit Reminder", "Permission Slip Needed"]
+
+
+def test_description_is_capped_at_a_word_boundary():
+    sentence = "Please return the permission slip " + "with all the details " * 30
+    notice = extract_notices(sentence, "email-2", SENT)[0]
+    assert len(notice["description"]) <= MAX_DESCRIPTION_CHARS
+    assert notice["description"].endswith("…")
+    assert not notice["description"][:-1].endswith(" ")
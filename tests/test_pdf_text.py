@@ -0,0 +1,21 @@
+"""Tests for pdf_text chunking."""
+
+from pdf_text import PAGE_SEPARATOR, iter_stored_pages, iter_text_chunks
+
+
+def test_long_lines_are_split_not_truncated():
+    line = " ".join(f"word{i}" for i in range(200))
+    chunks = list(iter_text_chunks([line + "\nlast line\n"], max_chars=100))
+    assert all(len(chunk) <= 100 for chunk in chunks)
+    assert "".join(chunks) == line + "\nlast line\n"
+
+
+def test_unbroken_line_is_split_at_max_chars():
+    chunks = list(iter_text_chunks(["x" * 250], max_chars=100))
+    assert [len(chunk) for chunk in chunks] == [100, 100, 50]
+
+
+def test_stored_pages_keep_page_ends_on_separate_lines():
+    text = PAGE_SEPARATOR.join(["page one", "page two\n", "page three"])
+    assert list(iter_stored_pages(text)) == ["page one", "page two\n", "page three"]
+    assert "".join(iter_text_chunks(iter_stored_pages(text), max_chars=1000)) == "page one\npage two\npage three"
@@ -0,0 +1,74 @@
+"""Tests for publish.publish_json."""
+
+import json
+import threading
+
+import pytest
+
+from publish import StalePublishError, content_hash, publish_json, publish_lock, read_head
+
+
+def document(events):
+    return {"meta": {"generated": "2025-10-01T07:00:00"}, "events": events}
+
+
+def test_generations_chain_by_parent_hash(tmp_path):
+    path = tmp_path / "data.json"
+    first = document(["a"])
+    assert publish_json(first, path, None)
+    assert read_head(path) == (1, content_hash(first))
+
+    second = document(["a", "b"])
+    assert publish_json(second, path, first["meta"]["contentHash"])
+    assert second["meta"]["generation"] == 2
+    assert second["meta"]["parent"] == first["meta"]["contentHash"]
+
+
+def test_unchanged_content_is_stamped_with_the_head(tmp_path):
+    path = tmp_path / "data.json"
+    publish_json(document(["a"]), path, None)
+    _, head_hash = read_head(path)
+    same = document(["a"])
+    assert not publish_json(same, path, head_hash)
+    assert same["meta"]["generation"] == 1
+    assert same["meta"]["contentHash"] == head_hash
+
+
+def test_stale_parent_is_refused(tmp_path):
+    path = tmp_path / "data.json"
+    publish_json(document(["a"]), path, None)
+    _, stale_hash = read_head(path)
+    publish_json(document(["a", "b"]), path, stale_hash)
+
+    with pytest.raises(StalePublishError):
+        publish_json(document(["a", "c"]), path, stale_hash)
+    assert json.loads(path.read_text())["events"] == ["a", "b"]
+
+
+def test_corrupt_head_is_treated_as_unpublished(tmp_path):
+    path = tmp_path / "data.json"
+    path.write_text("{not json")
+    assert read_head(path) == (0, None)
+    assert publish_json(document(["a"]), path, None)
+
+
+def test_lock_times_out_while_held(tmp_path):
+    path = tmp_path / "data.json"
+    locked = threading.Event()
+    release = threading.Event()
+
+    def hold_lock():
+        with publish_lock(path):
+            locked.set()
+            release.wait(5)
+
+    holder = threading.Thread(target=hold_lock)
+    holder.start()
+    locked.wait(5)
+    try:
+        with pytest.raises(TimeoutError):
+            with publish_lock(path, timeout=0.2):
+                pass
+    finally:
+        release.set()
+        holder.join()
@@ -0,0 +1,102 @@
+"""Tests for push deltas, backpressure and webhook delivery."""
+
+from fake_push_receiver import start_fake_receiver
+from push import (RETRY_DELAY, FanoutDispatcher, SubscriptionRegistry, build_delta, filter_delta, push_update,
+                  read_delta_log)
+
+
+def make_event(day, title):
+    return {"date": day, "month": 10, "year": 2025, "title": title, "time": "All Day", "description": "",
+            "location": "School", "type": "Special Day", "children": ["Leo"]}
+
+
+def document(generation, today, events):
+    return {"meta": {"generation": generation, "parent": None, "contentHash": f"hash-{generation}"},
+            "today": today, "tomorrow": {"date": "Saturday"}, "events": events}
+
+
+def test_delta_carries_changed_sections_and_events():
+    first, state = build_delta(document(1, {"date": "Friday"}, [make_event(3, "Odd Socks Day")]), {})
+    assert set(first["sections"]) == {"today", "tomorrow"}
+    assert first["events"]["upserted"][0]["title"] == "Odd Socks Day"
+
+    second, state = build_delta(document(2, {"date": "Monday"}, [make_event(6, "Harvest")]), state)
+    assert set(second["sections"]) == {"today"}
+    assert second["events"] == {"upserted": [make_event(6, "Harvest")], "removed": ["3-10-2025-Odd Socks Day"]}
+
+    unchanged, _ = build_delta(document(3, {"date": "Monday"}, [make_event(6, "Harvest")]), state)
+    assert unchanged is None
+
+
+def test_filter_delta_to_subscribed_sections():
+    delta, _ = build_delta(document(1, {"date": "Friday"}, [make_event(3, "Odd Socks Day")]), {})
+    assert filter_delta(delta, None) is delta
+    assert set(filter_delta(delta, ["today"])["sections"]) == {"today"}
+    assert "events" not in filter_delta(delta, ["today"])
+    assert filter_delta(delta, ["events"])["sections"] == {}
+    assert filter_delta(delta, ["notices"]) is None
+
+
+def test_subscriber_too_far_behind_is_resynced(tmp_path):
+    registry = SubscriptionRegistry(tmp_path / "subscriptions.json")
+    subscriber_id = registry.subscribe("http://127.0.0.1:1/hook")
+    subscriber = registry.subscribers[subscriber_id]
+    subscriber["resync"] = False
+    dispatcher = FanoutDispatcher(registry, max_pending=2)
+
+    for generation in range(1, 4):
+        delta, _ = build_delta(document(generation, {"date": generation}, []), {})
+        dispatcher.enqueue(delta)
+
+    assert subscriber["pending"] == []
+    assert subscriber["resync"]
+    # Deltas are not queued while a snapshot is due
+    dispatcher.enqueue(delta)
+    assert subscriber["pending"] == []
+
+
+def test_failed_delivery_backs_off_and_is_retried(tmp_path):
+    receiver = start_fake_receiver(pattern="500,500,ok")
+    try:
+        registry = SubscriptionRegistry(tmp_path / "subscriptions.json")
+        subscriber_id = registry.subscribe(f"http://127.0.0.1:{receiver.server_address[1]}/hook", ["today"])
+        subscriber = registry.subscribers[subscriber_id]
+        dispatcher = FanoutDispatcher(registry)
+        data = document(1, {"date": "Friday"}, [])
+
+        assert dispatcher.dispatch(data, now=1000) == (0, 1)
+        assert subscriber["retryAt"] == 1000 + RETRY_DELAY
+        # Not due yet
+        assert dispatcher.dispatch(data, now=1001) == (0, 0)
+        assert dispatcher.dispatch(data, now=1000 + RETRY_DELAY) == (0, 1)
+        assert subscriber["retryAt"] == 1000 + RETRY_DELAY * 3
+
+        assert dispatcher.dispatch(data, now=1000 + RETRY_DELAY * 3) == (1, 0)
+        assert subscriber["failures"] == 0
+        assert not subscriber["resync"]
+        [batch] = receiver.received
+        assert batch["deltas"] == [{"type": "snapshot", "generation": 1, "contentHash": "hash-1",
+                                    "generated": None, "sections": {"today": {"date": "Friday"}}}]
+    finally:
+        receiver.shutdown()
+
+
+def test_push_update_logs_and_delivers_deltas(tmp_path):
+    receiver = start_fake_receiver()
+    paths = {"registry_path": tmp_path / "subscriptions.json", "state_path": tmp_path / "push_state.json",
+             "log_path": tmp_path / "push_log.jsonl"}
+    try:
+        registry = SubscriptionRegistry(paths["registry_path"])
+        registry.subscribe(f"http://127.0.0.1:{receiver.server_address[1]}/hook", ["events"])
+        registry.save()
+
+        assert push_update(document(1, {"date": "Friday"}, [make_event(3, "Odd Socks Day")]), **paths) == (1, 0)
+        assert push_update(document(2, {"date": "Friday"}, [make_event(3, "Odd Socks Day"),
+                                                            make_event(6, "Harvest")]), **paths) == (1, 0)
+
+        assert [delta["generation"] for delta in read_delta_log(paths["log_path"])] == [1, 2]
+        snapshot, delta = [batch["deltas"][0] for batch in receiver.received]
+        assert snapshot["type"] == "snapshot"
+        assert delta["events"]["upserted"] == [make_event(6, "Harvest")]
+    finally:
+        receiver.shutdown()
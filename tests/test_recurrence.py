@@ -0,0 +1,59 @@
+"""Tests for recurrence rules, expansion and weekly series collapsing."""
+
+from datetime import date, timedelta
+
+from recurrence import RecurrenceRule, activity_rules, collapse_weekly_series, expand_rules
+
+TERM_START = date(2025, 9, 1)  # Monday
+TERM_END = date(2025, 12, 19)
+HALF_TERM = [date(2025, 10, 27) + timedelta(days=n) for n in range(5)]
+
+
+def make_event(day, title="Celebration Assembly", time="9:00am"):
+    return {"date": day.day, "month": day.month, "year": day.year, "title": title, "time": time,
+            "description": "", "location": "Hall", "type": "Assembly", "children": ["Leo"]}
+
+
+def test_occurrences_jump_into_the_window():
+    rule = RecurrenceRule({"title": "Swimming"}, TERM_START, TERM_END, weekdays=[0, 3], interval=2,
+                          exdates=[date(2025, 10, 2)])
+    # Window starts mid-week, in an "off" week of the fortnightly rule
+    assert list(rule.occurrences(date(2025, 9, 10), date(2025, 10, 16))) == [
+        date(2025, 9, 15), date(2025, 9, 18), date(2025, 9, 29), date(2025, 10, 13), date(2025, 10, 16)]
+    assert list(rule.occurrences(date(2025, 12, 18), date(2026, 1, 31))) == []
+    assert rule.to_rrule() == "FREQ=WEEKLY;INTERVAL=2;BYDAY=MO,TH;UNTIL=20251219T235959"
+
+
+def test_open_ended_rule_defaults_to_the_start_weekday():
+    rule = RecurrenceRule({"title": "Choir"}, date(2025, 9, 3))
+    assert rule.to_rrule() == "FREQ=WEEKLY;BYDAY=WE"
+    [(day, event)] = list(rule.expand(date(2026, 6, 1), date(2026, 6, 5)))
+    assert day == date(2026, 6, 3)
+    assert event == {"date": 3, "month": 6, "year": 2026, "title": "Choir"}
+
+
+def test_activity_rules_expand_in_date_order_around_half_term():
+    activities = [{"day": "Wednesday", "activities": [{"title": "Forest School", "time": "1:30pm - 3:00pm",
+                                                       "teacher": "Ms Oak"}]},
+                  {"day": "Monday", "activities": [{"title": "PE", "time": "9:00am - 10:00am",
+                                                    "teacher": "Mr Hill"}]}]
+    rules = activity_rules("Leo", activities, TERM_START, TERM_END, exdates=HALF_TERM)
+    expanded = list(expand_rules(rules, date(2025, 10, 20), date(2025, 11, 5)))
+    assert [(day, event["title"]) for day, event in expanded] == [
+        (date(2025, 10, 20), "PE"), (date(2025, 10, 22), "Forest School"),
+        (date(2025, 11, 3), "PE"), (date(2025, 11, 5), "Forest School")]
+    assert expanded[0][1]["description"] == "PE with Mr Hill"
+    assert expanded[0][1]["children"] == ["Leo"]
+
+
+def test_collapse_weekly_series_round_trips():
+    weekly = [make_event(date(2025, 9, 5) + timedelta(weeks=n)) for n in range(4)]
+    after_gap = [make_event(date(2025, 10, 17)), make_event(date(2025, 10, 24))]
+    one_off = make_event(date(2025, 9, 12), "Harvest Festival", "2:00pm")
+
+    rules, remaining = collapse_weekly_series(weekly + after_gap + [one_off])
+    [rule] = rules
+    assert (rule.dtstart, rule.until, rule.weekdays) == (date(2025, 9, 5), date(2025, 9, 26), [4])
+    # The two-week run after the gap is too short to fold
+    assert remaining == [one_off] + after_gap
+    assert [event for _, event in rule.expand(TERM_START, TERM_END)] == weekly
@@ -0,0 +1,78 @@
+"""Tests for reminders.ReminderScheduler."""
+
+from datetime import datetime
+
+from reminders import RETRY_DELAY, ReminderScheduler
+
+
+class RecordingSink:
+    name = "test"
+
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.delivered = []
+
+    def deliver(self, reminders):
+        if self.fail:
+            raise ConnectionError("webhook down")
+        self.delivered.extend(reminders)
+
+
+def ts(value):
+    return datetime.fromisoformat(value).timestamp()
+
+
+def make_reminder(reminder_id, due, expires="2025-10-08T00:00:00"):
+    return {"id": reminder_id, "due": due, "expires": expires, "title": reminder_id, "message": reminder_id}
+
+
+def test_only_timers_within_the_horizon_are_placed_on_the_wheel(tmp_path):
+    path = tmp_path / "reminders.json"
+    now = ts("2025-10-06T12:00:00")
+    scheduler = ReminderScheduler(path, now)
+    scheduler.sync("family", [make_reminder("soon", "2025-10-06T12:03:00"),
+                              make_reminder("later", "2025-10-06T18:00:00")], now)
+    scheduler.save()
+
+    reloaded = ReminderScheduler(path, now)
+    assert len(reloaded) == 2
+    assert len(reloaded.wheel) == 1
+    assert "family/soon" in reloaded.wheel
+
+    sink = RecordingSink()
+    assert reloaded.fire_due(sink, ts("2025-10-06T18:01:00")) == 2
+    assert [r["id"] for r in sink.delivered] == ["soon", "later"]
+
+
+def test_failed_delivery_retry_time_survives_a_restart(tmp_path):
+    path = tmp_path / "reminders.json"
+    now = ts("2025-10-06T18:00:00")
+    scheduler = ReminderScheduler(path, now)
+    scheduler.sync("family", [make_reminder("uniform", "2025-10-06T18:00:00")], now)
+    assert scheduler.fire_due(RecordingSink(fail=True), now + 60) == 0
+    scheduler.save()
+
+    # The next cron run, before the retry delay is up, does not resend
+    sink = RecordingSink()
+    assert ReminderScheduler(path, now + 120).fire_due(sink, now + 120) == 0
+    assert ReminderScheduler(path, now + 60 + RETRY_DELAY).fire_due(sink, now + 60 + RETRY_DELAY) == 1
+
+
+def test_quiet_runs_neither_rescan_nor_save(tmp_path, monkeypatch):
+    path = tmp_path / "reminders.json"
+    now = ts("2025-10-06T12:00:00")
+    scheduler = ReminderScheduler(path, now)
+    scheduler.sync("family", [make_reminder("later", "2025-10-06T18:00:00")], now)
+    scheduler.save()
+
+    reloaded = ReminderScheduler(path, now)
+    rescans = []
+    monkeypatch.setattr(reloaded, "_schedule", rescans.append)
+    # Moments later, within the same tick: no rescan, nothing fired, nothing to save
+    assert reloaded.fire_due(RecordingSink(), now + 1) == 0
+    assert rescans == []
+    assert not reloaded.dirty
+
+    # A tick later the horizon moves on and the stored timers are rescanned
+    reloaded.fire_due(RecordingSink(), now + 6 * 3600)
+    assert rescans == ["family/later"]
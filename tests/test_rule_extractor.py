@@ -0,0 +1,49 @@
+"""Tests for rule_extractor.extract_events_with_rules."""
+
+from rule_extractor import extract_events_with_rules
+
+
+def event_dates(result):
+    return [(e["year"], e["month"], e["date"], e["title"]) for e in result.events]
+
+
+def test_single_calendar_year_dates_months_in_that_year():
+    text = "Dates for your diary\nJanuary 2026\nMonday 5th   Spring Term Starts\nFriday 16th  Harvest at 2pm\n"
+    result = extract_events_with_rules(text, default_year=2025)
+    assert event_dates(result) == [(2026, 1, 5, "Spring Term Starts"), (2026, 1, 16, "Harvest")]
+    assert result.confidence == 1.0
+
+
+def test_single_year_in_text_applies_to_headings_without_a_year():
+    text = "Key dates for spring 2026\nFebruary\nThursday 5th   Maple Class Assembly 9:00am - 9:30am\n"
+    result = extract_events_with_rules(text)
+    assert event_dates(result) == [(2026, 2, 5, "Maple Class Assembly")]
+    assert result.events[0]["time"] == "9:00am - 9:30am"
+    assert result.events[0]["children"] == ["Leo"]
+
+
+def test_academic_year_places_autumn_and_spring_months():
+    text = "Dates for your diary 2025-26\nDecember\n12th   Last Day of Term\nJanuary\n6th   Spring Term Starts\n"
+    result = extract_events_with_rules(text)
+    assert event_dates(result) == [(2025, 12, 12, "Last Day of Term"), (2026, 1, 6, "Spring Term Starts")]
+
+
+def test_range_across_new_year_with_single_year():
+    text = "December 2025\nSaturday 20th December - Sunday 4th January   Christmas Holiday\n"
+    result = extract_events_with_rules(text)
+    assert event_dates(result) == [(2025, 12, 20, "Christmas Holiday Start"), (2026, 1, 4, "Christmas Holiday End")]
+
+
+def test_time_preposition_removed_from_title():
+    text = "October 2025\nFriday 3rd   Harvest Festival at 2pm in the hall\n"
+    result = extract_events_with_rules(text)
+    assert result.events[0]["title"] == "Harvest Festival in the hall"
+    assert result.events[0]["time"] == "2pm"
+
+
+def test_single_year_rolls_earlier_months_into_the_next_year():
+    text = ("Autumn term dates 2025\nOctober\nFriday 3rd   Harvest Festival\nDecember\n"
+            "Friday 19th   Last Day of Term\nJanuary\nMonday 5th   Spring Term Starts\n")
+    result = extract_events_with_rules(text, default_year=2024)
+    assert event_dates(result) == [(2025, 10, 3, "Harvest Festival"), (2025, 12, 19, "Last Day of Term"),
+                                   (2026, 1, 5, "Spring Term Starts")]
@@ -0,0 +1,78 @@
+"""Tests for gmail_pdf_event_scanner.GmailPDFScanner.scan_and_process."""
+
+import json
+import sys
+from functools import partial
+
+import pytest
+
+import gmail_pdf_event_scanner as scanner_module
+from gmail_pdf_event_scanner import GmailPDFScanner
+from ingest_queue import IngestQueue
+from mail_backends import MailboxBackend
+from notices import NoticeStore
+
+# Rule-confident: every line is a dated event
+DIARY_TEXT = "October 2025\nFriday 3rd   Harvest Festival at 2pm\nFriday 17th   Odd Socks Day\n"
+# Nothing the rules can parse, so it needs the AI parser
+LETTER_TEXT = "Dear parents,\nthe trip will be some time after half term, details to follow.\n"
+
+
+class FakeMailbox(MailboxBackend):
+    """One email per attachment; attachment content is the PDF text itself."""
+
+    def __init__(self, attachments):
+        self.attachments = attachments
+
+    def search_school_emails(self):
+        return [{"id": f"email-{n}", "subject": filename, "sender": "office@school.example",
+                 "date": "2025-10-01T08:00:00", "attachments": [{"id": "att-1", "filename": filename}]}
+                for n, filename in enumerate(self.attachments)]
+
+    def get_email_body(self, email_id):
+        return ""
+
+    def iter_attachment_chunks(self, email_id, attachment_id):
+        filename = list(self.attachments)[int(email_id.split("-")[1])]
+        yield self.attachments[filename].encode()
+
+
+class FakePdfBackend:
+    name = "fake"
+
+    def iter_pages(self, pdf_path):
+        yield pdf_path.read_text()
+
+
+@pytest.fixture
+def scanner(tmp_path, monkeypatch):
+    monkeypatch.setattr(scanner_module, "SCRIPT_DIR", tmp_path)
+    monkeypatch.setattr(scanner_module, "PDF_DOWNLOAD_DIR", tmp_path / "downloaded_pdfs")
+    monkeypatch.setattr(scanner_module, "PROCESSED_EMAILS_FILE", tmp_path / "processed_emails.json")
+    monkeypatch.setattr(scanner_module, "EXTRACTED_EVENTS_FILE", tmp_path / "extracted_events.json")
+    monkeypatch.setattr(scanner_module, "SEARCH_INDEX_FILE", tmp_path / "search_index.json")
+    monkeypatch.setattr(scanner_module, "IngestQueue", partial(IngestQueue, tmp_path / "queue.sqlite3"))
+    monkeypatch.setattr(scanner_module, "NoticeStore", partial(NoticeStore, tmp_path / "notices.json"))
+    mailbox = FakeMailbox({"diary.pdf": DIARY_TEXT, "letter.pdf": LETTER_TEXT})
+    scanner = GmailPDFScanner(mailbox=mailbox)
+    scanner.pdf_backend = FakePdfBackend()
+    yield scanner
+    scanner.queue.close()
+
+
+def test_rule_parsed_events_are_merged_without_an_api_key(scanner, tmp_path, monkeypatch):
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    monkeypatch.setitem(sys.modules, "openai", None)  # SDK not installed
+
+    scanner.scan_and_process()
+
+    saved = json.loads((tmp_path / "extracted_events.json").read_text())
+    assert [e["title"] for e in saved] == ["Harvest Festival", "Odd Socks Day"]
+    assert (tmp_path / "search_index.json").exists()
+
+    assert [job["filename"] for job in scanner.queue.jobs("merged")] == ["diary.pdf"]
+    # The AI document stays extracted, to be retried on the next run
+    [letter] = scanner.queue.jobs("extracted")
+    assert letter["filename"] == "letter.pdf"
+    assert letter["last_error"] == "AI parser unavailable"
+    assert json.loads((tmp_path / "processed_emails.json").read_text()) == ["email-0"]
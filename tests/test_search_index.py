@@ -0,0 +1,87 @@
+"""Tests for search_index.SearchIndex."""
+
+import json
+import threading
+
+from publish import publish_lock
+from search_index import SearchIndex, sync_calendar_data, tokenize, write_search_shard
+
+
+def make_event(day, title, description="", event_type="Special Day", children=("Leo",)):
+    return {"date": day, "month": 10, "year": 2025, "title": title, "time": "All Day",
+            "description": description, "location": "School", "type": event_type, "children": list(children)}
+
+
+def calendar_data(events, notices=()):
+    activities = {"Leo": [{"day": "Tuesday", "activities": [{"title": "PE", "time": "9:00am", "teacher": "Mr Hill"}]}],
+                  "Novah": []}
+    return {"events": events, "activities": activities, "notices": list(notices)}
+
+
+EVENTS = [
+    make_event(3, "Class Assembly", "Parents welcome in the hall"),
+    make_event(10, "Museum Trip", "Leo's class visits the Science Museum", "Trip"),
+    make_event(17, "Assemblies Week", children=("Leo", "Novah")),
+]
+
+
+def test_tokenize_stems_and_drops_stopwords():
+    assert tokenize("The Trips to the Museum, and assemblies!") == ["trip", "museum", "assembly"]
+
+
+def test_prefix_search_ranks_title_matches_first():
+    index = SearchIndex()
+    sync_calendar_data(index, calendar_data(EVENTS))
+    assert [r["title"] for r in index.search("assem")] == ["Assemblies Week", "Class Assembly"]
+    assert [r["title"] for r in index.search("class assem")] == ["Class Assembly"]
+    assert [r["title"] for r in index.search("pe", kind="activity")] == ["PE"]
+    assert index.search("assem", child="Novah") == [index.search("assem")[0]]
+    assert index.search("sports day") == []
+
+
+def test_sync_touches_only_changed_documents(tmp_path):
+    index = SearchIndex()
+    assert sync_calendar_data(index, calendar_data(EVENTS)) == (4, 0)
+    assert sync_calendar_data(index, calendar_data(EVENTS)) == (0, 0)
+
+    notice = {"id": "n1", "title": "Trip consent form", "description": "Return by Friday"}
+    changed = [make_event(3, "Class Assembly", "Parents welcome in the hall at 9am")] + EVENTS[1:2]
+    assert sync_calendar_data(index, calendar_data(changed, [notice])) == (2, 1)
+    assert [r["kind"] for r in index.search("trip")] == ["event", "notice"]
+    # "Assemblies Week" was removed; the stem still finds the changed event
+    assert [r["title"] for r in index.search("assemblies")] == ["Class Assembly"]
+
+    assert write_search_shard(index, tmp_path, generated="2025-10-06T07:00:00")
+    shard = json.loads((tmp_path / "search.json").read_text())
+    assert list(shard["terms"]) == sorted(shard["terms"])
+    assert len(shard["docs"]) == len(index)
+
+
+def test_save_round_trips_and_skips_unchanged(tmp_path):
+    path = tmp_path / "search_index.json"
+    index = SearchIndex(path)
+    sync_calendar_data(index, calendar_data(EVENTS))
+    assert index.save()
+
+    loaded = SearchIndex(path)
+    assert loaded.docs == index.docs and loaded.terms == index.terms
+    mtime = path.stat().st_mtime_ns
+    assert loaded.save()
+    assert path.stat().st_mtime_ns == mtime
+
+
+def test_save_waits_for_the_index_lock(tmp_path):
+    path = tmp_path / "search_index.json"
+    index = SearchIndex(path)
+    index.add_event(EVENTS[0])
+    saved = []
+
+    with publish_lock(path):
+        writer = threading.Thread(target=lambda: saved.append(index.save()))
+        writer.start()
+        writer.join(0.3)
+        # Blocked while another process holds the lock
+        assert writer.is_alive() and not path.exists()
+    writer.join()
+    assert saved == [True]
+    assert SearchIndex(path).search("assembly")[0]["title"] == "Class Assembly"
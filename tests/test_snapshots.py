@@ -0,0 +1,83 @@
+"""Tests for snapshots.SnapshotStore."""
+
+from datetime import datetime, timezone
+
+from snapshots import SnapshotStore
+
+
+def make_event(day, month, title):
+    return {"date": day, "month": month, "year": 2025, "title": title, "time": "All Day", "description": "",
+            "location": "School", "type": "Special Day", "children": ["Leo"]}
+
+
+def document(generation, generated, today, events):
+    return {"meta": {"generation": generation, "generated": generated, "contentHash": f"hash-{generation}"},
+            "today": today, "events": events}
+
+
+OCTOBER = [make_event(3, 10, "Odd Socks Day")]
+NOVEMBER = [make_event(14, 11, "PD Day")]
+
+
+def chunk_files(store):
+    return sorted(path.name for path in store.chunks_dir.rglob("*.z"))
+
+
+def make_store(tmp_path):
+    store = SnapshotStore(tmp_path)
+    store.record(document(1, "2025-10-06T07:00:00", {"date": "Monday"}, OCTOBER + NOVEMBER))
+    store.record(document(2, "2025-10-07T07:00:00", {"date": "Tuesday"},
+                          OCTOBER + [make_event(14, 11, "PD Day"), make_event(20, 11, "Book Fair")]))
+    return store
+
+
+def test_unchanged_chunks_are_stored_once(tmp_path):
+    store = SnapshotStore(tmp_path)
+    store.record(document(1, "2025-10-06T07:00:00", {"date": "Monday"}, OCTOBER + NOVEMBER))
+    first = chunk_files(store)
+    assert len(first) == 4  # meta, today, October, November
+
+    store.record(document(2, "2025-10-07T07:00:00", {"date": "Monday"}, OCTOBER + NOVEMBER))
+    second = store.manifests[-1]["sections"]
+    # Only the meta section changed
+    assert len(chunk_files(store)) == 5
+    assert second["events"] == store.manifests[0]["sections"]["events"]
+    # Republishing the latest content is not recorded again
+    assert store.record(document(2, "2025-10-07T08:00:00", {"date": "Monday"}, OCTOBER + NOVEMBER)) is None
+
+
+def test_at_finds_the_generation_current_at_a_moment(tmp_path):
+    store = make_store(tmp_path)
+    assert store.at("2025-10-06T06:59:59") is None
+    assert store.at("2025-10-06T12:00")["generation"] == 1
+    assert store.at(datetime(2025, 10, 7, 7, 0))["generation"] == 2
+    # The index is reloaded from disk in the same order
+    assert SnapshotStore(tmp_path).at("2025-10-06T23:00")["generation"] == 1
+
+
+def test_at_accepts_aware_datetimes(tmp_path):
+    store = make_store(tmp_path)
+    local = datetime(2025, 10, 7, 7, 30)
+    aware = local.astimezone().astimezone(timezone.utc)
+    assert store.at(aware) == store.at(local)
+    assert store.at(aware.isoformat())["generation"] == 2
+
+
+def test_reconstruct_and_diff(tmp_path):
+    make_store(tmp_path)
+    store = SnapshotStore(tmp_path)
+    old, new = store.get(1), store.get(2)
+    assert store.reconstruct(old)["events"] == OCTOBER + NOVEMBER
+
+    changes = SnapshotStore(tmp_path).diff(old, new)
+    assert set(changes["sections"]) == {"today"}
+    assert [e["title"] for e in changes["events"]["added"]] == ["Book Fair"]
+    assert changes["events"]["removed"] == [] and changes["events"]["changed"] == []
+
+
+def test_diff_only_reads_chunks_that_differ(tmp_path):
+    make_store(tmp_path)
+    store = SnapshotStore(tmp_path)
+    store.diff(store.get(1), store.get(2))
+    # today before/after and November before/after; October is shared and never read
+    assert store.read_chunk.cache_info().misses == 4
@@ -0,0 +1,71 @@
+"""Tests for term_calendar.TermCalendar."""
+
+from datetime import date
+
+from event_model import build_events
+from term_calendar import TermCalendar
+
+
+def make_event(day, title, event_type="Academic"):
+    return {
+        "date": day.day,
+        "month": day.month,
+        "year": day.year,
+        "title": title,
+        "time": "All Day",
+        "description": "",
+        "location": "School",
+        "type": event_type,
+        "children": ["Leo", "Novah"]
+    }
+
+
+def make_calendar(*events):
+    return TermCalendar(build_events(list(events)))
+
+
+AUTUMN_ONLY = [
+    make_event(date(2025, 9, 3), "Autumn Term Starts"),
+    make_event(date(2025, 10, 20), "Half Term Start", "Holiday"),
+    make_event(date(2025, 10, 31), "Half Term End", "Holiday"),
+    make_event(date(2025, 11, 14), "PD Day – School Closed", "Closure"),
+    make_event(date(2025, 12, 12), "Last Day of Term", "Term End"),
+]
+
+
+def test_term_days_and_closures():
+    calendar = make_calendar(*AUTUMN_ONLY)
+    assert not calendar.is_school_day(date(2025, 9, 2))
+    assert calendar.is_school_day(date(2025, 9, 3))
+    assert not calendar.is_school_day(date(2025, 9, 6))
+    assert not calendar.is_school_day(date(2025, 10, 22))
+    assert not calendar.is_school_day(date(2025, 11, 14))
+    assert calendar.is_school_day(date(2025, 12, 12))
+
+
+def test_days_after_last_recorded_term_end_are_not_school_days():
+    calendar = make_calendar(*AUTUMN_ONLY)
+    assert calendar.terms() == [(date(2025, 9, 3), date(2025, 12, 12))]
+    # Christmas holidays are not counted as school days while the spring term is unpublished
+    assert not calendar.is_school_day(date(2025, 12, 22))
+    assert not calendar.is_school_day(date(2026, 1, 5))
+    assert calendar.is_known(date(2025, 12, 12))
+    assert not calendar.is_known(date(2025, 12, 22))
+    assert calendar.known_until(2025) == date(2025, 12, 12)
+
+
+def test_known_closures_before_last_recorded_term_end():
+    calendar = make_calendar(*AUTUMN_ONLY)
+    assert not calendar.is_school_day(date(2025, 11, 14))
+    assert calendar.is_known(date(2025, 11, 14))
+    assert calendar.closed_weekdays(date(2025, 12, 11), date(2025, 12, 16)) == [
+        date(2025, 12, 15), date(2025, 12, 16)]
+
+
+def test_summer_term_end_closes_the_year():
+    calendar = make_calendar(*AUTUMN_ONLY, make_event(date(2026, 1, 6), "Spring Term Starts"),
+                             make_event(date(2026, 7, 17), "Last Day of Term", "Term End"))
+    assert calendar.terms()[-1] == (date(2026, 1, 6), date(2026, 7, 17))
+    assert not calendar.is_school_day(date(2025, 12, 15))
+    assert not calendar.is_school_day(date(2026, 7, 20))
+    assert calendar.is_known(date(2026, 8, 31))
@@ -0,0 +1,48 @@
+"""Tests for the git steps of update_calendar_data."""
+
+import subprocess
+
+import pytest
+
+from update_calendar_data import commit_and_push_changes, get_pending_git_changes
+
+
+def git(*args, cwd):
+    return subprocess.run(["git", *args], cwd=cwd, check=True, capture_output=True, text=True).stdout
+
+
+@pytest.fixture
+def clone(tmp_path, monkeypatch):
+    for name in ("AUTHOR", "COMMITTER"):
+        monkeypatch.setenv(f"GIT_{name}_NAME", "Calendar Bot")
+        monkeypatch.setenv(f"GIT_{name}_EMAIL", "bot@example.com")
+    origin = tmp_path / "origin.git"
+    git("init", "--bare", "-b", "main", str(origin), cwd=tmp_path)
+    clone = tmp_path / "clone"
+    git("clone", str(origin), str(clone), cwd=tmp_path)
+    git("checkout", "-b", "main", cwd=clone)
+    (clone / "school_calendar_data.json").write_text("{}\n")
+    git("add", ".", cwd=clone)
+    git("commit", "-m", "Initial data", cwd=clone)
+    git("push", "-u", "origin", "main", cwd=clone)
+    monkeypatch.chdir(clone)
+    return clone
+
+
+def test_pending_changes_after_failed_commit_or_push(clone):
+    assert get_pending_git_changes() == (False, False)
+
+    (clone / "school_calendar_data.json").write_text('{"events": []}\n')
+    assert get_pending_git_changes() == (True, False)
+
+    git("commit", "-am", "Update calendar data", cwd=clone)
+    assert get_pending_git_changes() == (False, True)
+
+
+def test_committed_but_unpushed_changes_are_pushed(clone):
+    (clone / "school_calendar_data.json").write_text('{"events": []}\n')
+    git("commit", "-am", "Update calendar data", cwd=clone)
+
+    assert commit_and_push_changes()
+    assert get_pending_git_changes() == (False, False)
+    assert git("log", "--format=%s", "origin/main", cwd=clone).splitlines()[0] == "Update calendar data"
@@ -0,0 +1,106 @@
+"""Tests for weather providers and the TTL-cached WeatherService."""
+
+from datetime import date, datetime
+
+import pytest
+
+import weather
+from weather import FixtureProvider, WeatherProvider, WeatherService, describe_forecast, get_provider, next_update
+
+TODAY = date(2025, 10, 6)
+
+
+class CountingProvider(WeatherProvider):
+    """Fixed forecasts that count calls, and fail on demand."""
+
+    name = "counting"
+    update_interval = 3600
+
+    def __init__(self):
+        self.calls = 0
+        self.fail = False
+
+    def fetch_forecast(self, location, start, days):
+        self.calls += 1
+        if self.fail:
+            raise OSError("provider down")
+        return {date.fromordinal(start.toordinal() + n).isoformat():
+                {"tempMax": 15.4, "tempMin": 8, "precipitationProbability": 10, "weatherCode": 1}
+                for n in range(days)}
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [10 * 3600 + 60]
+    monkeypatch.setattr(weather.time, "time", lambda: now[0])
+    return now
+
+
+def make_service(tmp_path, provider):
+    return WeatherService(provider, cache_path=tmp_path / ".weather_cache.json", fallback=FixtureProvider(None))
+
+
+def test_forecast_is_cached_until_the_next_provider_update(tmp_path, clock):
+    provider = CountingProvider()
+    service = make_service(tmp_path, provider)
+    assert service.forecast(datetime(2025, 10, 8, 9, 0), today=TODAY) == {
+        "temp": "15°C", "description": "Pleasant day - normal layers should be fine. Light jacket optional."}
+    assert len(service.forecasts(TODAY)) == 7
+
+    # Another tenant at the same school reuses the cache file
+    make_service(tmp_path, provider).forecasts(TODAY)
+    assert provider.calls == 1
+
+    clock[0] = next_update(clock[0], provider.update_interval)
+    service.forecasts(TODAY)
+    assert provider.calls == 2
+
+
+def test_failures_serve_the_stale_forecast_and_back_off(tmp_path, clock):
+    provider = CountingProvider()
+    service = make_service(tmp_path, provider)
+    service.forecasts(TODAY)
+    provider.fail = True
+
+    clock[0] += 3600
+    assert service.forecast(TODAY, today=TODAY)["temp"] == "15°C"
+    service.forecasts(TODAY)
+    # The failed provider is not asked again during the backoff
+    assert provider.calls == 2
+
+
+def test_fallback_when_nothing_is_cached(tmp_path, clock):
+    provider = CountingProvider()
+    provider.fail = True
+    service = make_service(tmp_path, provider)
+    expected = describe_forecast(FixtureProvider(None).average_day(TODAY))
+    assert service.forecast(TODAY, today=TODAY) == expected
+    # Days beyond the forecast range come from the fallback too
+    far = date(2026, 1, 5)
+    assert service.forecast(far, today=TODAY) == describe_forecast(FixtureProvider(None).average_day(far))
+
+
+def test_fixture_file_overrides_averages(tmp_path):
+    fixture = tmp_path / "weather_fixture.json"
+    fixture.write_text('{"2025-10-06": {"tempMax": 22, "tempMin": 14, "precipitationProbability": 0, '
+                       '"weatherCode": 0}}')
+    forecast = FixtureProvider(fixture).fetch_forecast(weather.SCHOOL_LOCATION, TODAY, 2)
+    assert forecast["2025-10-06"]["tempMax"] == 22
+    assert forecast["2025-10-07"] == FixtureProvider(None).average_day(date(2025, 10, 7))
+
+
+@pytest.mark.parametrize("day, description", [
+    ({"tempMax": 25, "precipitationProbability": 60}, "Rain expected - bring raincoat and umbrella."),
+    ({"tempMax": 21}, "Warm day expected - light clothing appropriate."),
+    ({"tempMax": 10}, "Slightly chilly - bring a jacket."),
+    ({"tempMax": 15, "weatherCode": 45}, "Cloudy but dry - standard uniform is fine."),
+])
+def test_describe_forecast(day, description):
+    assert describe_forecast(day)["description"] == description
+
+
+def test_next_update_and_unknown_provider():
+    assert next_update(7200, 3600) == 10800
+    assert next_update(7201, 3600) == 10800
+    with pytest.raises(ValueError):
+        get_provider("met-office")
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Time Parsing
+============
+
+One memoised parser for the free-text times used by events ("All Day",
+"8:00am - 9:00am", "9:30am"), activities ("10:30-11:30") and pickups
+("3:40 PM").
+
+Times are parsed into minute offsets after midnight. Events are normalised
+once at ingest (see GmailPDFScanner.merge_events_with_existing): the offsets
+are stored next to the original "time" text as "startMinute" and
+"endMinute", so sorting within a day and conflict checks read integers
+instead of re-parsing strings.
+"""
+
+import re
+from functools import lru_cache
+
+START_FIELD = "startMinute"
+END_FIELD = "endMinute"
+
+# Distinct time strings are few, so every one of them stays cached
+PARSE_CACHE_SIZE = 1024
+
+CLOCK = r'(\d{1,2})(?:[:.](\d{2}))?\s*(am|pm)?'
+RANGE_PATTERN = re.compile(rf'{CLOCK}\s*[-–]\s*{CLOCK}', re.IGNORECASE)
+CLOCK_PATTERN = re.compile(rf'\b{CLOCK}', re.IGNORECASE)
+SINGLE_TIME_PATTERN = re.compile(r'\b(\d{1,2})(?:[:.](\d{2}))?\s*(am|pm)\b|\b(\d{1,2})[:.](\d{2})\b', re.IGNORECASE)
+
+
+def to_minutes(hour, minute, ampm):
+    """
+    Convert clock parts to minutes after midnight.
+
+    Returns:
+        Minutes, or None for an impossible time
+    """
+    hour, minute = int(hour), int(minute or 0)
+    if ampm and ampm.lower() == "pm" and hour < 12:
+        hour += 12
+    elif ampm and ampm.lower() == "am" and hour == 12:
+        hour = 0
+    if hour > 23 or minute > 59:
+        return None
+    return hour * 60 + minute
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def parse_time_range(time_text):
+    """
+    Parse a time range like "8:00am - 9:00am" or "15:45-16:45".
+
+    Returns:
+        Tuple of (start_minutes, end_minutes) after midnight, or None for
+        "All Day" and anything unparseable
+    """
+    match = RANGE_PATTERN.search(time_text or "")
+    if not match:
+        return None
+    start_hour, start_min, start_ampm, end_hour, end_min, end_ampm = match.groups()
+    # "9:00-9:30am" shares the trailing am/pm
+    start = to_minutes(start_hour, start_min, start_ampm or end_ampm)
+    end = to_minutes(end_hour, end_min, end_ampm)
+    if start is None or end is None or end <= start:
+        return None
+    return start, end
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def parse_clock(time_text):
+    """
+    Parse a single time like "3:40 PM" or "15:40".
+
+    Returns:
+        Minutes after midnight, or None if unparseable
+    """
+    match = CLOCK_PATTERN.fullmatch((time_text or "").strip())
+    if not match:
+        return None
+    return to_minutes(*match.groups())
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def parse_time(time_text):
+    """
+    Parse an event time: a range, or a single start time such as "9:30am".
+
+    Returns:
+        Tuple of (start_minutes, end_minutes), with end_minutes None for a
+        single time, or (None, None) for "All Day" and anything unparseable
+    """
+    minutes = parse_time_range(time_text)
+    if minutes is not None:
+        return minutes
+    match = SINGLE_TIME_PATTERN.search(time_text or "")
+    if match:
+        hour, minute, ampm, hour_24, minute_24 = match.groups()
+        start = to_minutes(hour, minute, ampm) if hour else to_minutes(hour_24, minute_24, None)
+        if start is not None:
+            return start, None
+    return None, None
+
+
+def normalise_event_time(event):
+    """
+    Store an event's parsed start and end minutes next to its "time" text.
+
+    Events that are already normalised are left alone.
+
+    Returns:
+        The event dict
+    """
+    if START_FIELD not in event:
+        event[START_FIELD], event[END_FIELD] = parse_time(event.get("time", "All Day"))
+    return event
+
+
+def event_minutes(event):
+    """
+    Get an event's (start, end) minutes, from the stored fields when normalised.
+
+    Returns:
+        Tuple of (start_minutes or None, end_minutes or None)
+    """
+    if START_FIELD in event:
+        return event[START_FIELD], event.get(END_FIELD)
+    return parse_time(event.get("time", "All Day"))
+
+
+def format_minutes(minutes):
+    """Format minutes after midnight as "3:40 PM"."""
+    hour, minute = divmod(minutes % (24 * 60), 60)
+    return f"{(hour - 1) % 12 + 1}:{minute:02d} {'AM' if hour < 12 else 'PM'}"
@@ -1,27 +1,38 @@
 #!/usr/bin/env python3
 
+import argparse
 import json
 import logging
 import os
 import sys
 import datetime
 from datetime import date, timedelta
-import random
 import subprocess
 import re
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler("/home/ubuntu/school-calendar-data/update.log"),
-        logging.StreamHandler()
-    ]
-)
+from event_model import build_events, events_in_range
+from event_views import VIEWS_DIR_NAME, EventIndex, write_view_shards
+from metrics import finish_run, timed
+from publish import StalePublishError, publish_json, read_head
+from search_index import SEARCH_INDEX_FILE, SearchIndex, sync_calendar_data, write_search_shard
+from recurrence import activity_rules, collapse_weekly_series, expand_rules
+from term_calendar import TermCalendar
 
 logger = logging.getLogger("school_calendar_updater")
 
+# Number of times to regenerate against a newer head before giving up
+PUBLISH_ATTEMPTS = 2
+
+# Weather provider: "open-meteo", or "fixture" to run offline
+WEATHER_PROVIDER = os.environ.get("WEATHER_PROVIDER", "open-meteo")
+_weather_service = None
+
+# Reminders are synced for this tenant, for the next REMINDER_DAYS days, and sent the evening before
+REMINDER_TENANT = "hampstead-hill"
+REMINDER_DAYS = 7
+REMINDER_HOUR = 18
+STANDARD_PICKUP = "3:40 PM"
+
 def get_current_date():
     """Get the current date for the application."""
     return datetime.datetime.now()
@@ -30,21 +41,17 @@ def format_date(date_obj):
     """Format a date as 'Day, Month Day' (e.g., 'Monday, October 6')."""
     return date_obj.strftime("%A, %B ") + str(date_obj.day)
 
+def get_weather_service():
+    """Get the shared weather service (provider chosen by WEATHER_PROVIDER)."""
+    global _weather_service
+    if _weather_service is None:
+        from weather import WeatherService, get_provider
+        _weather_service = WeatherService(get_provider(WEATHER_PROVIDER))
+    return _weather_service
+
 def get_weather_forecast(date_obj):
-    """Generate a weather forecast for the given date."""
-    # Simplified weather generation for demonstration
-    temp = random.randint(12, 18)
-    descriptions = [
-        "Pleasant day - normal layers should be fine. Light jacket optional.",
-        "Slightly chilly - bring a jacket.",
-        "Warm day expected - light clothing appropriate.",
-        "Rain expected - bring raincoat and umbrella.",
-        "Cloudy but dry - standard uniform is fine."
-    ]
-    return {
-        "temp": f"{temp}°C",
-        "description": random.choice(descriptions)
-    }
+    """Get the weather forecast for the given date from the cached multi-day forecast."""
+    return get_weather_service().forecast(date_obj)
 
 def get_pickup_time(child_name, day_of_week, has_after_school_club, leo_pickup_override=None):
     """Get the pickup time for a child based on their schedule.
@@ -103,6 +110,29 @@ def has_after_school_club(child_name, day_of_week):
             return True
     return False
 
+def get_child_day_card(child_name, child_year, date_obj, leo_has_club, school_open, dates_known=True):
+    """Get a child's uniform, pickup and gate for a day, or 'No School' when closed.
+    
+    Days whose term dates have not been published yet (see TermCalendar.is_known)
+    say so instead of 'No School'.
+    """
+    if not school_open:
+        label = "No School" if dates_known else "Term Dates Not Published"
+        return {
+            "year": child_year,
+            "uniform": label,
+            "uniformType": "None",
+            "pickup": label,
+            "gate": get_gate(child_name)
+        }
+    day_of_week = date_obj.weekday() + 1
+    return {
+        "year": child_year,
+        **get_uniform(child_name, day_of_week),
+        "pickup": get_pickup_time(child_name, day_of_week, leo_has_club),
+        "gate": get_gate(child_name)
+    }
+
 def get_child_activities(child_name):
     """Get the activities for a child."""
     activities = []
@@ -207,6 +237,106 @@ def get_child_activities(child_name):
     
     return activities
 
+def get_activity_rules(child_name, term_calendar):
+    """Get weekly recurrence rules for a child's activities, bounded by each term."""
+    rules = []
+    for term_start, term_end in term_calendar.terms():
+        exdates = term_calendar.closed_weekdays(term_start, term_end)
+        rules.extend(activity_rules(child_name, get_child_activities(child_name), term_start, term_end, exdates))
+    return rules
+
+def get_conflicts(events, term_calendar, start, end):
+    """Find clashes between events, activities and pickups from start to end (inclusive).
+    
+    Args:
+        events: List of event dicts
+        term_calendar: TermCalendar, to skip pickups when school is closed
+        start: First date
+        end: Last date
+    
+    Returns:
+        List of conflict dicts (see conflicts.ConflictIndex.conflicts)
+    """
+    from conflicts import ConflictIndex
+    index = ConflictIndex()
+    for event in events:
+        index.add_event(event)
+    rules = get_activity_rules("Leo", term_calendar) + get_activity_rules("Novah", term_calendar)
+    for day, activity in expand_rules(rules, start, end):
+        index.add_activity(activity["children"][0], day, activity)
+    
+    day = start
+    while day <= end:
+        if term_calendar.is_school_day(day):
+            leo_has_club = has_after_school_club("Leo", day.weekday() + 1)
+            for child_name in ["Leo", "Novah"]:
+                pickup = get_pickup_time(child_name, day.weekday() + 1, leo_has_club)
+                index.add_pickup(child_name, day, pickup, get_gate(child_name))
+        day += timedelta(days=1)
+    
+    return index.conflicts(start, end)
+
+def make_reminder(day, key, kind, title, message, children):
+    """Build a reminder about a day, due at REMINDER_HOUR the evening before and expiring at midnight."""
+    return {
+        "id": f"{day.isoformat()}:{key}",
+        "kind": kind,
+        "due": datetime.datetime.combine(day - timedelta(days=1), datetime.time(REMINDER_HOUR)).isoformat(),
+        "expires": datetime.datetime.combine(day, datetime.time()).isoformat(),
+        "date": day.isoformat(),
+        "title": title,
+        "message": message,
+        "children": children
+    }
+
+def get_reminders(events, term_calendar, today, days=REMINDER_DAYS):
+    """Get the reminders for the next few days, each sent at REMINDER_HOUR the evening before.
+    
+    Reminders cover non-uniform days (e.g. Sports Wear), pickups that differ from
+    the standard time, and every event.
+    
+    Args:
+        events: List of event dicts
+        term_calendar: TermCalendar, to skip day cards when school is closed
+        today: date
+        days: Number of days ahead to cover
+    
+    Returns:
+        List of reminder dicts (see reminders.ReminderScheduler.sync)
+    """
+    events_by_day = {}
+    for event in events:
+        events_by_day.setdefault(date(event["year"], event["month"], event["date"]), []).append(event)
+    
+    reminders = []
+    for offset in range(1, days + 1):
+        day = today + timedelta(days=offset)
+        if term_calendar.is_school_day(day):
+            leo_has_club = has_after_school_club("Leo", day.weekday() + 1)
+            cards = {
+                "Leo": get_child_day_card("Leo", "Year 2", day, leo_has_club, True),
+                "Novah": get_child_day_card("Novah", "Early Years", day, leo_has_club, True)
+            }
+            uniforms = {}
+            for child_name, card in cards.items():
+                if card["uniformType"] != "Uniform":
+                    uniforms.setdefault(card["uniform"], []).append(child_name)
+            for uniform, children in uniforms.items():
+                reminders.append(make_reminder(day, f"uniform:{uniform}", "uniform", f"Tomorrow is {uniform}",
+                                               f"Tomorrow is {uniform} for {' and '.join(children)}.", children))
+            if any(card["pickup"] != STANDARD_PICKUP for card in cards.values()):
+                pickups = ", ".join(f"{child_name} {card['pickup']} at {card['gate']}" for child_name, card in cards.items())
+                reminders.append(make_reminder(day, "pickup", "pickup", "Pickup tomorrow",
+                                               f"Pickup tomorrow: {pickups}.", list(cards)))
+        
+        for event in events_by_day.get(day, []):
+            details = event.get("description", "")
+            if event["time"] != "All Day":
+                details = f"{event['time']}: {details}"
+            reminders.append(make_reminder(day, f"event:{event['title']}", "event", f"{event['title']} tomorrow",
+                                           details, event["children"]))
+    return reminders
+
 def get_events():
     """Get all events for the current term."""
     events = [
@@ -457,23 +587,19 @@ def get_events():
     
     return events
 
-def get_notices():
-    """Get all notices.
-    
-    This function returns notices that should be extracted from actual email communications.
-    Hardcoded notices have been removed to ensure only real information is displayed.
+def get_notices(notice_store):
+    """Get the current notices from the notice store (filled by the email scanner).
     
-    In the future, this should be populated by the email scanning system.
+    Notices are ordered high priority first, soonest deadline first.
     """
-    notices = []
-    
-    # TODO: Populate notices from email scanning system
-    # For now, return empty array to avoid showing fake/outdated information
-    
-    return notices
+    from notices import to_app_notice
+    return [to_app_notice(notice) for notice in notice_store.active()]
 
-def create_calendar_days(events, current_month, current_year):
-    """Create the calendar days structure with events."""
+def create_calendar_days(events, current_month, current_year, forecasts=None):
+    """Create the calendar days structure from Event records (see event_model.build_events).
+    
+    Days covered by the forecast (ISO date -> weather card) also get a "weather" card.
+    """
     # Get the number of days in the month
     if current_month in [4, 6, 9, 11]:
         days_in_month = 30
@@ -485,21 +611,26 @@ def create_calendar_days(events, current_month, current_year):
     else:
         days_in_month = 31
     
+    # Bucket the month's events by day (events are sorted by date ordinal)
+    first_ordinal = date(current_year, current_month, 1).toordinal()
+    events_by_day = {}
+    for event in events_in_range(events, first_ordinal, first_ordinal + days_in_month - 1):
+        events_by_day.setdefault(event.ordinal - first_ordinal + 1, []).append({
+            "title": event.title,
+            "children": event.children
+        })
+    
     # Create the days array
     days = []
     for day in range(1, days_in_month + 1):
-        day_events = []
-        for event in events:
-            if event["date"] == day and event["month"] == current_month and event["year"] == current_year:
-                day_events.append({
-                    "title": event["title"],
-                    "children": event["children"]
-                })
-        
-        days.append({
+        calendar_day = {
             "date": day,
-            "events": day_events
-        })
+            "events": events_by_day.get(day, [])
+        }
+        weather = (forecasts or {}).get(date(current_year, current_month, day).isoformat())
+        if weather:
+            calendar_day["weather"] = weather
+        days.append(calendar_day)
     
     return days
 
@@ -510,11 +641,31 @@ def create_json_structure():
     
     # Get events and notices
     events = get_events()
-    notices = get_notices()
+    event_records = build_events(events)
+    from notices import NoticeStore
+    notice_store = NoticeStore()
+    if notice_store.prune(current_date.date()):
+        notice_store.save()
+    notices = get_notices(notice_store)
+    
+    # Get the forecast for the coming days (one cached request for the school)
+    forecasts = get_weather_service().forecasts(current_date.date())
+    
+    # Check whether school is open today and tomorrow
+    term_calendar = TermCalendar(event_records)
+    school_open_today = term_calendar.is_school_day(current_date)
+    school_open_tomorrow = term_calendar.is_school_day(tomorrow_date)
+    dates_known_today = term_calendar.is_known(current_date)
+    dates_known_tomorrow = term_calendar.is_known(tomorrow_date)
     
     # Check if Leo has after-school clubs today and tomorrow
-    leo_has_club_today = has_after_school_club("Leo", current_date.weekday() + 1)
-    leo_has_club_tomorrow = has_after_school_club("Leo", tomorrow_date.weekday() + 1)
+    leo_has_club_today = school_open_today and has_after_school_club("Leo", current_date.weekday() + 1)
+    leo_has_club_tomorrow = school_open_tomorrow and has_after_school_club("Leo", tomorrow_date.weekday() + 1)
+    
+    # Flag clashes in the calendar month (clubs vs events, sibling pickups at different gates)
+    month_start = date(current_date.year, current_date.month, 1)
+    month_end = (month_start + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+    conflicts = get_conflicts(events, term_calendar, month_start, month_end)
     
     # Create the JSON structure
     data = {
@@ -542,36 +693,20 @@ def create_json_structure():
             "year": current_date.year,
             "weather": get_weather_forecast(current_date),
             "children": {
-                "Leo": {
-                    "year": "Year 2",
-                    **get_uniform("Leo", current_date.weekday() + 1),
-                    "pickup": get_pickup_time("Leo", current_date.weekday() + 1, leo_has_club_today),
-                    "gate": get_gate("Leo")
-                },
-                "Novah": {
-                    "year": "Early Years",
-                    **get_uniform("Novah", current_date.weekday() + 1),
-                    "pickup": get_pickup_time("Novah", current_date.weekday() + 1, leo_has_club_today),
-                    "gate": get_gate("Novah")
-                }
+                "Leo": get_child_day_card("Leo", "Year 2", current_date, leo_has_club_today, school_open_today,
+                                          dates_known_today),
+                "Novah": get_child_day_card("Novah", "Early Years", current_date, leo_has_club_today, school_open_today,
+                                            dates_known_today)
             }
         },
         "tomorrow": {
             "date": format_date(tomorrow_date),
             "weather": get_weather_forecast(tomorrow_date),
             "children": {
-                "Leo": {
-                    "year": "Year 2",
-                    **get_uniform("Leo", tomorrow_date.weekday() + 1),
-                    "pickup": get_pickup_time("Leo", tomorrow_date.weekday() + 1, leo_has_club_tomorrow),
-                    "gate": get_gate("Leo")
-                },
-                "Novah": {
-                    "year": "Early Years",
-                    **get_uniform("Novah", tomorrow_date.weekday() + 1),
-                    "pickup": get_pickup_time("Novah", tomorrow_date.weekday() + 1, leo_has_club_tomorrow),
-                    "gate": get_gate("Novah")
-                }
+                "Leo": get_child_day_card("Leo", "Year 2", tomorrow_date, leo_has_club_tomorrow, school_open_tomorrow,
+                                          dates_known_tomorrow),
+                "Novah": get_child_day_card("Novah", "Early Years", tomorrow_date, leo_has_club_tomorrow,
+                                            school_open_tomorrow, dates_known_tomorrow)
             }
         },
         "events": events,
@@ -583,10 +718,11 @@ def create_json_structure():
         "calendar": {
             "month": current_date.month,
             "year": current_date.year,
-            "days": create_calendar_days(events, current_date.month, current_date.year)
+            "days": create_calendar_days(event_records, current_date.month, current_date.year, forecasts)
         },
+        "conflicts": conflicts,
         "settings": {
-            "notificationCount": len(notices),
+            "notificationCount": notice_store.count(),
             "currentTab": "Today",
             "filterSetting": "All"
         }
@@ -654,6 +790,41 @@ def save_json_to_file(data, filename):
         logger.error(f"Error saving JSON data to {filename}: {e}")
         return False
 
+def publish_calendar_data(json_path):
+    """Generate, validate and publish the calendar data, rebasing on a newer head.
+    
+    Returns:
+        Tuple of (data, published), or (None, False) on failure
+    """
+    for attempt in range(1, PUBLISH_ATTEMPTS + 1):
+        try:
+            _, parent_hash = read_head(json_path)
+        except Exception as e:
+            logger.error(f"Error reading published head {json_path}: {e}")
+            return None, False
+        
+        # Create and validate the JSON structure
+        with timed("generate"):
+            data = create_json_structure()
+        with timed("validate"):
+            valid = validate_json_structure(data)
+        if not valid:
+            logger.error("JSON structure validation failed")
+            return None, False
+        
+        try:
+            with timed("write"):
+                published = publish_json(data, json_path, parent_hash)
+            return data, published
+        except StalePublishError as e:
+            logger.warning(f"Publish attempt {attempt} refused, regenerating: {e}")
+        except Exception as e:
+            logger.error(f"Error publishing JSON data to {json_path}: {e}")
+            return None, False
+    
+    logger.error(f"Giving up after {PUBLISH_ATTEMPTS} stale publish attempts")
+    return None, False
+
 def update_readme(data):
     """Update the README.md file with the latest update timestamp."""
     try:
@@ -675,16 +846,40 @@ def update_readme(data):
         logger.error(f"Error updating README.md: {e}")
         return False
 
+def get_pending_git_changes():
+    """Check for work an earlier run did not commit or push.
+    
+    Returns:
+        Tuple of (uncommitted changes in the tree, local commits not yet pushed),
+        or None if git status failed
+    """
+    try:
+        result = subprocess.run(["git", "status", "--porcelain", "--branch"],
+                                check=True, capture_output=True, text=True)
+    except (subprocess.CalledProcessError, OSError) as e:
+        logger.error(f"Error reading git status: {e}")
+        return None
+    lines = result.stdout.splitlines()
+    branch = lines[0] if lines and lines[0].startswith("## ") else ""
+    changed = [line for line in lines if not line.startswith("## ")]
+    return bool(changed), "[ahead " in branch
+
 def commit_and_push_changes():
-    """Commit and push changes to the GitHub repository."""
+    """Commit and push changes to the GitHub repository.
+    
+    A tree with nothing to commit (e.g. the commit succeeded on an earlier run
+    but the push failed) is only pushed.
+    """
     try:
         # Get the current date for the commit message
         current_date = get_current_date()
         formatted_date = current_date.strftime("%Y-%m-%d %H:%M:%S")
         
         # Commit the changes
-        subprocess.run(["git", "add", "."], check=True)
-        subprocess.run(["git", "commit", "-m", f"Update calendar data - {formatted_date}"], check=True)
+        pending = get_pending_git_changes()
+        if pending is None or pending[0]:
+            subprocess.run(["git", "add", "."], check=True)
+            subprocess.run(["git", "commit", "-m", f"Update calendar data - {formatted_date}"], check=True)
         
         # Push the changes
         subprocess.run(["git", "push", "-u", "origin", "main"], check=True)
@@ -698,38 +893,162 @@ def commit_and_push_changes():
         logger.error(f"Unexpected error: {e}")
         return False
 
+def push_to_subscribers(data):
+    """Push the changed sections to webhook subscribers and the SSE delta log.
+    
+    Only called once the data is committed and pushed, so subscribers never hear
+    about a generation the repository does not have. The delta is built against
+    the last pushed state, so changes held back by a failed git push go out with
+    the next successful run; when nothing changed this only retries deliveries
+    still pending from earlier runs.
+    """
+    from push import push_update
+    with timed("push"):
+        push_counts = push_update(data)
+    if push_counts is None:
+        logger.error("Failed to push changes to subscribers")
+        # Continue anyway, clients can still poll the JSON
+    else:
+        logger.info(f"Pushed to {push_counts[0]} subscribers, {push_counts[1]} failed (will retry)")
+
+def configure_logging(log_file=None, verbose=False):
+    """Log to stderr, and to a file if one is given."""
+    handlers = [logging.StreamHandler()]
+    if log_file:
+        handlers.append(logging.FileHandler(log_file))
+    logging.basicConfig(
+        level=logging.DEBUG if verbose else logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        handlers=handlers
+    )
+
 def main():
     """Main function to update the school calendar data."""
+    parser = argparse.ArgumentParser(description="Generate and publish the school calendar data")
+    parser.add_argument("--profile", action="store_true", help="Print a per-stage timing summary")
+    parser.add_argument("--metrics-file", help="Prometheus text file to write (default: metrics/update_calendar_data.prom)")
+    parser.add_argument("--weather-provider", choices=["open-meteo", "fixture"],
+                        help="Weather forecast provider (default: $WEATHER_PROVIDER or open-meteo)")
+    parser.add_argument("--log-file", help="Also write the log to this file")
+    parser.add_argument("--verbose", action="store_true", help="Log debug messages")
+    args = parser.parse_args()
+    configure_logging(args.log_file, args.verbose)
+    
+    global WEATHER_PROVIDER
+    if args.weather_provider:
+        WEATHER_PROVIDER = args.weather_provider
+    
+    success = False
+    try:
+        success = update_calendar_data()
+    finally:
+        finish_run("update_calendar_data", success, args.metrics_file, args.profile)
+    return success
+
+def update_calendar_data():
+    """Generate, publish and push the school calendar data."""
+    # The output writers are imported here rather than at module level, so
+    # importing this module (e.g. from benchmark_calendar.py) stays cheap
+    from event_archive import EVENT_ARCHIVE_FILE, write_archive
+    from ics_export import write_ics_feed
+    from reminders import sync_reminders
+    from snapshots import record_snapshot
+    
     logger.info("Starting school calendar data update")
     
     # Change to the repository directory
     repo_dir = os.path.dirname(os.path.abspath(__file__))
     os.chdir(repo_dir)
     
-    # Create the JSON structure
-    data = create_json_structure()
-    
-    # Validate the JSON structure
-    if not validate_json_structure(data):
-        logger.error("JSON structure validation failed")
-        return False
-    
-    # Save the JSON to the file
+    # Generate and publish the JSON, refusing to overwrite a newer head
     json_path = os.path.join(repo_dir, "school_calendar_data.json")
-    if not save_json_to_file(data, json_path):
-        logger.error("Failed to save JSON data to file")
+    data, published = publish_calendar_data(json_path)
+    if data is None:
+        logger.error("Failed to publish JSON data to file")
         return False
     
+    # Reschedule reminders (only changed reminders are touched), even when the data is unchanged
+    event_records = build_events(data["events"])
+    term_calendar = TermCalendar(event_records)
+    with timed("reminders"):
+        reminder_counts = sync_reminders(
+            REMINDER_TENANT, get_reminders(data["events"], term_calendar, get_current_date().date()))
+    if reminder_counts is None:
+        logger.error("Failed to sync reminders")
+        # Continue anyway, reminders are not critical
+    else:
+        logger.info(f"Reminders: {reminder_counts[0]} scheduled, {reminder_counts[1]} cancelled")
+    
+    if not published:
+        # An earlier run may have published but failed to commit or push
+        pending = get_pending_git_changes()
+        if pending is None or not any(pending):
+            logger.info("Calendar data unchanged, nothing to commit")
+        else:
+            logger.info("Calendar data unchanged, committing and pushing changes left by an earlier run")
+            with timed("git_push"):
+                pushed = commit_and_push_changes()
+            if not pushed:
+                logger.error("Failed to commit and push changes")
+                return False
+        push_to_subscribers(data)
+        return True
+    
+    # Write the per-child and per-type event views
+    index = EventIndex(event_records)
+    with timed("views"):
+        views_written = write_view_shards(index, os.path.join(repo_dir, VIEWS_DIR_NAME), data["meta"]["generated"])
+    if not views_written:
+        logger.error("Failed to write event view shards")
+        # Continue anyway, clients can still filter the full events array
+    
+    # Write the memory-mapped event archive for long-running readers
+    with timed("archive"):
+        if not write_archive(event_records, EVENT_ARCHIVE_FILE):
+            logger.error("Failed to write event archive")
+            # Continue anyway, readers can still load the JSON
+    
+    # Update the search index (only changed documents are re-indexed) and write the search shard
+    with timed("search"):
+        search_index = SearchIndex(SEARCH_INDEX_FILE)
+        changed, removed = sync_calendar_data(search_index, data)
+        logger.info(f"Search index: {changed} documents added or changed, {removed} removed")
+        search_written = search_index.save() and write_search_shard(
+            search_index, os.path.join(repo_dir, VIEWS_DIR_NAME), data["meta"]["generated"])
+    if not search_written:
+        logger.error("Failed to write search shard")
+        # Continue anyway, clients can still search the full events array
+    
+    # Record the generation in the snapshot store, for point-in-time lookups and diffs
+    with timed("snapshot"):
+        if not record_snapshot(data):
+            logger.error("Failed to record snapshot")
+            # Continue anyway, the history is not needed to publish
+    
+    # Write the iCalendar subscription feed, with weekly event rows (e.g. from AI extraction) folded into rules
+    weekly_rules = get_activity_rules("Leo", term_calendar) + get_activity_rules("Novah", term_calendar)
+    event_rules, single_events = collapse_weekly_series(data["events"])
+    with timed("ics"):
+        ics_written = write_ics_feed(single_events, weekly_rules + event_rules, os.path.join(repo_dir, "calendar.ics"),
+                                     os.path.join(repo_dir, ".ics_cache.json"))
+    if not ics_written:
+        logger.error("Failed to write ICS feed")
+        # Continue anyway, the JSON data is still published
+    
     # Update the README.md file
     if not update_readme(data):
         logger.error("Failed to update README.md")
         # Continue anyway, this is not critical
     
     # Commit and push the changes
-    if not commit_and_push_changes():
+    with timed("git_push"):
+        pushed = commit_and_push_changes()
+    if not pushed:
         logger.error("Failed to commit and push changes")
         return False
     
+    push_to_subscribers(data)
+    
     logger.info("School calendar data update completed successfully")
     return True
 
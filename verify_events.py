@@ -7,33 +7,74 @@ This script verifies that all 22 events (including November and December)
 are present in both the local file and on GitHub.
 
 It will alert if events are missing and can automatically restore them.
+
+The local check reads the memory-mapped event archive (events.bin) when it
+is at least as new as the JSON, instead of loading the whole JSON file.
 """
 
 import json
+import os
 import subprocess
 import sys
-from datetime import datetime
+from datetime import date, datetime, timedelta
+
+LOCAL_DATA_DIR = '/home/ubuntu/school-calendar-data'
+LOCAL_JSON_FILE = os.path.join(LOCAL_DATA_DIR, 'school_calendar_data.json')
+LOCAL_ARCHIVE_FILE = os.path.join(LOCAL_DATA_DIR, 'events.bin')
 
 EXPECTED_EVENT_COUNT = 22
 EXPECTED_MONTHS = {9: 8, 10: 9, 11: 3, 12: 2}
 
-def check_local_events():
+def archive_events_by_month(path):
+    """Group the events of an event archive by month number, with one range query per calendar month.
+    
+    Returns:
+        Tuple of (number of events, {month: [Event, ...]})
+    """
+    from event_archive import EventArchive
+    by_month = {}
+    with EventArchive(path) as archive:
+        if not len(archive):
+            return 0, by_month
+        month_start = date.fromordinal(archive.ordinal(0)).replace(day=1)
+        last = date.fromordinal(archive.ordinal(len(archive) - 1))
+        while month_start <= last:
+            next_month = (month_start + timedelta(days=32)).replace(day=1)
+            events = archive.events_in_range(month_start.toordinal(), next_month.toordinal() - 1)
+            if events:
+                by_month.setdefault(month_start.month, []).extend(events)
+            month_start = next_month
+        return len(archive), by_month
+
+def json_events_by_month(path):
+    """Group the events of a calendar JSON file by month number.
+    
+    Returns:
+        Tuple of (number of events, {month: [event dict, ...]})
+    """
+    with open(path, 'r') as f:
+        data = json.load(f)
+    by_month = {}
+    for e in data['events']:
+        by_month.setdefault(e['month'], []).append(e)
+    return len(data['events']), by_month
+
+def check_local_events(json_path=LOCAL_JSON_FILE, archive_path=LOCAL_ARCHIVE_FILE):
     """Check events in local file."""
     try:
-        with open('/home/ubuntu/school-calendar-data/school_calendar_data.json', 'r') as f:
-            data = json.load(f)
-        
-        events = data['events']
-        by_month = {}
-        for e in events:
-            by_month.setdefault(e['month'], []).append(e)
+        if os.path.exists(archive_path) and os.path.getmtime(archive_path) >= os.path.getmtime(json_path):
+            event_count, by_month = archive_events_by_month(archive_path)
+            source = "archive"
+        else:
+            event_count, by_month = json_events_by_month(json_path)
+            source = "JSON"
         
-        print(f"📁 LOCAL FILE: {len(events)} events")
+        print(f"📁 LOCAL FILE ({source}): {event_count} events")
         for month in sorted(by_month.keys()):
             print(f"   Month {month}: {len(by_month[month])} events")
         
-        if len(events) != EXPECTED_EVENT_COUNT:
-            print(f"❌ ERROR: Expected {EXPECTED_EVENT_COUNT} events, found {len(events)}")
+        if event_count != EXPECTED_EVENT_COUNT:
+            print(f"❌ ERROR: Expected {EXPECTED_EVENT_COUNT} events, found {event_count}")
             return False
         
         for month, expected_count in EXPECTED_MONTHS.items():
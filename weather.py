@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+Weather Forecasts
+=================
+
+Pluggable weather providers with a shared, TTL-cached forecast store.
+
+Features:
+- One batched multi-day request per school location (OpenMeteoProvider),
+  instead of one lookup per day card
+- Cache entries expire at the provider's next model update, so repeated runs
+  between updates reuse the same forecast and produce the same output
+- The cache is keyed by provider and location, so every tenant at the same
+  school is served by a single request
+- FixtureProvider stands in offline: a JSON fixture file if present,
+  otherwise deterministic London monthly averages
+"""
+
+import json
+import logging
+import math
+import os
+import threading
+import time
+import urllib.parse
+import urllib.request
+from datetime import date, timedelta
+from pathlib import Path
+
+logger = logging.getLogger("weather")
+
+SCRIPT_DIR = Path(__file__).parent
+WEATHER_CACHE_FILE = SCRIPT_DIR / ".weather_cache.json"
+WEATHER_FIXTURE_FILE = SCRIPT_DIR / "weather_fixture.json"
+
+SCHOOL_LOCATION = {"name": "Hampstead Hill School", "latitude": 51.556, "longitude": -0.165}
+FORECAST_DAYS = 7
+REQUEST_TIMEOUT = 10
+# Seconds to wait before asking a failed provider again
+FAILURE_BACKOFF = 300
+
+OPEN_METEO_URL = "https://api.open-meteo.com/v1/forecast"
+# Open-Meteo refreshes its forecasts hourly
+OPEN_METEO_UPDATE_INTERVAL = 3600
+
+# London daily (max, min) temperature averages by month, for the offline fixture
+LONDON_MONTHLY_AVERAGES = {
+    1: (8, 2), 2: (9, 2), 3: (12, 4), 4: (15, 6), 5: (18, 9), 6: (21, 12),
+    7: (23, 14), 8: (23, 14), 9: (20, 11), 10: (16, 8), 11: (11, 5), 12: (9, 3)
+}
+
+# WMO weather codes for cloudy or foggy but dry days
+CLOUDY_CODES = {2, 3, 45, 48}
+
+
+class WeatherProvider:
+    """Interface for forecast providers."""
+
+    name = None
+    # Seconds between the provider's forecast updates
+    update_interval = OPEN_METEO_UPDATE_INTERVAL
+
+    def fetch_forecast(self, location, start, days):
+        """
+        Fetch a multi-day forecast in one call.
+
+        Args:
+            location: {"name", "latitude", "longitude"} dict
+            start: First date
+            days: Number of days
+
+        Returns:
+            Dict of ISO date -> {"tempMax", "tempMin", "precipitationProbability", "weatherCode"}
+        """
+        raise NotImplementedError
+
+
+class OpenMeteoProvider(WeatherProvider):
+    """Open-Meteo daily forecasts (no API key needed)."""
+
+    name = "open-meteo"
+    update_interval = OPEN_METEO_UPDATE_INTERVAL
+
+    def fetch_forecast(self, location, start, days):
+        query = urllib.parse.urlencode({
+            "latitude": location["latitude"],
+            "longitude": location["longitude"],
+            "daily": "temperature_2m_max,temperature_2m_min,precipitation_probability_max,weather_code",
+            "timezone": "Europe/London",
+            "start_date": start.isoformat(),
+            "end_date": (start + timedelta(days=days - 1)).isoformat()
+        })
+        with urllib.request.urlopen(f"{OPEN_METEO_URL}?{query}", timeout=REQUEST_TIMEOUT) as response:
+            daily = json.load(response)["daily"]
+        return {
+            day: {
+                "tempMax": daily["temperature_2m_max"][i],
+                "tempMin": daily["temperature_2m_min"][i],
+                "precipitationProbability": daily["precipitation_probability_max"][i],
+                "weatherCode": daily["weather_code"][i]
+            }
+            for i, day in enumerate(daily["time"])
+            if daily["temperature_2m_max"][i] is not None
+        }
+
+
+class FixtureProvider(WeatherProvider):
+    """Offline forecasts from a fixture file, or deterministic monthly averages."""
+
+    name = "fixture"
+    update_interval = 24 * 3600
+
+    def __init__(self, path=WEATHER_FIXTURE_FILE):
+        """
+        Args:
+            path: Optional JSON fixture of ISO date -> forecast day
+        """
+        self.fixture = {}
+        if path and Path(path).exists():
+            with open(path, 'r') as f:
+                self.fixture = json.load(f)
+
+    def fetch_forecast(self, location, start, days):
+        forecast = {}
+        for offset in range(days):
+            day = start + timedelta(days=offset)
+            forecast[day.isoformat()] = self.fixture.get(day.isoformat()) or self.average_day(day)
+        return forecast
+
+    def average_day(self, day):
+        """A plausible forecast for a day, varying by date but the same on every run."""
+        temp_max, temp_min = LONDON_MONTHLY_AVERAGES[day.month]
+        variation = (day.toordinal() * 7) % 5 - 2
+        return {
+            "tempMax": temp_max + variation,
+            "tempMin": temp_min + variation,
+            "precipitationProbability": (day.toordinal() * 37) % 80,
+            "weatherCode": 3 if day.toordinal() % 3 == 0 else 1
+        }
+
+
+def next_update(fetched_at, update_interval):
+    """Get the time of the provider's next update after a fetch (the cache expiry)."""
+    return (math.floor(fetched_at / update_interval) + 1) * update_interval
+
+
+def describe_forecast(day):
+    """
+    Turn a forecast day into the app's weather card.
+
+    Returns:
+        {"temp", "description"} dict
+    """
+    temp_max = day["tempMax"]
+    if (day.get("precipitationProbability") or 0) >= 50:
+        description = "Rain expected - bring raincoat and umbrella."
+    elif temp_max >= 20:
+        description = "Warm day expected - light clothing appropriate."
+    elif temp_max <= 12:
+        description = "Slightly chilly - bring a jacket."
+    elif day.get("weatherCode") in CLOUDY_CODES:
+        description = "Cloudy but dry - standard uniform is fine."
+    else:
+        description = "Pleasant day - normal layers should be fine. Light jacket optional."
+    return {
+        "temp": f"{round(temp_max)}°C",
+        "description": description
+    }
+
+
+class WeatherService:
+    """Forecast lookups for a location, backed by the shared cache."""
+
+    def __init__(self, provider=None, location=SCHOOL_LOCATION, cache_path=WEATHER_CACHE_FILE,
+                 fallback=None, days=FORECAST_DAYS):
+        """
+        Args:
+            provider: WeatherProvider (defaults to Open-Meteo)
+            location: {"name", "latitude", "longitude"} dict
+            cache_path: Shared cache file
+            fallback: Provider used when the main one fails and nothing is cached
+                (defaults to FixtureProvider)
+            days: Days fetched per request
+        """
+        self.provider = provider or OpenMeteoProvider()
+        self.fallback = fallback or FixtureProvider()
+        self.location = location
+        self.cache_path = Path(cache_path)
+        self.days = days
+        self.lock = threading.Lock()
+        self.entries = self._load_cache()
+        self.retry_at = 0
+
+    @property
+    def cache_key(self):
+        """Cache key for this provider and location."""
+        return f"{self.provider.name}:{self.location['latitude']:.3f},{self.location['longitude']:.3f}"
+
+    def _load_cache(self):
+        if not self.cache_path.exists():
+            return {}
+        try:
+            with open(self.cache_path, 'r') as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Ignoring unreadable weather cache {self.cache_path}: {e}")
+            return {}
+
+    def _save_cache(self):
+        tmp_path = self.cache_path.with_name(self.cache_path.name + ".tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump(self.entries, f, indent=2)
+        os.replace(tmp_path, self.cache_path)
+
+    def _refresh(self, today):
+        """Fetch a fresh forecast if the cached one has expired. Returns the cached days."""
+        entry = self.entries.get(self.cache_key)
+        now = time.time()
+        if entry and entry["expires"] > now and today.isoformat() in entry["days"]:
+            return entry["days"]
+
+        days = None
+        if now >= self.retry_at:
+            try:
+                days = self.provider.fetch_forecast(self.location, today, self.days)
+            except Exception as e:
+                self.retry_at = now + FAILURE_BACKOFF
+                logger.warning(f"Weather provider {self.provider.name} failed: {e}")
+        if days is None:
+            # Serve the last forecast we have, or the offline fallback
+            if entry:
+                return entry["days"]
+            return self.fallback.fetch_forecast(self.location, today, self.days)
+
+        self.entries[self.cache_key] = {
+            "fetched": now,
+            "expires": next_update(now, self.provider.update_interval),
+            "days": days
+        }
+        try:
+            self._save_cache()
+        except OSError as e:
+            logger.warning(f"Could not save weather cache {self.cache_path}: {e}")
+        logger.info(f"Fetched {len(days)}-day forecast from {self.provider.name} for {self.location['name']}")
+        return days
+
+    def forecasts(self, today=None):
+        """
+        Get the cached multi-day forecast, fetching it if it has expired.
+
+        Returns:
+            Dict of ISO date -> weather card ({"temp", "description"})
+        """
+        today = today or date.today()
+        with self.lock:
+            days = self._refresh(today)
+        return {day: describe_forecast(forecast) for day, forecast in days.items()}
+
+    def forecast(self, day, today=None):
+        """
+        Get the weather card for one day.
+
+        Days outside the provider's forecast range use the fallback provider.
+        """
+        if hasattr(day, "date"):
+            day = day.date()
+        card = self.forecasts(today).get(day.isoformat())
+        if card is None:
+            card = describe_forecast(self.fallback.fetch_forecast(self.location, day, 1)[day.isoformat()])
+        return card
+
+
+def get_provider(name):
+    """Get a provider by name ("open-meteo" or "fixture")."""
+    providers = {"open-meteo": OpenMeteoProvider, "fixture": FixtureProvider}
+    if name not in providers:
+        raise ValueError(f"Unknown weather provider: {name}")
+    return providers[name]()